@@ -0,0 +1,442 @@
+import sys
+import time
+import struct
+import socket
+import select
+import mmap
+import heapq
+import itertools
+import threading
+from collections import deque
+from scapy.config import conf
+from scapy.sendrecv import sniff
+
+
+#-------------------------------------------------------ScapyBackend--------------------------------------------------------#
+#capture backend that uses scapy sniff method, available on all platforms and used as fallback
+class ScapyBackend():
+    name = 'scapy' #represents the backend name
+    interface = None #interface of network, none for all interfaces
+    bpfFilter = None #string that represents the BPF filter for sniffer to filter with
+    captureSocket = None #scapy listen socket of the raw capture loop
+    stats = None #dictionary of kernel statistics accumulated during the raw capture loop
+    statsLock = None #lock for reading and accumulating the statistics, the GUI thread reads them while the capture thread reads them before closing
+
+    def __init__(self, interface=None, bpfFilter=None):
+        self.interface = interface #initialize the network interface if given
+        self.bpfFilter = bpfFilter if bpfFilter else None #set the BPF filter if given
+        self.stats = {'received': None, 'dropped': None, 'freezeCount': None}
+        self.statsLock = threading.Lock()
+
+
+    #method that runs the capture loop, each dissected packet is passed to the PacketCapture method of the engine
+    def run(self, captureEngine):
+        if captureEngine.dissectionPool is not None or captureEngine.packetClassifier is not None: #if true the engine dissects in worker processes or classifies raw frames so we only read raw frames
+            return self.runRaw(captureEngine)
+        sniff(iface=self.interface, prn=captureEngine.PacketCapture, filter=self.bpfFilter, stop_filter=captureEngine.checkStopFlag, timeout=captureEngine.timeout, store=0)
+
+
+    #method that runs the capture loop without dissection, each raw frame is passed to the handleFrames method of the engine
+    def runRaw(self, captureEngine):
+        captureSocket = self.captureSocket = conf.L2listen(iface=self.interface, filter=self.bpfFilter) #open the scapy listen socket of the platform
+        deadline = time.monotonic() + captureEngine.timeout if captureEngine.timeout else None #time to stop the capture if duration is given
+        try:
+            while not captureEngine.stopCapture:
+                if deadline is not None and time.monotonic() >= deadline: #if true we reached the capture duration
+                    break
+                if not captureSocket.select([captureSocket], 0.1): #wait for a frame, wake up periodically to check the stop flag
+                    continue
+                layerClass, frame, timestamp = captureSocket.recv_raw() #read the raw frame without dissecting it
+                if frame: #if true we received a frame
+                    captureEngine.handleFrames([(frame, timestamp if timestamp else time.time(), conf.l2types.layer2num.get(layerClass, 1))])
+        finally:
+            self.getStats() #accumulate the final statistics before closing
+            self.captureSocket = None
+            captureSocket.close()
+
+
+    #method that returns the kernel statistics of the capture, available for the raw capture loop on Linux packet sockets, scapy sniff does not expose them
+    def getStats(self):
+        packetSocket = getattr(self.captureSocket, 'ins', None) #the packet socket of the scapy listen socket on Linux
+        if sys.platform.startswith('linux') and isinstance(packetSocket, socket.socket): #if true we read the PACKET_STATISTICS of tpacket_stats struct, the kernel resets them on every read
+            with self.statsLock: #the kernel resets the statistics on every read, so reading and accumulating them is one step
+                try:
+                    received, dropped = struct.unpack('II', packetSocket.getsockopt(TPacketBackend.SOL_PACKET, TPacketBackend.PACKET_STATISTICS, 8))
+                except OSError: #if socket was closed or isn't a packet socket there are no statistics
+                    return dict(self.stats)
+                self.stats['received'] = (self.stats['received'] or 0) + received
+                self.stats['dropped'] = (self.stats['dropped'] or 0) + dropped
+        return dict(self.stats)
+
+#-----------------------------------------------------ScapyBackend-END------------------------------------------------------#
+
+#------------------------------------------------------TPacketBackend-------------------------------------------------------#
+#capture backend for Linux that reads frames from a PACKET_MMAP TPACKET_V3 block ring shared with the kernel
+class TPacketBackend():
+    name = 'tpacket' #represents the backend name
+    SOL_PACKET = 263 #socket level for packet socket options
+    PACKET_RX_RING = 5 #socket option for setting the receive ring
+    PACKET_STATISTICS = 6 #socket option for retrieving kernel statistics
+    PACKET_VERSION = 10 #socket option for setting the tpacket version
+    PACKET_FANOUT = 18 #socket option for joining a fanout group
+    TPACKET_V3 = 2 #tpacket version with variable length frames in blocks
+    ETH_P_ALL = 0x0003 #ethernet protocol for receiving all frames
+    TP_STATUS_KERNEL = 0 #block is owned by the kernel
+    TP_STATUS_USER = 1 #block is owned by user space
+    TP_STATUS_VLAN_VALID = 0x10 #frame had a vlan tag that the kernel stripped
+    TP_STATUS_VLAN_TPID_VALID = 0x40 #vlan tpid field of frame header is valid
+    fanoutTypes = {'hash': 0, 'lb': 1, 'cpu': 2, 'rollover': 3, 'random': 4, 'qm': 5} #fanout modes supported by the kernel
+    linkTypes = {1: 1, 772: 1, 65534: 101, 801: 105, 803: 127} #conversion of ARPHRD hardware types to pcap link types
+    interface = None #interface of network, none for all interfaces
+    bpfFilter = None #string that represents the BPF filter for sniffer to filter with
+    blockSize = 1 << 20 #size of each block in the ring, must be a multiple of the page size
+    blockCount = 64 #number of blocks in the ring
+    frameSize = 1 << 11 #frame size hint for the kernel
+    blockTimeout = 60 #timeout in milliseconds for kernel to retire a block that is not full
+    fanoutGroup = None #fanout group id, none if fanout is disabled
+    fanoutType = 'hash' #fanout mode for distributing frames between sockets of the same group
+    captureSocket = None #packet socket of the ring
+    ring = None #memory mapped ring of the socket
+    stats = None #accumulated kernel statistics
+    statsLock = None #lock for reading and accumulating the statistics, the GUI thread reads them while the capture thread reads them before closing
+
+    def __init__(self, interface=None, bpfFilter=None, blockSize=1 << 20, blockCount=64, blockTimeout=60, fanoutGroup=None, fanoutType='hash'):
+        if not sys.platform.startswith('linux'): #this backend is only available on Linux
+            raise OSError('TPACKET_V3 capture backend is only available on Linux.')
+        if fanoutType not in self.fanoutTypes: #if true the fanout mode is unknown
+            raise ValueError(f'Error, unknown fanout type {fanoutType}, supported types are: {", ".join(self.fanoutTypes)}.')
+        self.interface = interface #initialize the network interface if given
+        self.bpfFilter = bpfFilter if bpfFilter else None #set the BPF filter if given
+        self.blockSize = blockSize #set the block size
+        self.blockCount = blockCount #set the number of blocks
+        self.blockTimeout = blockTimeout #set the block retire timeout
+        self.fanoutGroup = fanoutGroup #set the fanout group if given
+        self.fanoutType = fanoutType #set the fanout mode
+        self.stats = {'received': 0, 'dropped': 0, 'freezeCount': 0} #initialize the kernel statistics
+        self.statsLock = threading.Lock()
+        self.open() #open the socket and map the ring, raises PermissionError without administrative privileges
+
+
+    #method that creates the packet socket, attaches the BPF filter and maps the TPACKET_V3 ring
+    def open(self):
+        self.captureSocket = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(self.ETH_P_ALL)) #create the raw packet socket
+        try:
+            if self.bpfFilter: #if true we compile the filter and attach it to the socket before any frame is queued
+                from scapy.arch.linux import attach_filter #import only when we need to compile a filter
+                attach_filter(self.captureSocket, self.bpfFilter, self.interface)
+            self.captureSocket.setsockopt(self.SOL_PACKET, self.PACKET_VERSION, self.TPACKET_V3) #set the tpacket version to v3
+            ringRequest = struct.pack('IIIIIII', self.blockSize, self.blockCount, self.frameSize, (self.blockSize // self.frameSize) * self.blockCount, self.blockTimeout, 0, 0) #represents tpacket_req3 struct
+            self.captureSocket.setsockopt(self.SOL_PACKET, self.PACKET_RX_RING, ringRequest) #create the receive ring in the kernel
+            self.ring = mmap.mmap(self.captureSocket.fileno(), self.blockSize * self.blockCount, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE) #map the ring to user space
+            self.captureSocket.bind((self.interface if self.interface else '', self.ETH_P_ALL)) #bind to the interface, empty name means all interfaces
+            if self.fanoutGroup is not None: #if true we join the fanout group so several sockets share the load
+                self.captureSocket.setsockopt(self.SOL_PACKET, self.PACKET_FANOUT, (self.fanoutGroup & 0xffff) | (self.fanoutTypes[self.fanoutType] << 16))
+        except Exception: #if something failed we close the socket and raise the exception to the caller
+            self.close()
+            raise
+
+
+    #method that closes the ring and the socket
+    def close(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        if self.captureSocket is not None:
+            self.captureSocket.close()
+            self.captureSocket = None
+
+
+    #method that reads all the frames of a block that was retired to user space, returns a list of tuples of (frame bytes, timestamp, link type)
+    def readBlock(self, blockOffset):
+        frames = [] #list of frames in current block
+        ring = self.ring #local reference to the ring for faster access
+        numPackets, packetOffset = struct.unpack_from('II', ring, blockOffset + 12) #read num_pkts and offset_to_first_pkt from block header
+        packetOffset += blockOffset #offset of first frame in the ring
+        for _ in range(numPackets):
+            nextOffset, sec, nsec, snapLen, _, status, macOffset = struct.unpack_from('IIIIIIH', ring, packetOffset) #read the tpacket3_hdr fields
+            hardwareType = struct.unpack_from('H', ring, packetOffset + 56)[0] #read sll_hatype from the sockaddr_ll that follows the header
+            frame = ring[packetOffset + macOffset:packetOffset + macOffset + snapLen] #copy the frame since the block is returned to the kernel
+            if status & self.TP_STATUS_VLAN_VALID: #if true the kernel stripped the vlan tag so we insert it back into the frame
+                vlanTci, vlanTpid = struct.unpack_from('IH', ring, packetOffset + 32)
+                vlanTpid = vlanTpid if status & self.TP_STATUS_VLAN_TPID_VALID else 0x8100
+                frame = frame[:12] + struct.pack('!HH', vlanTpid, vlanTci & 0xffff) + frame[12:]
+            frames.append((frame, sec + nsec / 1e9, self.linkTypes.get(hardwareType, 1)))
+            packetOffset += nextOffset #move to next frame in block
+        return frames
+
+
+    #method that runs the capture loop, each retired block is passed as a batch of raw frames to the handleFrames method of the engine
+    def run(self, captureEngine):
+        poller = select.poll() #poll object for waiting on the socket
+        poller.register(self.captureSocket, select.POLLIN | select.POLLERR)
+        deadline = time.monotonic() + captureEngine.timeout if captureEngine.timeout else None #time to stop the capture if duration is given
+        blockIndex = 0 #index of the next block to read in the ring
+        try:
+            while not captureEngine.stopCapture:
+                if deadline is not None and time.monotonic() >= deadline: #if true we reached the capture duration
+                    break
+                blockOffset = blockIndex * self.blockSize #offset of current block in the ring
+                if not struct.unpack_from('I', self.ring, blockOffset + 8)[0] & self.TP_STATUS_USER: #if true the block is still owned by the kernel
+                    poller.poll(100) #wait for the kernel to retire a block, wake up periodically to check the stop flag
+                    continue
+                frames = self.readBlock(blockOffset) #read the frames of the block
+                struct.pack_into('I', self.ring, blockOffset + 8, self.TP_STATUS_KERNEL) #return the block to the kernel
+                blockIndex = (blockIndex + 1) % self.blockCount #move to next block in the ring
+                captureEngine.handleFrames(frames) #pass the batch of frames to the pipeline
+        finally:
+            self.getStats() #accumulate the final statistics before closing
+            self.close()
+
+
+    #method that returns the kernel statistics of the capture, accumulated since the kernel resets them on every read
+    def getStats(self):
+        captureSocket = self.captureSocket #local reference since the capture thread may close the socket while another thread reads the statistics
+        if captureSocket is not None: #if socket is open we read the PACKET_STATISTICS of tpacket_stats_v3 struct
+            with self.statsLock: #the kernel resets the statistics on every read, so reading and accumulating them is one step
+                try:
+                    received, dropped, freezeCount = struct.unpack('III', captureSocket.getsockopt(self.SOL_PACKET, self.PACKET_STATISTICS, 12))
+                except OSError: #if socket was closed there are no new statistics
+                    return dict(self.stats)
+                self.stats['received'] += received
+                self.stats['dropped'] += dropped
+                self.stats['freezeCount'] += freezeCount
+        return dict(self.stats)
+
+#----------------------------------------------------TPacketBackend-END-----------------------------------------------------#
+
+#------------------------------------------------------InterfaceWorker------------------------------------------------------#
+#capture worker of one interface of a multi interface capture, runs the raw capture loop of its own backend in its own thread
+#the worker acts as the capture engine of its backend, frames are kept in a bounded queue of the worker until the merge loop takes them
+#a full queue drops the frames of its interface only, so a busy interface can't take the memory or merge share of the others
+class InterfaceWorker():
+    interface = None #interface of network the worker captures on
+    backend = None #capture backend of the interface, with its own socket and BPF filter
+    bpfFilter = None #BPF filter of the interface
+    maxQueued = 65536 #maximum number of frames waiting for the merge loop
+    batches = None #deque of batches of frames waiting for the merge loop
+    queuedCount = 0 #number of frames waiting for the merge loop
+    droppedCount = 0 #number of frames dropped because the queue was full
+    mergedCount = 0 #number of frames passed to the pipeline by the merge loop
+    lastTimestamp = 0.0 #timestamp of the last frame the merge loop took, frames still queued by the worker are not older
+    heldCount = 0 #number of frames of the worker held by the merge loop
+    error = None #exception that stopped the capture loop of the interface, none if it's running or stopped normally
+    timeout = None #capture duration of the backend, the merge loop stops the workers when the duration is reached
+    stopCapture = False #flag for stopping the capture loop of the backend
+    captureThread = None #thread that runs the capture loop of the backend
+    frameEvent = None #event of the merge loop, set when frames are queued
+    lock = None #lock for the queue of the worker
+
+    def __init__(self, interface, backend, bpfFilter=None, frameEvent=None, maxQueued=65536):
+        self.interface = interface #set the interface of the worker
+        self.backend = backend #set the capture backend of the interface
+        self.bpfFilter = bpfFilter #set the BPF filter of the interface
+        self.frameEvent = frameEvent if frameEvent is not None else threading.Event() #set the event of the merge loop
+        self.maxQueued = maxQueued #set the queue limit of the worker
+        self.batches = deque()
+        self.lock = threading.Lock()
+
+
+    #method that starts the capture thread of the interface
+    def start(self):
+        self.captureThread = threading.Thread(target=self.run, name=f'capture-{self.interface}', daemon=True)
+        self.captureThread.start()
+
+
+    #method of the capture thread, runs the raw capture loop of the backend so frames are dissected once by the pipeline
+    def run(self):
+        try:
+            getattr(self.backend, 'runRaw', self.backend.run)(self)
+        except Exception as e: #if the capture loop failed we keep the error, the other interfaces keep capturing
+            self.error = e
+            print(f'Capture on {self.interface} stopped: {e}', file=sys.stderr)
+        finally:
+            self.frameEvent.set() #wake the merge loop so it notices the worker finished
+
+
+    #method that receives a batch of raw frames from the backend and queues it for the merge loop, frames are dropped if the queue is full
+    def handleFrames(self, frames):
+        with self.lock:
+            if self.queuedCount + len(frames) > self.maxQueued: #if true the pipeline can't keep up with this interface
+                self.droppedCount += len(frames)
+                return
+            self.batches.append(frames)
+            self.queuedCount += len(frames)
+        self.frameEvent.set() #wake the merge loop
+
+
+    #method that takes up to maxCount queued frames, returns a list of batches, a batch is split if it has more frames than needed (e.g. a whole ring block)
+    def takeFrames(self, maxCount):
+        batches, count = [], 0 #taken batches and their number of frames
+        with self.lock:
+            while self.batches and count < maxCount:
+                batch = self.batches.popleft()
+                if count + len(batch) > maxCount: #if true we take the frames we need and keep the rest at the head of the queue
+                    self.batches.appendleft(batch[maxCount - count:])
+                    batch = batch[:maxCount - count]
+                batches.append(batch)
+                count += len(batch)
+            self.queuedCount -= count
+        return batches
+
+
+    #method that returns true if the capture thread is running
+    def isAlive(self):
+        return self.captureThread is not None and self.captureThread.is_alive()
+
+
+    #method that returns the statistics of the interface, the kernel statistics of its backend and the counters of the worker
+    def getStats(self):
+        stats = self.backend.getStats() #kernel received and dropped counts of the interface when available
+        stats.update({'queued': self.queuedCount, 'queueDropped': self.droppedCount, 'merged': self.mergedCount, 'error': str(self.error) if self.error is not None else None})
+        return stats
+
+#----------------------------------------------------InterfaceWorker-END----------------------------------------------------#
+
+#---------------------------------------------------MultiInterfaceBackend---------------------------------------------------#
+#capture backend that captures on several interfaces in parallel, each interface has its own worker thread, backend, BPF filter and statistics
+#the frames of the workers are merged by capture timestamp in the thread of the engine, so the pipeline stays single threaded and sees one ordered stream
+#frames are held until no worker can still have an older frame, the last frame taken from each worker with queued frames bounds the merge and idle workers are waited for mergeDelay
+#the merge holds at most fairShare frames of each worker, the rest wait in the bounded queue of their worker, so a busy interface only fills and drops from its own queue
+#each batch passed to the engine is tagged with its interface
+class MultiInterfaceBackend():
+    name = 'multi' #represents the backend name
+    interface = None #list of interfaces of network
+    bpfFilter = None #string that represents the BPF filter shared by all interfaces
+    workers = None #list of capture workers, one for each interface
+    mergeDelay = 0.05 #seconds a frame is held after its capture timestamp before it's merged, frames of idle interfaces with earlier timestamps arrive within it, raised by the block timeout of ring backends
+    fairShare = 256 #maximum number of frames of each worker held by the merge loop, so a busy interface can't delay the others
+    frameEvent = None #event that workers set when they queue frames
+
+    def __init__(self, interfaces, backend='auto', bpfFilter=None, interfaceFilters=None, **options):
+        self.interface = list(interfaces) #set the list of interfaces
+        self.bpfFilter = bpfFilter if bpfFilter else None #set the shared BPF filter if given
+        self.frameEvent = threading.Event()
+        self.workers = []
+        try: #create the backend of each interface, its filter is the shared filter combined with the filter of the interface if given
+            for index, interface in enumerate(self.interface):
+                workerOptions = dict(options) #options of the backend of the interface
+                if workerOptions.get('fanoutGroup') is not None: #a fanout group belongs to one interface, so each interface gets its own group id
+                    workerOptions['fanoutGroup'] += index
+                workerFilter = getInterfaceFilter(self.bpfFilter, interfaceFilters, interface) #the BPF filter of the interface
+                self.workers.append(InterfaceWorker(interface, createBackend(backend, interface, workerFilter, **workerOptions), workerFilter, self.frameEvent))
+                self.mergeDelay = max(self.mergeDelay, getattr(self.workers[-1].backend, 'blockTimeout', 0) / 1000 + 0.05) #a ring backend passes a block that isn't full only after its block timeout
+        except Exception: #if an interface can't be opened we close the backends we opened and raise the exception to the caller
+            for worker in self.workers:
+                if hasattr(worker.backend, 'close'):
+                    worker.backend.close()
+            raise
+
+
+    #method that runs the capture loop, starts the workers and merges their frames by capture timestamp into the pipeline of the engine
+    def run(self, captureEngine):
+        heldFrames = [] #heap of (merge timestamp, sequence, frame, timestamp, link type, worker) of frames held for merging
+        sequence = itertools.count() #sequence numbers keep frames with equal timestamps in the order they were taken
+        deadline = time.monotonic() + captureEngine.timeout if captureEngine.timeout else None #time to stop the capture if duration is given
+        for worker in self.workers:
+            worker.start()
+        try:
+            while not captureEngine.stopCapture:
+                if deadline is not None and time.monotonic() >= deadline: #if true we reached the capture duration
+                    break
+                takenCount = self.collectFrames(heldFrames, sequence) #take the queued frames of each worker
+                if takenCount == 0 and not heldFrames and not any(worker.isAlive() or worker.queuedCount for worker in self.workers): #if true all capture loops stopped
+                    break
+                self.mergeFrames(captureEngine, heldFrames, min([time.time() - self.mergeDelay] + [worker.lastTimestamp for worker in self.workers if worker.queuedCount])) #frames up to the oldest frame any worker may still have
+                if takenCount == 0: #if true no frames arrived so we wait for frames or the next merge
+                    self.frameEvent.wait(self.mergeDelay)
+                    self.frameEvent.clear()
+        finally:
+            for worker in self.workers: #stop the capture loops and wait for them to close their sockets
+                worker.stopCapture = True
+            for worker in self.workers:
+                worker.captureThread.join()
+        if not captureEngine.stopCapture: #if true the duration was reached or capture loops stopped, we merge the held frames
+            if deadline is None or time.monotonic() < deadline: #if true the capture loops stopped by themselves, so we merge their queued frames too
+                while self.collectFrames(heldFrames, sequence):
+                    pass
+            self.mergeFrames(captureEngine, heldFrames, float('inf'))
+        errors = [worker.error for worker in self.workers if worker.error is not None] #errors of interfaces that stopped capturing
+        if errors and len(errors) == len(self.workers): #if true no interface could capture so we raise the first error to the caller
+            raise errors[0]
+
+
+    #method that takes frames from each worker until fairShare frames of each worker are held, returns the number of taken frames
+    #frames are merged by their timestamp, timestamps ahead of the clock (e.g. an interface with a skewed hardware clock) are merged by the time they were taken
+    def collectFrames(self, heldFrames, sequence):
+        takenCount, takeTime = 0, time.time() #number of taken frames and the time they were taken
+        for worker in self.workers:
+            if worker.heldCount >= self.fairShare: #if true the merge holds enough frames of the worker
+                continue
+            for batch in worker.takeFrames(self.fairShare - worker.heldCount):
+                for frame, timestamp, linkType in batch:
+                    mergeTimestamp = min(timestamp, takeTime) #the timestamp the frame is merged by
+                    heapq.heappush(heldFrames, (mergeTimestamp, next(sequence), frame, timestamp, linkType, worker))
+                    worker.lastTimestamp = mergeTimestamp
+                worker.heldCount += len(batch)
+                takenCount += len(batch)
+        return takenCount
+
+
+    #method that passes the held frames up to the watermark timestamp to the engine in timestamp order
+    #consecutive frames of the same interface are passed as one batch with the interface, so each packet is tagged with the interface it was captured on
+    def mergeFrames(self, captureEngine, heldFrames, watermark):
+        batch, batchWorker = [], None #current batch of frames and the worker they came from
+        while heldFrames and heldFrames[0][0] <= watermark:
+            _, _, frame, timestamp, linkType, worker = heapq.heappop(heldFrames)
+            if worker is not batchWorker and batch: #if true the interface changed so we pass the batch of the previous interface
+                captureEngine.handleFrames(batch, batchWorker.interface)
+                batch = []
+            batch.append((frame, timestamp, linkType))
+            batchWorker = worker
+            worker.heldCount -= 1
+            worker.mergedCount += 1
+        if batch: #pass the last batch
+            captureEngine.handleFrames(batch, batchWorker.interface)
+
+
+    #method that returns the statistics of the capture, kernel counts are summed over the interfaces and the statistics of each interface are under interfaces
+    def getStats(self):
+        interfaceStats = {worker.interface: worker.getStats() for worker in self.workers} #statistics of each interface
+        stats = {'interfaces': interfaceStats}
+        for name in ('received', 'dropped', 'freezeCount'): #sum the kernel counts the backends report, none if no backend reports them
+            values = [workerStats[name] for workerStats in interfaceStats.values() if workerStats.get(name) is not None]
+            stats[name] = sum(values) if values else None
+        return stats
+
+#-------------------------------------------------MultiInterfaceBackend-END-------------------------------------------------#
+
+#------------------------------------------------------HELPER-FUNCTIONS-----------------------------------------------------#
+
+captureBackends = {'scapy': ScapyBackend, 'tpacket': TPacketBackend} #dictionary of the available capture backends
+
+#method that returns the BPF filter of an interface, the shared filter combined with the filter of the interface in interfaceFilters if it has one
+def getInterfaceFilter(bpfFilter, interfaceFilters, interface):
+    interfaceFilter = interfaceFilters.get(interface) if interfaceFilters else None #the filter of the interface, none if it has no filter of its own
+    if not interfaceFilter: #if true the interface uses the shared filter
+        return bpfFilter
+    return f'({bpfFilter}) and ({interfaceFilter})' if bpfFilter else interfaceFilter
+
+
+#method that creates the capture backend by name, auto prefers the TPACKET_V3 ring on Linux and falls back to scapy sniff
+#interface may be a list of interfaces, several interfaces are captured in parallel by the multi interface backend with a backend of the given name for each interface
+#interfaceFilters is an optional dictionary of BPF filters by interface that are combined with the shared filter
+def createBackend(backend='auto', interface=None, bpfFilter=None, interfaceFilters=None, **options):
+    if isinstance(interface, (list, tuple)): #if true we capture on a list of interfaces
+        if len(interface) > 1: #if true each interface gets its own worker
+            return MultiInterfaceBackend(interface, backend, bpfFilter, interfaceFilters, **options)
+        interface = interface[0] if interface else None #one interface is captured directly
+    bpfFilter = getInterfaceFilter(bpfFilter, interfaceFilters, interface) #add the filter of the interface if it has one
+    if backend == 'auto': #if true we try the ring backend and fall back to scapy if it is not available
+        if sys.platform.startswith('linux'):
+            try:
+                return TPacketBackend(interface, bpfFilter, **options)
+            except PermissionError: #we raise permission errors to the caller since scapy will fail too
+                raise
+            except (OSError, ImportError) as e: #else the ring is not available so we fall back to scapy
+                print(f'TPACKET_V3 capture unavailable ({e}), falling back to scapy sniff.', file=sys.stderr)
+        return ScapyBackend(interface, bpfFilter)
+    if backend not in captureBackends: #if true the backend name is unknown
+        raise ValueError(f'Error, unknown capture backend {backend}, supported backends are: auto, {", ".join(captureBackends)}.')
+    return captureBackends[backend](interface, bpfFilter, **options) if backend == 'tpacket' else captureBackends[backend](interface, bpfFilter)
+
+#----------------------------------------------------HELPER-FUNCTIONS-END---------------------------------------------------#
@@ -0,0 +1,88 @@
+import re
+import json
+import binascii
+from urllib.parse import unquote_to_bytes
+
+
+#---------------------------------------------------CredentialExtractor-----------------------------------------------------#
+#finds login credentials in raw http requests with one compiled regex of all labels, the request is scanned once for all labels and places
+#credentials are found in form bodies and query strings (label=value), json bodies ("label": "value") and basic authorization headers
+#labels are matched in any case, when several labels match the label that comes first in its list is chosen
+class CredentialExtractor():
+    usernameLabels = ('username', 'user', 'uname', 'usr', 'email', 'login', 'usrname', 'uid') #labels of usernames, in order of preference
+    passwordLabels = ('password', 'pass', 'pwd', 'passwd', 'pswd', 'psw', 'secret', 'secure', 'key', 'auth') #labels of passwords, in order of preference
+    noCredentials = {} #result of requests without credentials, shared by all packets so records don't keep an empty dictionary each, never modified
+    basicPattern = re.compile(rb'[ \t]*basic[ \t]+([a-z0-9+/=]+)') #regex of the value of basic authorization headers in lowercase
+    compiled = None #tuple of the dictionary of (credential name, preference) by lowercase label and the regex of all labels, replaced at once so running searches stay consistent
+
+    def __init__(self, usernameLabels=None, passwordLabels=None):
+        self.setLabels(usernameLabels, passwordLabels)
+
+
+    #method that sets the labels and compiles them into one regex, labels that aren't given keep their current value
+    def setLabels(self, usernameLabels=None, passwordLabels=None):
+        usernameLabels = tuple(label.lower() for label in (usernameLabels if usernameLabels is not None else self.usernameLabels)) #labels are matched in lowercase
+        passwordLabels = tuple(label.lower() for label in (passwordLabels if passwordLabels is not None else self.passwordLabels))
+        labels = {} #credential name and preference of each label, a label in both lists is a username
+        for name, nameLabels in (('username', usernameLabels), ('password', passwordLabels)):
+            for preference, label in enumerate(nameLabels):
+                labels.setdefault(label.encode(), (name, preference))
+        alternatives = b'|'.join(re.escape(label) for label in sorted(labels, key=len, reverse=True)) or b'(?!)' #longest labels first, no labels never match
+        pattern = re.compile( #every field starts after one of a few delimiters, so the regex engine skips to them instead of trying all labels at each byte
+            rb'[?&\n"](?:[a-z0-9_.\-]*[_.\-])?(?P<label>' + alternatives + rb')' #a label after the delimiter, optionally with a prefix like j_username
+            rb'(?:=(?P<formValue>[^&\s]+)|"\s*:\s*"(?P<jsonValue>(?:[^"\\]|\\.)*)")') #form body or query string field, or json string member
+        self.usernameLabels, self.passwordLabels, self.compiled = usernameLabels, passwordLabels, (labels, pattern)
+
+
+    #method that returns a dictionary with the username and password of a raw http request, or an empty dictionary if there's no username
+    #the labels are only searched in the request line and body, so the headers aren't scanned and cookies with matching names aren't mistaken for credentials
+    def extract(self, request):
+        labels, pattern = self.compiled #the labels and regex, read once in case labels are changed by another thread
+        lowered = request.lower() #the lowercase request is matched, values are taken from the request itself
+        lineEnd = lowered.find(b'\r\n') #end of the request line, the query string is in it
+        headersEnd = lowered.find(b'\r\n\r\n', max(lineEnd, 0)) #end of the headers, the body is after them
+        lineEnd = lineEnd if lineEnd >= 0 else len(lowered)
+        headersEnd = headersEnd if headersEnd >= 0 else len(lowered)
+        found = {} #value and preference of the best match of each credential name
+        authorization = lowered.find(b'\nauthorization:', lineEnd, headersEnd) #position of the authorization header
+        match = self.basicPattern.match(lowered, authorization + 15) if authorization >= 0 else None
+        if match: #basic authorization is a username and password encoded in base64, it's preferred over labels
+            try:
+                username, _, password = binascii.a2b_base64(request[match.start(1):match.end(1)]).decode('utf-8', 'replace').partition(':')
+                found['username'], found['password'] = (username, -1), (password, -1)
+            except binascii.Error: #if true the header isn't valid base64
+                pass
+        query = lowered.find(b'?', 0, lineEnd) #start of the query string in the request line
+        for start, end in ((query if query >= 0 else lineEnd, lineEnd), (headersEnd + 3, len(lowered))): #the query string and the body, the body starts after the last newline of the headers
+            for match in pattern.finditer(lowered, start, end):
+                kind = match.lastgroup #name of the last group of the match tells if it's a form field or json string
+                name, preference = labels[match.group('label')] #credential name and preference of the matched label
+                if name not in found or preference < found[name][1]: #if true this label is preferred over the label we found before
+                    found[name] = (self.decodeValue(request[match.start(kind):match.end(kind)], kind == 'jsonValue'), preference)
+        if 'username' not in found: #credentials need a username
+            return self.noCredentials
+        return {name: value for name, (value, _) in found.items()}
+
+
+    #method that decodes the raw value of a form field or json string, values without escapes are only decoded from utf-8
+    @staticmethod
+    def decodeValue(value, isJson):
+        if isJson and b'\\' in value: #json strings may have escapes, we decode them as a json string
+            try:
+                return json.loads(b'"' + value + b'"')
+            except ValueError: #if true the string isn't valid json so we decode it as is
+                pass
+        elif not isJson and (b'%' in value or b'+' in value): #form fields are url encoded, they're decoded as bytes so escaped utf-8 is decoded once
+            return unquote_to_bytes(value.replace(b'+', b' ')).decode('utf-8', 'replace')
+        return value.decode('utf-8', 'replace')
+
+#-------------------------------------------------CredentialExtractor-END---------------------------------------------------#
+
+#-----------------------------------------------------HELPER-FUNCTIONS------------------------------------------------------#
+credentialExtractor = CredentialExtractor() #the credential extractor http packets use
+
+#method that sets the labels of the credential extractor, labels that aren't given keep their current value
+def setCredentialLabels(usernameLabels=None, passwordLabels=None):
+    credentialExtractor.setLabels(usernameLabels, passwordLabels)
+
+#---------------------------------------------------HELPER-FUNCTIONS-END----------------------------------------------------#
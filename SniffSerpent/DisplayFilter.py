@@ -0,0 +1,297 @@
+import re
+import operator
+import ipaddress
+from array import array
+from itertools import compress, repeat
+
+
+#-----------------------------------------------------HELPER-FUNCTIONS------------------------------------------------------#
+
+comparisonOperators = {'==': operator.eq, 'eq': operator.eq, '!=': operator.ne, 'ne': operator.ne, '>': operator.gt, 'gt': operator.gt, '<': operator.lt, 'lt': operator.lt, '>=': operator.ge, 'ge': operator.ge, '<=': operator.le, 'le': operator.le} #dictionary of comparison operators and their methods
+protocolNames = {'tcp': ('TCP', 'HTTP', 'TLS'), 'udp': ('UDP', 'DNS', 'DHCP'), 'http': ('HTTP',), 'tls': ('TLS',), 'dns': ('DNS',), 'dhcp': ('DHCP',), 'icmp': ('ICMP',), 'arp': ('ARP',), 'igmp': ('IGMP',), 'stp': ('STP',)} #dictionary of protocol names and the packet types they match, transport protocols match the packet types on top of them
+addressFields = {'ip.src': 'src', 'ip.dst': 'dst', 'ip.addr': 'addr', 'ipv6.src': 'src', 'ipv6.dst': 'dst', 'ipv6.addr': 'addr', 'src': 'src', 'dst': 'dst', 'addr': 'addr'} #dictionary of address fields and the addresses they match
+portFields = {'port': 'port', 'srcport': 'src', 'dstport': 'dst'} #dictionary of port fields and the ports they match, fields with a tcp or udp prefix also match the protocol
+lengthFields = ('len', 'frame.len') #fields of the frame length
+protocolFields = ('proto', 'protocol') #fields of the packet type
+tokenPattern = re.compile(r'\s*(?:(==|!=|>=|<=|>|<|&&|\|\||!|\(|\))|([\w.:/\-]+))') #regular expression of the tokens of a display filter
+
+#method that splits a display filter into tokens, raises ValueError for characters that are not part of any token
+def tokenizeFilter(text):
+    tokens, position = [], 0 #list of tokens and position in text
+    text = text.strip()
+    while position < len(text):
+        match = tokenPattern.match(text, position)
+        if match is None or match.end() == position: #if true the character can't start a token
+            raise ValueError(f'Error, unexpected character "{text[position:].strip()[0]}" in display filter.')
+        tokens.append(match.group(1) or match.group(2))
+        position = match.end()
+    return tokens
+
+
+#method that merges sorted lists of rows into one sorted list without duplicates
+def unionRows(rowLists):
+    rowLists = [rows for rows in rowLists if rows] #skip empty lists
+    if len(rowLists) <= 1: #if true there's nothing to merge
+        return list(rowLists[0]) if rowLists else []
+    return sorted(set().union(*rowLists))
+
+invertTable = bytes([1, 0]) + bytes(254) #translation table that inverts a byte mask of ones and zeros
+
+#method that combines byte masks of ones and zeros of the same length with a bitwise operator, the masks are combined as big integers
+def combineMasks(combine, masks):
+    if len(masks) == 1: #if true there's nothing to combine
+        return masks[0]
+    result = int.from_bytes(masks[0], 'little')
+    for mask in masks[1:]:
+        result = combine(result, int.from_bytes(mask, 'little'))
+    return result.to_bytes(len(masks[0]), 'little')
+
+#----------------------------------------------------HELPER-FUNCTIONS-END---------------------------------------------------#
+
+#-------------------------------------------------------DisplayFilter-------------------------------------------------------#
+#display filter over the rows of a packet column store, e.g. "ip.src == 10.0.0.5 and tcp.port == 443 and len > 1000"
+#terms on protocol, addresses and ports are answered from the secondary indexes of the column store and the other terms are checked only on the rows the indexes found
+#filters that can't use an index, e.g. "not tcp" or "len > 1000" alone, scan the columns without decoding any packet
+class DisplayFilter():
+    text = '' #text of the display filter
+    tree = None #parsed display filter, tuples of (node type, arguments)
+    tokens = None #tokens of the display filter while parsing
+    position = 0 #position of current token while parsing
+    columns = None #column store the value caches belong to
+    valueCaches = None #dictionary of caches of matching table indexes (packet classes and addresses) by term
+
+    def __init__(self, text):
+        self.text = text.strip() #set the text of the display filter
+        self.tokens, self.position = tokenizeFilter(self.text), 0
+        if not self.tokens: #if true the filter is empty so we raise a ValueError exception
+            raise ValueError('Error, display filter is empty.')
+        self.tree = self.parseOr()
+        if self.position < len(self.tokens): #if true there are tokens left that are not part of the filter
+            raise ValueError(f'Error, unexpected "{self.tokens[self.position]}" in display filter.')
+        self.tokens = None
+
+
+    #method that returns the next token without taking it, none at the end of the filter
+    def peekToken(self):
+        return self.tokens[self.position].lower() if self.position < len(self.tokens) else None
+
+
+    #method that takes the next token, raises ValueError at the end of the filter
+    def takeToken(self):
+        if self.position >= len(self.tokens): #if true the filter ended in the middle of an expression
+            raise ValueError('Error, display filter is incomplete.')
+        self.position += 1
+        return self.tokens[self.position - 1]
+
+
+    #method that parses expressions joined with or, or has the lowest precedence
+    def parseOr(self):
+        nodes = [self.parseAnd()]
+        while self.peekToken() in ('or', '||'):
+            self.takeToken()
+            nodes.append(self.parseAnd())
+        return ('or', nodes) if len(nodes) > 1 else nodes[0]
+
+
+    #method that parses expressions joined with and
+    def parseAnd(self):
+        nodes = [self.parseNot()]
+        while self.peekToken() in ('and', '&&'):
+            self.takeToken()
+            nodes.append(self.parseNot())
+        return ('and', nodes) if len(nodes) > 1 else nodes[0]
+
+
+    #method that parses negations, parentheses and terms
+    def parseNot(self):
+        token = self.takeToken()
+        if token.lower() in ('not', '!'): #negation of next expression
+            return ('not', self.parseNot())
+        if token == '(': #expression in parentheses
+            node = self.parseOr()
+            if self.takeToken() != ')': #if true the parenthesis isn't closed
+                raise ValueError('Error, missing ")" in display filter.')
+            return node
+        return self.parseTerm(token.lower())
+
+
+    #method that parses a term, a protocol name or a comparison of a field with a value
+    def parseTerm(self, field):
+        if field in protocolNames and self.peekToken() not in comparisonOperators: #protocol name on its own, e.g. "dns"
+            return ('protocol', protocolNames[field])
+        if self.peekToken() not in comparisonOperators: #if true the field isn't compared to anything
+            raise ValueError(f'Error, expected a comparison after "{field}" in display filter.')
+        compare, value = comparisonOperators[self.takeToken().lower()], self.takeToken()
+        if compare is operator.ne: #not equal is the negation of equal so packets without the field match too
+            return ('not', self.createTerm(field, operator.eq, value))
+        return self.createTerm(field, compare, value)
+
+
+    #method that creates the node of a comparison of a field with a value, raises ValueError for unknown fields and invalid values
+    def createTerm(self, field, compare, value):
+        if field in addressFields: #compare an address with an address or network, e.g. "ip.src == 10.0.0.0/8"
+            if compare is not operator.eq: #addresses can only be compared for equality
+                raise ValueError(f'Error, {field} can only be compared with == or !=.')
+            try: #networks match all of their addresses, other values match the address text as shown in the packet list
+                network = ipaddress.ip_network(value, strict=False) if '/' in value else None
+            except ValueError:
+                raise ValueError(f'Error, invalid network {value} in display filter.')
+            return ('address', addressFields[field], value, network)
+        if field in protocolFields: #compare the packet type, e.g. "proto == dns"
+            if compare is not operator.eq or value.lower() not in protocolNames: #if true the protocol can't be matched
+                raise ValueError(f'Error, {field} can only be compared with == or != to one of: {", ".join(protocolNames)}.')
+            return ('protocol', protocolNames[value.lower()])
+        prefix, _, portField = field.rpartition('.') #port fields may have a tcp or udp prefix, e.g. "tcp.port"
+        if (field in lengthFields or portField in portFields) and not value.isdigit(): #if true the value isn't a number
+            raise ValueError(f'Error, {field} must be compared with a number.')
+        if field in lengthFields: #compare the frame length, e.g. "len > 1000"
+            return ('length', compare, int(value))
+        if portField in portFields and prefix in ('', 'tcp', 'udp'): #compare a port, e.g. "tcp.port == 443"
+            return ('port', portFields[portField], compare, int(value), protocolNames[prefix] if prefix else None)
+        raise ValueError(f'Error, unknown field "{field}" in display filter, supported fields are: {", ".join(list(addressFields) + ["tcp.port", "udp.port", "port", "srcport", "dstport"] + list(lengthFields) + list(protocolFields))} and protocol names.')
+
+
+    #method that returns the rows between start and stop of the column store that match the display filter, rows are counted from the first stored row
+    def filterRows(self, columns, start=0, stop=None):
+        if columns is not self.columns: #if true the value caches belong to another column store so we reset them
+            self.columns, self.valueCaches = columns, {}
+        stop = len(columns) if stop is None else stop
+        estimate = self.estimateRows(self.tree) #number of rows the indexes would find
+        if estimate is None or estimate > (stop - start) // 4: #if true the indexes can't answer the filter or many rows match, so we scan the columns
+            return array('I', compress(range(start, stop), self.getMask(self.tree, start, stop)))
+        return array('I', self.getRows(self.tree, start, stop))
+
+
+    #method that returns the set of table indexes that match a term, the table is a list of packet classes or addresses that only grows
+    #indexes are checked once and kept in the value cache of the term, new entries of the table are checked when the set is requested again
+    def getMatchingIds(self, node, table, matchValue):
+        checkedCount, matchingIds = self.valueCaches.get(node, (0, set()))
+        tableSize = len(table) #entries added by another thread after this are checked next time
+        matchingIds.update(tableId for tableId in range(checkedCount, tableSize) if matchValue(table[tableId]))
+        self.valueCaches[node] = (tableSize, matchingIds)
+        return matchingIds
+
+
+    #method that returns the set of packet class indexes that match a protocol term
+    def getProtocolIds(self, node):
+        return self.getMatchingIds(('protocol', node[1]), self.columns.packetClasses, lambda packetClass: packetClass.__name__.replace('_Packet', '') in node[1])
+
+
+    #method that returns the set of address indexes that match an address term
+    def getAddressIds(self, node):
+        value, network = node[2], node[3]
+        if network is None: #if true we compare the address text, the address table has an index of each address
+            addressId = self.columns.addressIds.get(value)
+            return {addressId} if addressId is not None else set()
+        def matchNetwork(address): #check if the address is in the network
+            try:
+                return ipaddress.ip_address(address) in network
+            except ValueError: #if true its not an ip address, e.g. an empty address
+                return False
+        return self.getMatchingIds(('address', value, network), self.columns.addresses, matchNetwork)
+
+
+    #method that returns the secondary indexes and their keys that hold the rows of a term, none if the term can't use the indexes
+    def getIndexKeys(self, node):
+        columns, nodeType = self.columns, node[0]
+        if nodeType == 'protocol': #rows of the matching packet classes
+            return [(columns.protocolIndex, packetClassId) for packetClassId in self.getProtocolIds(node)]
+        if nodeType == 'address': #rows of the matching addresses on the chosen side
+            indexes = {'src': (columns.srcAddressIndex,), 'dst': (columns.dstAddressIndex,), 'addr': (columns.srcAddressIndex, columns.dstAddressIndex)}[node[1]]
+            return [(index, addressId) for index in indexes for addressId in self.getAddressIds(node)]
+        if nodeType == 'port' and node[2] is operator.eq: #rows of the port on the chosen side, ranges of ports are checked on the columns
+            indexes = {'src': (columns.srcPortIndex,), 'dst': (columns.dstPortIndex,), 'port': (columns.srcPortIndex, columns.dstPortIndex)}[node[1]]
+            return [(index, node[3]) for index in indexes]
+        return None
+
+
+    #method that returns the number of rows the secondary indexes have for a node, none if the node can't use the indexes
+    def estimateRows(self, node):
+        nodeType = node[0]
+        if nodeType == 'and': #the most selective child finds the rows
+            estimates = [estimate for estimate in map(self.estimateRows, node[1]) if estimate is not None]
+            return min(estimates) if estimates else None
+        if nodeType == 'or': #all children find rows
+            estimates = list(map(self.estimateRows, node[1]))
+            return None if None in estimates else sum(estimates)
+        indexKeys = self.getIndexKeys(node) if nodeType != 'not' else None
+        return sum(len(index.get(key, ())) for index, key in indexKeys) if indexKeys is not None else None
+
+
+    #method that returns the rows of a node from the secondary indexes in ascending order, the node must have an estimate
+    def getRows(self, node, start, stop):
+        nodeType = node[0]
+        if nodeType == 'and': #rows of the most selective child that the other children match
+            estimates = [(estimate, child) for child in node[1] for estimate in (self.estimateRows(child),) if estimate is not None]
+            indexedChild = min(estimates, key=lambda item: item[0])[1]
+            match = self.getMatcher(('and', [child for child in node[1] if child is not indexedChild]))
+            return [row for row in self.getRows(indexedChild, start, stop) if match(row)]
+        if nodeType == 'or': #union of the rows of the children
+            return unionRows([self.getRows(child, start, stop) for child in node[1]])
+        rows = unionRows([self.columns.getIndexRows(index, key, start, stop) for index, key in self.getIndexKeys(node)])
+        if nodeType == 'port' and node[4] is not None: #keep only the rows of the protocol of the port field
+            match = self.getMatcher(('protocol', node[4]))
+            rows = [row for row in rows if match(row)]
+        return rows
+
+
+    #method that returns a method that checks if a row matches a node, used for the rows the indexes found
+    def getMatcher(self, node):
+        columns, nodeType = self.columns, node[0]
+        if nodeType == 'protocol':
+            protocolIds, protocolColumn = self.getProtocolIds(node), columns.protocols
+            return lambda row: protocolColumn[row] in protocolIds
+        if nodeType == 'address':
+            addressIds, srcColumn, dstColumn = self.getAddressIds(node), columns.srcAddresses, columns.dstAddresses
+            if node[1] == 'src':
+                return lambda row: srcColumn[row] in addressIds
+            if node[1] == 'dst':
+                return lambda row: dstColumn[row] in addressIds
+            return lambda row: srcColumn[row] in addressIds or dstColumn[row] in addressIds
+        if nodeType == 'port':
+            side, compare, value, protocols = node[1:]
+            portColumns = {'src': (columns.srcPorts,), 'dst': (columns.dstPorts,), 'port': (columns.srcPorts, columns.dstPorts)}[side]
+            matchPort = lambda row: any(portColumn[row] >= 0 and compare(portColumn[row], value) for portColumn in portColumns)
+            if protocols is None: #if true the port field has no protocol prefix
+                return matchPort
+            matchProtocol = self.getMatcher(('protocol', protocols))
+            return lambda row: matchProtocol(row) and matchPort(row)
+        if nodeType == 'length':
+            compare, value, lengthColumn = node[1], node[2], columns.lengths
+            return lambda row: compare(lengthColumn[row], value)
+        if nodeType == 'not':
+            match = self.getMatcher(node[1])
+            return lambda row: not match(row)
+        matchers = [self.getMatcher(child) for child in node[1]]
+        if nodeType == 'and':
+            return lambda row: all(match(row) for match in matchers)
+        return lambda row: any(match(row) for match in matchers)
+
+
+    #method that returns a byte mask of the rows between start and stop, each byte is one if its row matches the node, used for scanning the columns
+    #masks are built by C level maps over slices of the column arrays and combined as big integers, so the scan doesn't call python code for each row
+    def getMask(self, node, start, stop):
+        columns, nodeType = self.columns, node[0]
+        if nodeType == 'protocol': #packet class indexes are bytes so we translate them to the mask
+            protocolIds = self.getProtocolIds(node)
+            return columns.protocols[start:stop].tobytes().translate(bytes(1 if protocolId in protocolIds else 0 for protocolId in range(256)))
+        if nodeType == 'address':
+            addressIds = self.getAddressIds(node)
+            return combineMasks(operator.or_, [bytes(map(addressIds.__contains__, column[start:stop])) for column in {'src': (columns.srcAddresses,), 'dst': (columns.dstAddresses,), 'addr': (columns.srcAddresses, columns.dstAddresses)}[node[1]]])
+        if nodeType == 'port':
+            side, compare, value, protocols = node[1:]
+            masks = []
+            for column in {'src': (columns.srcPorts,), 'dst': (columns.dstPorts,), 'port': (columns.srcPorts, columns.dstPorts)}[side]:
+                mask = bytes(map(compare, column[start:stop], repeat(value)))
+                if compare(-1, value): #if true packets without ports (-1) would match so we remove them
+                    mask = combineMasks(operator.and_, [mask, bytes(map(operator.ge, column[start:stop], repeat(0)))])
+                masks.append(mask)
+            mask = combineMasks(operator.or_, masks)
+            return combineMasks(operator.and_, [mask, self.getMask(('protocol', protocols), start, stop)]) if protocols is not None else mask
+        if nodeType == 'length':
+            return bytes(map(node[1], columns.lengths[start:stop], repeat(node[2])))
+        if nodeType == 'not':
+            return self.getMask(node[1], start, stop).translate(invertTable)
+        return combineMasks(operator.and_ if nodeType == 'and' else operator.or_, [self.getMask(child, start, stop) for child in node[1]])
+
+#-----------------------------------------------------DisplayFilter-END-----------------------------------------------------#
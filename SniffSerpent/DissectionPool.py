@@ -0,0 +1,174 @@
+import time
+import struct
+import zlib
+import threading
+import multiprocessing
+from queue import Empty
+
+
+#-----------------------------------------------------HELPER-FUNCTIONS------------------------------------------------------#
+#method that returns a direction independent hash of the flow of a raw ethernet frame, frames of the same flow always get the same hash
+def flowHash(frame, linkType):
+    if linkType != 1 or len(frame) < 14: #if frame is not ethernet we cannot parse it so all such frames go to the same worker
+        return 0
+    etherType, offset = struct.unpack_from('!H', frame, 12)[0], 14 #read the ether type of the frame
+    while etherType in (0x8100, 0x88a8) and len(frame) >= offset + 4: #skip vlan tags
+        etherType, offset = struct.unpack_from('!H', frame, offset + 2)[0], offset + 4
+    if etherType == 0x0800 and len(frame) >= offset + 20: #if true its an ipv4 packet
+        headerLength = (frame[offset] & 0x0f) * 4 #length of the ipv4 header
+        protocol = frame[offset + 9] #ip protocol of packet
+        srcAddress, dstAddress = frame[offset + 12:offset + 16], frame[offset + 16:offset + 20] #ipv4 addresses of packet
+        portOffset = offset + headerLength #offset of the transport header
+    elif etherType == 0x86dd and len(frame) >= offset + 40: #if true its an ipv6 packet
+        protocol = frame[offset + 6] #next header of ipv6 packet
+        srcAddress, dstAddress = frame[offset + 8:offset + 24], frame[offset + 24:offset + 40] #ipv6 addresses of packet
+        portOffset = offset + 40 #offset of the transport header
+    else: #else its not an ip packet so we hash the mac addresses
+        return zlib.crc32(min(frame[0:6], frame[6:12]) + max(frame[0:6], frame[6:12]))
+    srcEndpoint, dstEndpoint = srcAddress, dstAddress #endpoints of the flow, addresses with ports for tcp and udp
+    if protocol in (6, 17) and len(frame) >= portOffset + 4: #if true its tcp or udp so we add the ports to the endpoints
+        srcEndpoint, dstEndpoint = srcAddress + frame[portOffset:portOffset + 2], dstAddress + frame[portOffset + 2:portOffset + 4]
+    return zlib.crc32(bytes([protocol]) + min(srcEndpoint, dstEndpoint) + max(srcEndpoint, dstEndpoint))
+
+
+#method that runs in each worker process, dissects and classifies batches of frames and renders the brief information of each handled packet
+def dissectionWorker(packetFilter, fastPath, inputQueue, outputQueue):
+    import PacketEngine #import the packet engine inside the worker process
+    packetClassifier = PacketEngine.PacketClassifier(packetFilter) if fastPath else None #create the fast path classifier if enabled
+    while True:
+        batch = inputQueue.get() #get the next batch of frames from the capture process
+        if batch is None: #if true the capture finished so we exit the worker
+            break
+        results = [] #list of results of current batch
+        for sequence, frame, timestamp, linkType, payload in batch:
+            try:
+                if packetClassifier is not None: #if true we classify the raw frame before dissecting it
+                    handledPacket = PacketEngine.classifyFrame(frame, timestamp, linkType, packetFilter, packetClassifier, payload)
+                else: #else we dissect and classify the frame
+                    handledPacket = PacketEngine.classifyPacket(PacketEngine.decodeFrame(frame, timestamp, linkType, payload), packetFilter)
+            except Exception: #if dissection failed we drop the frame like scapy does with malformed frames
+                handledPacket = None
+            if handledPacket is None: #if true the frame was filtered so we only report its sequence number
+                results.append((sequence, None))
+                continue
+            record = PacketEngine.packetDictionary.pop(handledPacket.getId()) #take the record created by the handle method, the worker does not keep packets
+            results.append((sequence, (record.packetClass.__name__, record.srcIp, record.dstIp, record.srcPort, record.dstPort, handledPacket.info(), record.credentials)))
+        outputQueue.put(results) #send the results back to the capture process
+
+#----------------------------------------------------HELPER-FUNCTIONS-END---------------------------------------------------#
+
+#------------------------------------------------------DissectionPool-------------------------------------------------------#
+#pool of worker processes that dissect frames in parallel, frames are sharded by flow hash and results are re-sequenced in capture order
+class DissectionPool():
+    workerCount = 0 #number of worker processes
+    batchSize = 256 #maximum number of frames in each batch sent to a worker
+    flushInterval = 0.05 #maximum time in seconds a frame waits in a batch before it is sent
+    captureEngine = None #capture engine that receives the re-sequenced packets
+    workers = None #list of worker processes
+    inputQueues = None #list of input queues, one for each worker
+    outputQueue = None #shared queue for results of all workers
+    batches = None #list of pending batches, one for each worker
+    frames = None #dictionary of submitted frames by sequence number, kept until their result arrives
+    nextSequence = 0 #sequence number of next submitted frame
+    lastFlush = 0 #time of last flush of pending batches
+    collectorThread = None #thread that re-sequences the results of the workers
+    lock = None #lock for the submitted frames dictionary
+
+    def __init__(self, captureEngine, workerCount, batchSize=256):
+        self.captureEngine = captureEngine #set the capture engine
+        self.workerCount = max(1, workerCount) #set the number of worker processes
+        self.batchSize = batchSize #set the batch size
+        self.lock = threading.Lock()
+
+
+    #method that starts the worker processes and the collector thread
+    def start(self):
+        context = multiprocessing.get_context('spawn') #spawn fresh processes, forking a process with running threads is not safe
+        self.inputQueues = [context.Queue() for _ in range(self.workerCount)]
+        self.outputQueue = context.Queue()
+        self.workers = [context.Process(target=dissectionWorker, args=(self.captureEngine.packetFilter, self.captureEngine.packetClassifier is not None, inputQueue, self.outputQueue), daemon=True) for inputQueue in self.inputQueues]
+        for worker in self.workers:
+            worker.start()
+        self.batches = [[] for _ in range(self.workerCount)]
+        self.frames = {}
+        self.nextSequence = 0
+        self.lastFlush = time.monotonic()
+        self.collectorThread = threading.Thread(target=self.collect, daemon=True)
+        self.collectorThread.start()
+
+
+    #method that assigns sequence numbers to a batch of frames and shards them between the workers by flow hash, payloads are the tcp payloads from tcp reassembly for each frame
+    #interface is the interface the frames were captured on, the records of their packets are tagged with it
+    def submit(self, frames, payloads=None, interface=None):
+        with self.lock:
+            for index, (frame, timestamp, linkType) in enumerate(frames):
+                sequence = self.nextSequence #the global sequence number of the frame
+                self.nextSequence += 1
+                payload = payloads[index] if payloads is not None else None #the payload the frame is dissected with, none for its own payload
+                self.frames[sequence] = (frame, timestamp, linkType, payload, interface) #keep the frame for creating its record when the result arrives
+                batch = self.batches[flowHash(frame, linkType) % self.workerCount] #frames of the same flow always go to the same worker
+                batch.append((sequence, frame, timestamp, linkType, payload))
+                if len(batch) >= self.batchSize: #if batch is full we send it to its worker
+                    self.flush()
+            if time.monotonic() - self.lastFlush >= self.flushInterval: #if frames waited long enough we send the pending batches
+                self.flush()
+
+
+    #method that sends all the pending batches to their workers
+    def flush(self):
+        for index, batch in enumerate(self.batches):
+            if batch:
+                self.inputQueues[index].put(batch)
+                self.batches[index] = []
+        self.lastFlush = time.monotonic()
+
+
+    #method of the collector thread, re-sequences the results of the workers and delivers handled packets in capture order
+    def collect(self):
+        from PacketEngine import PacketRecord, packetClasses, addRecord #import here to avoid circular import
+        pending = {} #results that arrived before all their preceding sequence numbers
+        expectedSequence = 0 #next sequence number to deliver
+        while True:
+            with self.lock: #send pending batches that waited too long, so frames are not stuck when traffic is idle
+                if time.monotonic() - self.lastFlush >= self.flushInterval:
+                    self.flush()
+            try:
+                results = self.outputQueue.get(timeout=self.flushInterval) #get the next batch of results from any worker
+            except Empty:
+                continue
+            if results is None: #if true the pool was closed and all results were delivered
+                break
+            for sequence, result in results:
+                pending[sequence] = result
+            while expectedSequence in pending: #deliver all results that are now in order
+                sequence, result = expectedSequence, pending.pop(expectedSequence)
+                with self.lock:
+                    frame, timestamp, linkType, payload, interface = self.frames.pop(sequence)
+                expectedSequence += 1
+                self.captureEngine.dissectedCount += 1 #count the dissected frame in the pipeline counters
+                if result is None: #if true the frame doesn't match the chosen packet types
+                    self.captureEngine.filteredCount += 1
+                if result is None or self.captureEngine.stopCapture: #if true the frame was filtered or capture was stopped
+                    continue
+                className, srcIp, dstIp, srcPort, dstPort, summary, credentials = result
+                record = addRecord(PacketRecord(None, frame, timestamp, linkType, packetClasses[className], srcIp, dstIp, srcPort, dstPort, summary, payload, credentials, interface)) #insert the record with the next packet id
+                self.captureEngine.deliverPacket(record, sequence) #pass the record to the packet sink of the engine, the sequence number is the position of the frame in a loaded file
+
+
+    #method that sends the remaining frames, waits for all results and stops the workers
+    def close(self):
+        with self.lock:
+            self.flush() #send the remaining frames to the workers
+        while True: #wait until all submitted frames were delivered
+            with self.lock:
+                if not self.frames or not any(worker.is_alive() for worker in self.workers):
+                    break
+            time.sleep(0.05)
+        self.outputQueue.put(None) #tell the collector thread to finish
+        self.collectorThread.join()
+        for inputQueue in self.inputQueues: #tell the workers to finish
+            inputQueue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+
+#----------------------------------------------------DissectionPool-END-----------------------------------------------------#
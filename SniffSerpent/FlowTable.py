@@ -0,0 +1,213 @@
+import struct
+import threading
+from collections import OrderedDict
+from PacketEngine import TCP_Packet
+
+
+#-----------------------------------------------------HELPER-FUNCTIONS------------------------------------------------------#
+#method that finds the transport header of a raw frame, returns a tuple of (ip protocol, offset of transport header, end of ip payload, source address, destination address) or none if its not an ip packet
+#ethernet frames with vlan tags, linux cooked captures and raw ip frames are parsed, ipv6 extension headers and ip fragments other than the first are not
+def getTransportHeader(frame, linkType):
+    if linkType == 1: #ethernet frame
+        if len(frame) < 14:
+            return None
+        etherType, offset = struct.unpack_from('!H', frame, 12)[0], 14 #read the ether type of the frame
+        while etherType in (0x8100, 0x88a8) and len(frame) >= offset + 4: #skip vlan tags
+            etherType, offset = struct.unpack_from('!H', frame, offset + 2)[0], offset + 4
+    elif linkType == 113: #linux cooked capture, the protocol is at the end of its 16 bytes header
+        if len(frame) < 16:
+            return None
+        etherType, offset = struct.unpack_from('!H', frame, 14)[0], 16
+    elif linkType in (12, 101): #raw ip frame, the version is in the first nibble
+        if not frame:
+            return None
+        etherType, offset = 0x0800 if frame[0] >> 4 == 4 else 0x86dd, 0
+    else: #else its a link layer we don't parse
+        return None
+    if etherType == 0x0800 and len(frame) >= offset + 20: #if true its an ipv4 packet
+        headerLength, totalLength = (frame[offset] & 0x0f) * 4, struct.unpack_from('!H', frame, offset + 2)[0] #length of the ipv4 header and the packet
+        if struct.unpack_from('!H', frame, offset + 6)[0] & 0x1fff: #if true its a fragment that doesn't start the transport header
+            return None
+        end = min(len(frame), offset + totalLength) if totalLength >= headerLength else len(frame) #end of the ip payload without ethernet padding
+        return (frame[offset + 9], offset + headerLength, end, frame[offset + 12:offset + 16], frame[offset + 16:offset + 20])
+    if etherType == 0x86dd and len(frame) >= offset + 40: #if true its an ipv6 packet
+        return (frame[offset + 6], offset + 40, min(len(frame), offset + 40 + struct.unpack_from('!H', frame, offset + 4)[0]), frame[offset + 8:offset + 24], frame[offset + 24:offset + 40])
+    return None
+
+
+#method that returns the names of the tcp flags that are set in given flags byte, the same flags TCP_Packet decodes
+def getFlagNames(flags):
+    return [flag for flag, bit in TCP_Packet.flagBits.items() if flags & bit]
+
+#----------------------------------------------------HELPER-FUNCTIONS-END---------------------------------------------------#
+
+#--------------------------------------------------------FlowRecord---------------------------------------------------------#
+#conversation between two endpoints of a 5-tuple, the source is the endpoint that started the conversation (sent the first packet or the SYN)
+class FlowRecord():
+    __slots__ = ('key', 'protocol', 'srcIp', 'srcPort', 'dstIp', 'dstPort', 'forwardPackets', 'forwardBytes', 'reversePackets', 'reverseBytes', 'firstSeen', 'lastSeen', 'forwardFlags', 'reverseFlags', 'flagHistory', 'state', 'firstPacketId', 'lastPacketId') #slots for low memory usage per flow
+    protocolNames = {1: 'ICMP', 2: 'IGMP', 6: 'TCP', 17: 'UDP', 58: 'ICMPv6'} #names of ip protocols
+    historySize = 32 #maximum number of packets kept in the flag history
+    reverseBit = 0x80 #bit of the flag history entries of packets from destination to source
+
+    def __init__(self, key, protocol, srcIp, srcPort, dstIp, dstPort, time, packetId):
+        self.key = key #represents the normalized key of the flow in the flow table
+        self.protocol = protocol #represents the ip protocol of the flow
+        self.srcIp, self.srcPort, self.dstIp, self.dstPort = srcIp, srcPort, dstIp, dstPort #represents the endpoints of the flow
+        self.forwardPackets, self.forwardBytes, self.reversePackets, self.reverseBytes = 0, 0, 0, 0 #represents the packet and byte counts of each direction
+        self.firstSeen, self.lastSeen = time, time #represents the timestamps of the first and last packets
+        self.forwardFlags, self.reverseFlags = 0, 0 #represents all tcp flags seen in each direction
+        self.flagHistory = bytearray() if protocol == 6 else None #represents the tcp flags of the first packets, the reverse bit marks packets from destination to source
+        self.state = 'NEW' if protocol == 6 else 'ACTIVE' #represents the state of tcp flows, other flows are always active
+        self.firstPacketId, self.lastPacketId = packetId, packetId #represents the ids of the first and last packets
+
+
+    #method that accounts a packet of the flow, reverse is true for packets from destination to source, flags are the tcp flags of the packet
+    def update(self, size, time, packetId, reverse, flags=0):
+        if reverse:
+            self.reversePackets += 1
+            self.reverseBytes += size
+            self.reverseFlags |= flags
+        else:
+            self.forwardPackets += 1
+            self.forwardBytes += size
+            self.forwardFlags |= flags
+        self.lastSeen, self.lastPacketId = max(self.lastSeen, time), packetId
+        if self.flagHistory is not None: #if true its a tcp flow so we update its flag history and state
+            if len(self.flagHistory) < self.historySize:
+                self.flagHistory.append((flags & 0x3f) | (self.reverseBit if reverse else 0))
+            self.updateState(flags, reverse)
+
+
+    #method that updates the state of a tcp flow by the flags of a packet
+    def updateState(self, flags, reverse):
+        if self.state in ('RESET', 'CLOSED'): #if true the flow already ended
+            return
+        if flags & TCP_Packet.flagBits['RST']: #a reset ends the flow
+            self.state = 'RESET'
+        elif self.forwardFlags & self.reverseFlags & TCP_Packet.flagBits['FIN']: #if true both endpoints sent FIN
+            self.state = 'CLOSED'
+        elif flags & TCP_Packet.flagBits['FIN']: #one endpoint sent FIN
+            self.state = 'CLOSING'
+        elif flags & TCP_Packet.flagBits['SYN']: #SYN opens the flow and SYN with ACK answers it
+            self.state = 'SYN_RECEIVED' if flags & TCP_Packet.flagBits['ACK'] else 'SYN_SENT'
+        elif flags & TCP_Packet.flagBits['ACK'] and self.state != 'CLOSING': #the handshake finished, or the capture started in the middle of the flow
+            self.state = 'ESTABLISHED'
+
+
+    #method that returns the name of the ip protocol of the flow
+    def getProtocol(self):
+        return self.protocolNames.get(self.protocol, str(self.protocol))
+
+
+    #method that returns the flag history as text, e.g. "-> SYN, <- SYN/ACK, -> ACK"
+    def getFlagHistory(self):
+        return ', '.join(f'{"<-" if entry & self.reverseBit else "->"} {"/".join(getFlagNames(entry)) or "none"}' for entry in self.flagHistory)
+
+
+    #method representing the flow briefly
+    def info(self):
+        return f'{self.getProtocol()} Flow: ({self.srcIp}):({self.srcPort}) <--> ({self.dstIp}):({self.dstPort}) | Packets: {self.forwardPackets + self.reversePackets} | Bytes: {self.forwardBytes + self.reverseBytes} | State: {self.state}'
+
+
+    #method that represents the flow information more deeply
+    def moreInfo(self):
+        output = f'{self.getProtocol()} Flow:\n\n' #add the name of the flow to output
+        output += f'Source: ({self.srcIp}):({self.srcPort})\n\n' #add the endpoints of the flow to output
+        output += f'Destination: ({self.dstIp}):({self.dstPort})\n\n'
+        output += f'State: {self.state}\n\n'
+        output += f'Source To Destination: {self.forwardPackets} packets, {self.forwardBytes} bytes\n\n' #add the counts of each direction to output
+        output += f'Destination To Source: {self.reversePackets} packets, {self.reverseBytes} bytes\n\n'
+        output += f'Duration: {self.lastSeen - self.firstSeen:.6f} seconds\n\n'
+        output += f'First Packet: {self.firstPacketId}, Last Packet: {self.lastPacketId}\n\n'
+        if self.flagHistory is not None: #add the tcp flags of the flow to output
+            output += f'Source Flags: {", ".join(getFlagNames(self.forwardFlags)) or "none"}\n\n'
+            output += f'Destination Flags: {", ".join(getFlagNames(self.reverseFlags)) or "none"}\n\n'
+            output += f'Flag History: {self.getFlagHistory()}\n\n'
+        return output
+
+#------------------------------------------------------FlowRecord-END-------------------------------------------------------#
+
+#---------------------------------------------------------FlowTable---------------------------------------------------------#
+#conversation table of handled packets keyed by the bidirectional 5-tuple, updated in constant time per packet
+#flows are kept in order of their last packet, so idle flows are expired from the front when a packet arrives and memory stays bounded
+class FlowTable():
+    idleTimeout = 120 #time in seconds without packets after which a flow expires, measured by packet timestamps
+    maxFlows = 500000 #maximum number of flows, the longest idle flow is evicted when reached, zero for unlimited
+    flows = None #ordered dictionary of flows by key, the longest idle flow first
+    expiredCount = 0 #number of flows that expired or were evicted
+    lock = None #lock for the flows, packets are added by the capture thread while the GUI reads flows
+
+    def __init__(self, idleTimeout=120, maxFlows=500000):
+        self.idleTimeout = idleTimeout #set the idle timeout
+        self.maxFlows = maxFlows #set the maximum number of flows
+        self.flows = OrderedDict()
+        self.lock = threading.Lock()
+
+
+    #method that returns the number of flows
+    def __len__(self):
+        return len(self.flows)
+
+
+    #method that returns the key of a packet record and true if the packet goes from the higher endpoint to the lower one, none if the packet has no 5-tuple
+    def getKey(self, record):
+        header = getTransportHeader(record.raw, record.linkType) if record.srcIp is not None else None #the ip protocol and transport header of the packet
+        if header is None: #if true the packet isn't an ip packet
+            return None, False
+        source, destination = (record.srcIp, record.srcPort or 0), (record.dstIp, record.dstPort or 0) #endpoints of the packet, packets without ports use port zero
+        if source <= destination: #the key has the lower endpoint first so both directions have the same key
+            return (header[0], *source, *destination), False
+        return (header[0], *destination, *source), True
+
+
+    #method that adds a packet record to its flow and expires idle flows, returns the flow or none if the packet has no 5-tuple
+    def addRecord(self, record):
+        header = getTransportHeader(record.raw, record.linkType) if record.srcIp is not None else None #the ip protocol and transport header of the packet
+        if header is None: #if true the packet isn't an ip packet so it has no flow
+            return None
+        protocol, offset, end = header[:3]
+        flags = record.raw[offset + 13] if protocol == 6 and end >= offset + 14 else 0 #the tcp flags of the packet
+        source, destination = (record.srcIp, record.srcPort or 0), (record.dstIp, record.dstPort or 0) #endpoints of the packet, packets without ports use port zero
+        key = (protocol, *source, *destination) if source <= destination else (protocol, *destination, *source) #the lower endpoint is first so both directions have the same key
+        with self.lock:
+            flow = self.flows.get(key)
+            if flow is None: #if true its a new flow, the sender of the first packet starts it unless its the answer to a SYN
+                if flags & TCP_Packet.flagBits['SYN'] and flags & TCP_Packet.flagBits['ACK']:
+                    source, destination = destination, source
+                flow = self.flows[key] = FlowRecord(key, protocol, *source, *destination, record.time, record.id)
+            else: #else we move the flow to the end of the idle order
+                self.flows.move_to_end(key)
+            flow.update(record.getSize(), record.time, record.id, (record.srcIp, record.srcPort or 0) != (flow.srcIp, flow.srcPort), flags)
+            self.expireFlows(record.time)
+        return flow
+
+
+    #method that removes the flows that were idle for longer than the idle timeout at given time, and the longest idle flows above the maximum number of flows
+    def expireFlows(self, time):
+        while self.flows: #flows are in order of their last packet so we only check the first flow
+            flow = next(iter(self.flows.values()))
+            if time - flow.lastSeen <= self.idleTimeout and (not self.maxFlows or len(self.flows) <= self.maxFlows):
+                break
+            self.flows.popitem(last=False)
+            self.expiredCount += 1
+
+
+    #method that returns the flow of a packet record, none if the packet has no flow or its flow expired
+    def getFlow(self, record):
+        key = self.getKey(record)[0]
+        with self.lock:
+            return self.flows.get(key) if key is not None else None
+
+
+    #method that returns a list of the flows, sorted by given key method if given
+    def getFlows(self, key=None, reverse=False):
+        with self.lock:
+            flows = list(self.flows.values())
+        return sorted(flows, key=key, reverse=reverse) if key is not None else flows
+
+
+    #method that returns the flows with the most bytes
+    def getTopFlows(self, count=10):
+        return self.getFlows(key=lambda flow: flow.forwardBytes + flow.reverseBytes, reverse=True)[:count]
+
+#-------------------------------------------------------FlowTable-END-------------------------------------------------------#
@@ -0,0 +1,237 @@
+import struct
+from scapy.packet import Raw
+from scapy.layers.l2 import Dot1Q, Dot1AD, LLC, ARP, STP
+from scapy.layers.inet import IP, TCP, UDP, ICMP
+from scapy.layers.inet6 import IPv6
+from scapy.layers.dns import DNS
+from scapy.layers.http import HTTP
+from scapy.layers.dhcp import DHCP, BOOTP
+from scapy.layers.tls.all import TLS
+from scapy.contrib.igmp import IGMP
+
+
+#-----------------------------------------------------HELPER-FUNCTIONS------------------------------------------------------#
+#method that compiles the layer bindings of a scapy layer into a list of tuples of (field values, bound layer) in scapy guess order
+def getLayerBindings(layer, fieldNames):
+    bindings = [] #list of compiled bindings of the layer
+    for aliasLayer in layer.aliastypes: #scapy checks the bindings of the layer and its alias layers in this order
+        for fields, payloadLayer in aliasLayer.payload_guess:
+            if not all(field in fieldNames for field in fields): #if true the binding uses a field we don't parse so we can't decide its frames
+                bindings.append((None, payloadLayer))
+            else:
+                bindings.append((tuple(fields.get(field) for field in fieldNames), payloadLayer))
+    return bindings
+
+
+#method that returns the layer scapy guesses for the given parsed field values, none if the binding can't be decided from bytes
+def guessLayer(bindings, values):
+    for fields, payloadLayer in bindings:
+        if fields is None: #if true we can't decide the binding
+            return None
+        if all(field is None or field == value for field, value in zip(fields, values)): #if true all the fields of the binding match
+            return payloadLayer
+    return Raw #else scapy dissects the payload as raw bytes
+
+
+#method that checks if a dispatched scapy class counts as the given layer the same way packet.haslayer does
+def matchesLayer(dispatchedLayer, layer):
+    return issubclass(dispatchedLayer, layer) if dispatchedLayer.match_subclass else dispatchedLayer is layer
+
+
+#method that checks that the ipv4 options only contain options that scapy always dissects, no-operation, end of list and router alert
+def checkIPOptions(options):
+    offset = 0 #offset of current option
+    while offset < len(options):
+        if options[offset] in (0, 1): #end of list and no-operation options are one byte long
+            offset += 1
+        elif options[offset] == 148 and options[offset + 1:offset + 2] == b'\x04': #router alert option is four bytes long
+            offset += 4
+        else: #else its an option we don't check
+            return False
+    return offset == len(options)
+
+#----------------------------------------------------HELPER-FUNCTIONS-END---------------------------------------------------#
+
+#-----------------------------------------------------PacketClassifier------------------------------------------------------#
+#classifier that reads ethertype, ip protocol, ports and the validity bytes of TLS, DHCP and IGMP straight from the raw frame
+#it picks the same handle method that classifyPacket would pick on the dissected packet, or drops the frame, before scapy builds any object
+#frames it can't decide with certainty, e.g. fragments, ICMP errors, tunnels or unusual headers, are left for the scapy path
+class PacketClassifier():
+    DROP = 0 #classification result for frames that no packet type of the filter matches
+    UNSURE = 1 #classification result for frames that must be dissected by scapy to be classified
+    dhcpMagic = b'\x63\x82\x53\x63' #magic cookie that starts the DHCP options of a BOOTP packet
+    packetFilter = None #dictionary of packet layers and their handle methods in priority order
+    validParameters = None #dictionary of layers and the values their handle methods accept, same lists as in the handle methods
+    etherBindings = None #compiled layer bindings of ethernet and vlan headers by type
+    llcBindings = None #compiled layer bindings of LLC headers by dsap, ssap and control
+    ipBindings = None #compiled layer bindings of ipv4 headers by protocol and fragment offset
+    ipv6Bindings = None #compiled layer bindings of ipv6 headers by next header
+    tcpBindings = None #compiled layer bindings of tcp ports
+    udpBindings = None #compiled layer bindings of udp ports
+
+    def __init__(self, packetFilter):
+        self.packetFilter = packetFilter #set the packet filter for classification
+        self.validParameters = {TLS: (22,), DHCP: (1, 2, 3, 5, 7, 8), IGMP: (17, 18, 22, 23)}
+        self.etherBindings = getLayerBindings(Dot1Q, ('type',)) #dot1q bindings include the ethernet bindings as alias
+        self.llcBindings = getLayerBindings(LLC, ('dsap', 'ssap', 'ctrl'))
+        self.ipBindings = getLayerBindings(IP, ('proto', 'frag'))
+        self.ipv6Bindings = getLayerBindings(IPv6, ('nh',))
+        self.tcpBindings = getLayerBindings(TCP, ('sport', 'dport'))
+        self.udpBindings = getLayerBindings(UDP, ('sport', 'dport'))
+
+
+    #method that classifies a raw frame, returns a tuple of (layer, handle method), DROP or UNSURE
+    def classify(self, frame, linkType):
+        layers = self.getLayers(frame, linkType) if linkType == 1 else None #we only parse ethernet frames
+        if layers is None: #if true the frame must be dissected by scapy
+            return self.UNSURE
+        for layer, handler in self.packetFilter.items(): #the first layer of the filter that the frame has decides, like in classifyPacket
+            if layer in layers:
+                valid = layers[layer] #validity of the layer for its handle method, true if the handle method accepts every such packet
+                if valid is None: #if true we couldn't read the value the handle method checks
+                    return self.UNSURE
+                return (layer, handler) if valid else self.DROP
+        return self.DROP
+
+
+    #method that parses the raw ethernet frame, returns a dictionary of filter layers that scapy would dissect and their validity, none if unsure
+    def getLayers(self, frame, linkType):
+        if len(frame) < 14: #if true the ethernet header is truncated
+            return None
+        etherType = struct.unpack_from('!H', frame, 12)[0] #read the ether type of the frame
+        if etherType <= 1500: #if true its an 802.3 frame with LLC header
+            return self.getLLCLayers(frame[14:14 + etherType])
+        offset, layer = 14, guessLayer(self.etherBindings, (etherType,)) #offset of the payload and the layer scapy dissects it with
+        while layer in (Dot1Q, Dot1AD): #skip vlan tags
+            if len(frame) < offset + 4:
+                return None
+            etherType, offset = struct.unpack_from('!H', frame, offset + 2)[0], offset + 4
+            if etherType <= 1500: #if true the vlan payload is an LLC frame which we leave for scapy
+                return None
+            layer = guessLayer(self.etherBindings, (etherType,))
+        payload = frame[offset:] #the payload of the ethernet header
+        if layer is Raw or not payload: #if true scapy dissects no more layers
+            return {}
+        if layer is ARP: #ARP frames only have the ARP layer, we make sure it is an ethernet ipv4 ARP that scapy always dissects
+            return {ARP: True} if payload[:6] == b'\x00\x01\x08\x00\x06\x04' and len(payload) >= 28 else None
+        if layer is IP:
+            return self.getIPLayers(payload)
+        if layer is IPv6:
+            return self.getIPv6Layers(payload)
+        return None #else its a layer we don't parse
+
+
+    #method that parses the LLC header of an 802.3 frame
+    def getLLCLayers(self, payload):
+        if not payload: #if true scapy dissects no more layers
+            return {}
+        if len(payload) < 3: #if true the LLC header is truncated
+            return None
+        layer = guessLayer(self.llcBindings, (payload[0], payload[1], payload[2])) #the layer of the LLC payload
+        if layer is Raw or len(payload) == 3: #if true scapy dissects no more layers
+            return {}
+        if layer is STP and len(payload) >= 38: #if true its a complete STP bridge protocol data unit
+            return {STP: True}
+        return None #else its SNAP or a truncated STP frame which we leave for scapy
+
+
+    #method that parses the ipv4 header and its payload
+    def getIPLayers(self, packet):
+        if len(packet) < 20 or packet[0] >> 4 != 4: #if true the ipv4 header is truncated or malformed
+            return None
+        headerLength = (packet[0] & 0x0f) * 4 #length of the ipv4 header
+        if headerLength < 20 or len(packet) < headerLength or (headerLength > 20 and not checkIPOptions(packet[20:headerLength])):
+            return None
+        totalLength, fragment, protocol = struct.unpack_from('!H2xHxB', packet, 2) #read total length, flags with fragment offset and protocol
+        if fragment & 0x3fff: #if true its a fragment, scapy only dissects the transport layer of the first fragment so we leave it for scapy
+            return None
+        payload = packet[headerLength:totalLength] if totalLength >= headerLength else packet[headerLength:] #the payload without ethernet padding
+        layer = guessLayer(self.ipBindings, (protocol, 0)) #the layer of the ipv4 payload
+        if layer is Raw or not payload: #if true scapy dissects no more layers
+            return {}
+        if layer is TCP:
+            return self.getTCPLayers(payload)
+        if layer is UDP:
+            return self.getUDPLayers(payload)
+        if layer is ICMP:
+            if len(payload) < 8 or payload[0] in (3, 4, 5, 11, 12): #ICMP errors quote the original packet which scapy dissects too
+                return None
+            return {ICMP: True}
+        if layer is IGMP:
+            if len(payload) < 8 or not matchesLayer(IGMP.dispatch_hook(payload), IGMP): #if true scapy may not dissect an IGMP layer
+                return None
+            return {IGMP: payload[0] in self.validParameters[IGMP]}
+        return None #else its a tunnel or a layer we don't parse
+
+
+    #method that parses the ipv6 header and its payload
+    def getIPv6Layers(self, packet):
+        if len(packet) < 40 or packet[0] >> 4 != 6: #if true the ipv6 header is truncated or malformed
+            return None
+        payloadLength, nextHeader = struct.unpack_from('!HB', packet, 4) #read payload length and next header
+        if payloadLength == 0: #if true its a jumbogram or an empty packet which we leave for scapy
+            return None
+        payload = packet[40:40 + payloadLength] #the payload without ethernet padding
+        layer = guessLayer(self.ipv6Bindings, (nextHeader,)) #the layer of the ipv6 payload
+        if layer is TCP:
+            return self.getTCPLayers(payload)
+        if layer is UDP:
+            return self.getUDPLayers(payload)
+        return None #else its an extension header, ICMPv6 or a tunnel which we leave for scapy
+
+
+    #method that parses the tcp header and its payload
+    def getTCPLayers(self, segment):
+        if len(segment) < 20: #if true the tcp header is truncated
+            return None
+        headerLength = (segment[12] >> 4) * 4 #length of the tcp header
+        if headerLength < 20 or len(segment) < headerLength:
+            return None
+        layers = {TCP: True} #the tcp segment always has the TCP layer
+        payload = segment[headerLength:] #the payload of the tcp segment
+        if not payload: #if true scapy dissects no more layers
+            return layers
+        layer = guessLayer(self.tcpBindings, struct.unpack_from('!HH', segment)) #the layer of the payload by source and destination ports
+        if layer is DNS: #DNS over tcp is only dissected if the length prefix is valid, scapy checks it in DNS pre_dissect
+            if len(payload) >= 2 and len(payload) >= struct.unpack_from('!H', payload)[0] >= 14:
+                layers[DNS] = True
+        elif layer is HTTP: #HTTP payloads that look like HTTP/2 frames are dissected as HTTP/2
+            if matchesLayer(HTTP.dispatch_hook(payload), HTTP):
+                layers[HTTP] = True
+        elif layer is TLS: #TLS payloads that aren't complete TLS records are dissected as SSLv2, fragments or encrypted content
+            if matchesLayer(TLS.dispatch_hook(payload), TLS):
+                layers[TLS] = payload[0] in self.validParameters[TLS]
+        elif layer is not Raw: #else its a layer we don't parse
+            return None
+        return layers
+
+
+    #method that parses the udp header and its payload
+    def getUDPLayers(self, datagram):
+        if len(datagram) < 8: #if true the udp header is truncated
+            return None
+        sport, dport, length = struct.unpack_from('!HHH', datagram) #read ports and length
+        if length < 8: #if true the udp length is malformed
+            return None
+        layers = {UDP: True} #the udp datagram always has the UDP layer
+        payload = datagram[8:length] #the payload without ethernet padding
+        if not payload: #if true scapy dissects no more layers
+            return layers
+        layer = guessLayer(self.udpBindings, (sport, dport)) #the layer of the payload by source and destination ports
+        if layer is DNS:
+            layers[DNS] = True
+        elif layer is BOOTP: #BOOTP packets with the magic cookie and options are dissected as DHCP
+            if len(payload) > 240 and payload[236:240] == self.dhcpMagic:
+                layers[DHCP] = self.getDHCPValidity(payload[240:])
+        elif layer is not Raw: #else its a layer we don't parse
+            return None
+        return layers
+
+
+    #method that returns the validity of DHCP options for handleDHCP, which checks the value of the first option, none if unsure
+    def getDHCPValidity(self, options):
+        if len(options) >= 3 and options[0] == 53 and options[1] == 1: #if true the first option is the DHCP message type
+            return options[2] in self.validParameters[DHCP]
+        return None #else the first option is parsed differently by scapy so we leave it for scapy
+
+#---------------------------------------------------PacketClassifier-END----------------------------------------------------#
@@ -0,0 +1,1849 @@
+import sys
+import time
+import logging
+import threading
+logging.getLogger('scapy.runtime').setLevel(logging.ERROR)
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from scapy.config import conf
+from scapy.error import Scapy_Exception
+from scapy.arch.common import compile_filter
+from scapy.interfaces import get_if_list
+from scapy.utils import RawPcapWriter
+from scapy.packet import Packet, Raw, NoPayload
+from scapy.layers.l2 import ARP, STP
+from scapy.layers.inet import IP, TCP, UDP, ICMP
+from scapy.layers.inet6 import IPv6
+from scapy.layers.dns import DNS
+from scapy.layers.http import HTTP, HTTPRequest, HTTPResponse
+from scapy.layers.dhcp import DHCP, BOOTP
+from scapy.layers.tls.all import TLS, TLSClientHello, TLSServerHello, TLSClientKeyExchange, TLSServerKeyExchange, TLSNewSessionTicket
+from scapy.contrib.igmp import IGMP
+from CaptureBackends import createBackend
+from DissectionPool import DissectionPool
+from PacketClassifier import PacketClassifier
+from array import array
+from bisect import bisect_left
+from PcapIO import PcapFileReader, PcapIndex
+from CredentialExtractor import credentialExtractor
+
+
+#---------------------------------------------------------LayerMap----------------------------------------------------------#
+#map of the layers of a dissected packet by layer class with the fields every packet type renders, built with one walk over the layers
+#haslayer and packet[layer] walk the layers again on each call and rendering a packet needs dozens of them, so packet types read the map instead
+#layers are visited in the order of scapy's getlayer, including packets inside fields like tls messages, and the first layer of each class is kept
+class LayerMap():
+    __slots__ = ('layers', 'srcMac', 'dstMac', 'srcPort', 'dstPort', 'checksum', 'size', 'packet') #slots for low memory usage per packet
+
+    def __init__(self, packet):
+        self.layers = {} #dictionary of the first layer of each layer class
+        self.srcMac, self.dstMac, self.srcPort, self.dstPort, self.checksum, self.size = None, None, None, None, None, None
+        self.packet = packet #represents the dissected packet for its size
+        self.addLayers(packet, False)
+        layer = packet
+        while not isinstance(layer, NoPayload): #the first layers of the payload chain with these fields, like packet.src, packet.sport and packet.chksum
+            fieldNames = layer.fieldtype
+            if self.srcMac is None and 'src' in fieldNames:
+                self.srcMac, self.dstMac = layer.src, getattr(layer, 'dst', None)
+            if self.srcPort is None and 'sport' in fieldNames:
+                self.srcPort, self.dstPort = layer.sport, layer.dport
+            if self.checksum is None and 'chksum' in fieldNames:
+                self.checksum = layer.chksum
+            layer = layer.payload
+
+
+    #method that adds the layers of a packet and the packets in its fields to the map
+    #like haslayer, layers that match subclasses (e.g. IGMP_MQ matches IGMP) and all layers after them are also kept by their base classes
+    def addLayers(self, layer, subclasses):
+        while not isinstance(layer, NoPayload):
+            subclasses = subclasses or layer.match_subclass
+            for layerClass in (type(layer).__mro__ if subclasses else (type(layer),)):
+                self.layers.setdefault(layerClass, layer)
+            for field in layer.packetfields: #packets inside fields, e.g. tls handshake messages and dns records
+                values = layer.getfieldval(field.name)
+                for value in (values if field.islist else (values,)) if values is not None else ():
+                    if isinstance(value, Packet):
+                        self.addLayers(value, subclasses)
+            layer = layer.payload
+
+
+    #method that checks if packet has a layer, like packet.haslayer(layerClass)
+    def __contains__(self, layerClass):
+        return layerClass in self.layers
+
+
+    #method that returns the first layer of a layer class, like packet[layerClass]
+    def __getitem__(self, layerClass):
+        return self.layers[layerClass]
+
+
+    #method that returns the first layer of a layer class or none
+    def get(self, layerClass):
+        return self.layers.get(layerClass)
+
+
+    #method that returns the ip layer of the packet, ipv4 before ipv6, none if there's no ip layer
+    def getIPLayer(self):
+        return self.layers.get(IP) or self.layers.get(IPv6)
+
+
+    #method that returns the size of the packet, the packet is built once for its length
+    def getSize(self):
+        if self.size is None:
+            self.size = len(self.packet)
+        return self.size
+
+
+#method that returns the layer map of a dissected packet, the map is kept in the packet so classifying and rendering share it
+def getLayerMap(packet):
+    layerMap = packet.__dict__.get('layerMap') #read the map directly, getattr of a missing attribute walks all layers of the packet
+    if layerMap is None:
+        layerMap = packet.layerMap = LayerMap(packet)
+    return layerMap
+
+#-------------------------------------------------------LayerMap-END--------------------------------------------------------#
+
+#------------------------------------------------------Default_Packet-------------------------------------------------------#
+class Default_Packet(ABC): #abstarct class for default packet
+    name = None #represents the packet name
+    packet = None #represents the packet object itself for our use later
+    layers = None #represents the layer map of the packet, layers and common fields are looked up in it instead of walking the packet
+    packetType = None #represents the packet type based on scapy known types
+    id = None #represents the id for the packet object, for ease of use in dictionary later
+    credentials = None #represents the login credentials of the packet once they were searched, both info and moreInfo of http packets need them
+
+    def __init__(self, name=None, packet=None, id=None): #ctor for default packet 
+        self.name = name
+        self.packet = packet
+        self.layers = getLayerMap(packet)
+        self.id = id
+        
+
+    #get method for id
+    def getId(self): 
+        return self.id #return the id 
+    
+
+    #set method for packet type
+    def setPacketType(self, packetType): 
+        self.packetType = packetType
+
+
+    #get method for packet object
+    def getPacket(self):
+        return self.packet #return the packet object
+    
+
+    #method for raw info capture
+    def rawInfo(self):
+        output = ''
+        if Raw in self.layers: #insert payload data (if available)
+            payload = self.layers[Raw].load #get payload data from packet
+            output += f'Payload Data: {payload.hex()}\n\n' #insert payload as hexadecimal
+        return output
+    
+
+    #method that handles a long string and makes it fit in the GUI 
+    def fitStr(self, st, info): 
+        output = ''
+        if info is not None: #if info not none we continue
+            if isinstance(info, list): #if given info is list we convert it to utf-8 string
+                info = ', '.join(item.decode('utf-8', 'replace') if isinstance(item, bytes) else str(item) for item in info) #decode the list into string
+            elif isinstance(info, bytes): #if given info is byte we convert it to utf-8 string
+                info = info.decode('utf-8', 'replace') #decode the byte to string
+            info = info.rstrip('.') #remove trailing dot if present
+            if len(info) >= 52: #if the string is longer then specified length we add a new line
+                temp = '\n'.join(info[i:i+52] for i in range(0, len(info), 52)) #iterating over the string and adding new line after specified amount of characters
+                output += f'{st}\n{temp}\n\n' #insert to the output 
+            elif len(f'{st}: {info}') >= 52: #if the info string and st string togther exceed the specified characters we add new line
+                output += f'{st}\n{info}\n\n' #insert to the output
+            else: #else info and st strings are not exceeding the specifed amount of characters
+                output += f'{st} {info}\n\n' #we add the original info and st strings to the output without a new line
+        else: #else info is none
+            output += f'{st} {info}\n\n' #add to output the value with none value 
+        return output
+
+
+    #method for retrieving login credentials from http packet, the request is searched once and the result is kept
+    #the raw request is searched by the credential extractor, which finds credentials in form bodies, query strings, json bodies and basic authorization
+    def loginInfo(self):
+        if self.credentials is None: #if true we didn't search the request yet
+            self.credentials = credentialExtractor.extract(self.layers[HTTPRequest].original or bytes(self.layers[HTTPRequest])) if HTTPRequest in self.layers else credentialExtractor.noCredentials #search the raw bytes of the request
+        return self.credentials
+
+
+    #method for ip configuration capture
+    def ipInfo(self): 
+        output = ''
+        if IP in self.layers: #if packet has ip layer
+            srcIp = self.layers[IP].src #represents the source ip
+            dstIp = self.layers[IP].dst #represents the destination ip
+            ttl = self.layers[IP].ttl #represents ttl parameter in packet
+            dscp = self.layers[IP].tos #represents dscp parameter in packet
+            output += self.fitStr('Source IP:', srcIp) #insert source ip to output
+            output += self.fitStr('Destination IP:', dstIp) #insert denstination ip to output
+            output += f'TTL: {ttl}, DSCP: {dscp}\n\n' #add both to output
+        elif IPv6 in self.layers: #if packet has ipv6 layer
+            srcIp = self.layers[IPv6].src #represents the source ip
+            dstIp = self.layers[IPv6].dst #represents the destination ip
+            hopLimit = self.layers[IPv6].hlim #represents the hop limit parameter in packet
+            trafficClass = self.layers[IPv6].tc #represnets the traffic class in packet
+            output += self.fitStr('Source IP:', srcIp) #insert source ip to output
+            output += self.fitStr('Destination IP:', dstIp) #insert denstination ip to output
+            output += f'Hop Limit: {hopLimit}, Traffic Class: {trafficClass}\n\n' #add them both to output
+        if self.layers.checksum is not None and IGMP not in self.layers: #if packet has checksum parameter (IGMP has its own)
+            output += f'Checksum: {self.layers.checksum}\n\n' #we add the checksum to output
+        output += f'Packet Size: {self.layers.getSize()} bytes\n\n' #add the packet size to output
+        return output
+
+
+    #method representing the packet briefly, derived classes may need to implement for different types
+    def info(self): 
+        output = '' #output string for information of packet
+        srcMac = self.layers.srcMac #represents the source mac address
+        dstMac = self.layers.dstMac #represents the destination mac address
+        srcPort = '' #source port of packet
+        dstPort = '' #destination port of packet
+        packetSize = self.layers.getSize() #size of the packet
+
+        if TCP in self.layers or UDP in self.layers: #if packet is tcp or udp we get port info
+            srcPort = self.layers.srcPort #represents the source port of packet
+            dstPort = self.layers.dstPort #represents the destination port of packet
+            if IP in self.layers: #if packet have ip address so we print the packet info with ip and port
+                srcIp = self.layers[IP].src #represents the source ip of packet
+                dstIp = self.layers[IP].dst #represents the destination ip of packet
+                output += f'{self.name} Packet: ({srcIp}):({srcPort}) --> ({dstIp}):({dstPort})' #insert info to output
+            elif IPv6 in self.layers: #if packet have ipv6 address so we print the packet info with ip and port
+                srcIp = self.layers[IPv6].src #represents the source ip of packet
+                dstIp = self.layers[IPv6].dst #represents the destination ip of packet
+                output += f'{self.name} Packet: ({srcIp}):({srcPort}) --> ({dstIp}):({dstPort})' #insert info to output
+            else: #else no ip layer 
+                output += f'{self.name} Packet: ({srcMac}):({srcPort}) --> ({dstMac}):({dstPort})' #insert info without ip to output
+        if HTTP in self.layers and (HTTPResponse in self.layers or HTTPRequest in self.layers): #if true packet is http
+            if HTTPRequest in self.layers and self.loginInfo(): #if true it means we have a login request http packet (with username and password)
+                output += ' Type: Login Request' #add http login request type to ouput
+            else: #else its a regular request or response http packet
+                output += f' Type: {"Response" if HTTPResponse in self.layers else "Request"}' #add http type, response or request
+        if DHCP in self.layers: #if packet is DHCP 
+            output += ' Type: Discover' if self.layers[DHCP].options[0][1] == 1 else '' #add type if discover
+            output += ' Type: Offer' if self.layers[DHCP].options[0][1] == 2 else '' #add type if offer
+            output += ' Type: Request' if self.layers[DHCP].options[0][1] == 3 else '' #add type if request
+            output += ' Type: Acknowledge' if self.layers[DHCP].options[0][1] == 5 else '' #add type if acknowledge
+            output += ' Type: Release' if self.layers[DHCP].options[0][1] == 7 else '' #add type if release
+            output += ' Type: Info' if self.layers[DHCP].options[0][1] == 8 else '' #add type if info
+        output += f' | Size: {packetSize} bytes' #insert packet size to output
+        return output
+
+
+    #method that represents the packet information more deeply, for derived classes to implement further
+    def moreInfo(self):
+        output = '' #output string for info
+        if TCP in self.layers or UDP in self.layers: #if packet is tcp or udp
+            output += f'{self.name} Packet:\n\n' #insert packet name to output
+            output += f'Source Port: {self.layers.srcPort}\n\n' #insert source port to output
+            output += f'Destination Port: {self.layers.dstPort}\n\n' #insert destination port to output
+        else: #else its other packet type
+            output += f'{self.name} Packet:\n\n' #insert packet name to output
+            output += f'Source MAC: {self.layers.srcMac}\n\n' #insert packet source mac address
+            output += f'Destination MAC: {self.layers.dstMac}\n\n' #insert packet destination mac address
+        output += self.ipInfo() #call ip method to add neccessary info if ip layer is present
+        return output
+
+#----------------------------------------------------Default_Packet-END-----------------------------------------------------#
+
+#-----------------------------------------------------------TCP-------------------------------------------------------------#
+class TCP_Packet(Default_Packet):
+    flagBits = {'FIN': 0x01, 'SYN': 0x02, 'RST': 0x04, 'PSH': 0x08, 'ACK': 0x10, 'URG': 0x20} #tcp flags we decode and their bits, FIN is 0x01(0001 in binary) up to URG 0x20(0010 0000 in binary)
+
+    def __init__(self, packet=None, id=None): #ctor for tcp packet
+        super().__init__('TCP', packet, id) #call parent ctor
+        if TCP in self.layers: #checks if packet is TCP
+            self.packetType = TCP #specify the packet type
+
+
+    #method for packet information
+    def moreInfo(self): 
+        output = f'{super().moreInfo()}' #call parent moreInfo method
+        #prints TCP flags
+        flags = self.layers[self.packetType].flags #tcp has flags, we extract the binary number that represents the flags
+        flagsDict = {flag: (flags & bit) != 0 for flag, bit in self.flagBits.items()} #we extract each flag of tcp with '&' operator with its bit
+
+        output += f'Sequence Number: {self.layers[TCP].seq}\n\n' #add the sequence number to output
+        output += f'Acknowledgment Number: {self.layers[TCP].ack}\n\n' #add the acknowledgment number to output
+        output += f'Window Size: {self.layers[TCP].window} bytes\n\n' #add window size parameter to output
+        output += 'Flags:\n' #add the flags to output
+        temp = '' #temp string for our use 
+        for flag, value in flagsDict.items(): #iteration over the flags in tcp packet
+            if flag == 'ACK': #if flag is ACK we add new line for clean gui representation
+                temp += '\n' #add new line to temp
+            temp += f'{flag}: {value}, ' #add the current flag with its value
+        output += temp.rstrip(', ') #finally insert the flags to output 
+        output += '\n\n'
+        if self.layers[self.packetType].options: #add TCP Options (if available)
+            output += 'TCP Options:\n' #insert the tcp options to output
+            temp = '' #initializing temp to an empty string
+            for option in self.layers[self.packetType].options: #iteration over the options list
+                temp += f'{option[0]}: {option[1]}, ' #add the options to temp
+            output += temp.rstrip(', ') #strip the output for leading comma
+            output += '\n\n'
+        return output
+
+#---------------------------------------------------------TCP-END-----------------------------------------------------------#
+
+#-----------------------------------------------------------UDP-------------------------------------------------------------#
+class UDP_Packet(Default_Packet):
+    def __init__(self, packet=None, id=None): #ctor 
+        super().__init__('UDP', packet, id) #call parent ctor
+        if UDP in self.layers: #checks if packet is UDP
+            self.packetType = UDP #add packet type
+
+
+#---------------------------------------------------------UDP-END-----------------------------------------------------------#
+
+#-----------------------------------------------------------HTTP------------------------------------------------------------#
+class HTTP_Packet(Default_Packet):
+    def __init__(self, packet=None, id=None):
+        super().__init__('HTTP', packet, id) # call parent ctor
+        if HTTP in self.layers: #checks if packet is HTTP
+            self.packetType = HTTP #add packet type
+
+
+    #method for packet information
+    def moreInfo(self):
+        output = super().moreInfo() #call parent moreInfo method
+        if HTTP in self.layers: #if packet has HTTP layer
+            httpPacket = self.layers[HTTP] #set the http packet
+            headers = {} #set headers to be an empty dictionary
+            if HTTPResponse in self.layers: #if packet is http response
+                httpPacket = self.layers[HTTPResponse] #set the packet as http response
+            elif HTTPRequest in self.layers: #if packet is http request
+                httpPacket = self.layers[HTTPRequest] #set the packet as http request
+            
+            if HTTPResponse in self.layers or HTTPRequest in self.layers: #if http packets is response or request
+                for field in httpPacket.fields_desc: #iterating over fields desc list to retrive the headers dictionary
+                    fieldName = field.name #field name of packet
+                    fieldValue = getattr(httpPacket, fieldName) #field value of packet
+                    if isinstance(fieldValue, bytes): #if field value is byte we decode it
+                        fieldValue = fieldValue.decode() #decode field name byte
+                    headers[fieldName] = fieldValue #finally we add field value to headers dictionary
+
+            if HTTPResponse in self.layers: #if the packet is response
+                httpVersion = headers.get('Http_Version') #get the http version of packet
+                statusCode = httpPacket.Status_Code.decode() #get the status code of response packet
+                contentLength = headers.get('Content_Length') #get the content length of response packet
+                server = headers.get('Server') #get the server of response packet
+                output += 'Type: Response\n\n' #add type of packet to output
+                output += f'HTTP Version: {httpVersion}\n\n' #add http version to output
+                output += f'Status Code: {statusCode}\n\n' #add status code to output
+                output += f'Content Length: {contentLength} bytes\n\n' #add content length to output
+                output += self.fitStr('Server:', server) #add server of packet to output
+
+            elif HTTPRequest in self.layers: #if the packet is request
+                httpLogin = self.loginInfo() #call loginInfo method to get login credentials (if available)
+                httpVersion = headers.get('Http_Version') #get the http version of packet
+                method = httpPacket.Method.decode() #get the method name of request packet
+                url = httpPacket.Host.decode() + httpPacket.Path.decode() #get the url of the request packet
+                accept = headers.get('Accept') #get the accept info of request
+                referer = headers.get('Referer') #get the referer of request
+                output += 'Type: Login Request\n\n' if httpLogin else 'Type: Request\n\n' #add type of packet to output based on http info
+                output += f'HTTP Version: {httpVersion}\n\n' #add http version to output
+                output += f'Method: {method}\n\n' #add method to output
+                output += self.fitStr('URL:', url) #add url to output
+                if httpLogin: #if true we have captured login information
+                    output += 'Login Credentials:\n\n' #add login credentials to output
+                    output += self.fitStr('Username:', httpLogin['username']) #add usernname from our httpLogin dict
+                    output += self.fitStr('Password:', httpLogin.get('password')) #add password from our httpLogin dict, a username may be sent without password
+                output += self.fitStr('Accept:', accept) #add accept to output
+                output += self.fitStr('Referer:', referer) #add referer to output
+        return output
+    
+#---------------------------------------------------------HTTP-END----------------------------------------------------------#
+
+#-----------------------------------------------------------DNS-------------------------------------------------------------#
+class DNS_Packet(Default_Packet):
+    DNSRecordTypes = {
+        1: 'A', 28: 'AAAA', 18: 'AFSDB', 42: 'APL', 257: 'CAA', 60: 'CDNSKEY', 59: 'CDS', 37: 'CERT', 5: 'CNAME', 62: 'CSYNC',
+        49: 'DHCID', 32769: 'DLV', 39: 'DNAME', 48: 'DNSKEY', 43: 'DS', 108: 'EUI48', 109: 'EUI64', 13: 'HINFO', 55: 'HIP',
+        65: 'HTTPS', 45: 'IPSECKEY', 25: 'KEY', 36: 'KX', 29: 'LOC', 15: 'MX', 35: 'NAPTR', 2: 'NS', 47: 'NSEC', 50: 'NSEC3',
+        51: 'NSEC3PARAM', 61: 'OPENPGPKEY', 12: 'PTR', 17: 'RP', 46: 'RRSIG', 24: 'SIG', 53: 'SMIMEA', 6: 'SOA', 33: 'SRV',
+        44: 'SSHFP', 64: 'SVCB', 32768: 'TA', 249: 'TKEY', 52: 'TLSA', 250: 'TSIG', 16: 'TXT', 256: 'URI', 63: 'ZONEMD', 255: 'ANY'}
+    
+    DNSClassTypes = {1: 'IN', 2: 'CS', 3: 'CH', 4: 'HS', 255: 'ANY', 254: 'NONE', 32769: 'DLV'}
+
+    def __init__(self, packet=None, id=None):
+        super().__init__('DNS', packet, id) #call parent ctor
+        if DNS in self.layers: #checks if packet is DNS
+            self.packetType = DNS #add packet type
+
+
+    #method for brief packet information
+    def info(self):
+        output = '' #output string for information of packet
+        dnsPacket = self.layers[DNS] #parameter for dns packet
+        srcMac = self.layers.srcMac #representst the source mac address
+        dstMac = self.layers.dstMac #represents the destination mac address
+        srcIp = '' #represents the source ip address
+        dstIp = '' #represents the destination ip address
+        srcPort = '' #represents the source port
+        dstPort = '' #represents the destination port
+        packetSize = self.layers.getSize() #represenets the packet size
+
+        if TCP in self.layers or UDP in self.layers: #if dns packet transmitted through tcp or udp 
+            srcPort = self.layers.srcPort #set the source port
+            dstPort = self.layers.dstPort #set the destination port
+            if IP in self.layers: #if packet has ip layer
+                srcIp = self.layers[IP].src #set the source ip
+                dstIp = self.layers[IP].dst #set the destination ip
+                output += f'{self.name} Packet: ({srcIp}):({srcPort}) --> ({dstIp}):({dstPort})' #add the info with ip to output
+            elif IPv6 in self.layers: #else packet has ipv6 layer
+                srcIp = self.layers[IPv6].src #set the source ip
+                dstIp = self.layers[IPv6].dst #set the destination ip
+                output += f'{self.name} Packet: ({srcIp}):({srcPort}) --> ({dstIp}):({dstPort})' #add the info with ip to output
+            else: #else no ip layer 
+                output += f'{self.name} Packet: ({srcMac}):({srcPort}) --> ({dstMac}):({dstPort})' #insert info without ip to output
+
+        output += f' Type: {"Response" if dnsPacket.qr else "Request"}' #add the dns type, response or request
+        
+        if dnsPacket.an: #check if its response packet
+            dnsResponseType = self.DNSRecordTypes[dnsPacket.an.type] if dnsPacket.an.type in self.DNSRecordTypes else dnsPacket.an.type #represents dns record type based on the DNSRecordTypes dictionary
+            output += f' {dnsResponseType}' #add response record type
+        elif dnsPacket.qd: #else we check if its request packet
+            dnsRequestType = self.DNSRecordTypes[dnsPacket.qd.qtype] if dnsPacket.qd.qtype in self.DNSRecordTypes else dnsPacket.qd.qtype #represents dns record type based on the DNSRecordTypes dictionary
+            output += f' {dnsRequestType}' #add request record type
+            
+        output += f' | Size: {packetSize} bytes' #add the size of the packet
+        return output
+
+
+    #method for packet information
+    def moreInfo(self):
+        output = super().moreInfo() #call parent moreInfo method
+        if DNS in self.layers: #if packet has DNS layer
+            dnsPacket = self.layers[DNS] #save the dns packet in parameter
+            output += f'ID: {dnsPacket.id}\n\n' #id of the dns packet
+            if dnsPacket.qr == 1: #means its a response packet
+                if dnsPacket.an: #if dns packet is response packet
+                    dnsResponseType = self.DNSRecordTypes[dnsPacket.an.type] if dnsPacket.an.type in self.DNSRecordTypes else dnsPacket.an.type #represents dns record type based on the DNSRecordTypes dictionary
+                    dnsResponseClass = self.DNSClassTypes[dnsPacket.an.rclass] if dnsPacket.an.rclass in self.DNSClassTypes else dnsPacket.an.rclass #represents dns class type based on the DNSClassTypes dictionary
+                    output += f'Type: Response\n\n' #add type of packet to output
+                    output += self.fitStr('Response Name:', dnsPacket.an.rrname) #add repsonse name to output
+                    output += f'Response Type: {dnsResponseType}, ' #add response type to output
+                    output += f'Response Class: {dnsResponseClass}\n\n' #add response class to output
+                    output += f'Num Responses: {len(dnsPacket.an)}\n\n' #add number of responses to output
+                    if hasattr(dnsPacket.an, 'rdata'): #check if rdata attribute exists
+                        output += self.fitStr('Response Data:', dnsPacket.an.rdata) #specify the rdata parameter
+            else: #means its a request packet
+                if dnsPacket.qd:
+                    dnsRequestType = self.DNSRecordTypes[dnsPacket.qd.qtype] if dnsPacket.qd.qtype in self.DNSRecordTypes else dnsPacket.qd.qtype #represents dns record type based on the DNSRecordTypes dictionary
+                    dnsRequestClass = self.DNSClassTypes[dnsPacket.qd.qclass] if dnsPacket.qd.qclass in self.DNSClassTypes else dnsPacket.qd.qclass #represents dns class type based on the DNSClassTypes dictionary
+                    output += f'Type: Request\n\n' #add type of packet to output
+                    output += self.fitStr('Request Name:', dnsPacket.qd.qname) #add request name to output
+                    output += f'Request Type: {dnsRequestType}, ' #add request type to output
+                    output += f'Request Class: {dnsRequestClass}\n\n' #add request class to output
+                    output += f'Num Requests: {len(dnsPacket.qd)}\n\n' #add num of requests to output
+        return output
+    
+#---------------------------------------------------------DNS-END-----------------------------------------------------------#
+
+#-----------------------------------------------------------TLS-------------------------------------------------------------#
+class TLS_Packet(Default_Packet):
+    def __init__(self, packet=None, id=None):
+        super().__init__('TLS', packet, id) #call parent ctor
+        if TLS in self.layers: #checks if packet is TLS
+            self.packetType = TLS #add packet type
+    
+    
+    #method for packet information
+    def moreInfo(self):
+        output = super().moreInfo() #call parent moreInfo method
+        if TLS in self.layers: #if packet has TLS layer
+            tlsPacket = self.layers[TLS] #save the TLS packet in parameter
+            output += f'Version: {tlsPacket.version}\n\n' #version of the TLS packet
+            if TLSClientHello in self.layers: #if true the packet is a client hello response
+                output += f'Handshake Type: Client Hello\n\n' #add handshake type to output
+                output += f'Length: {self.layers[TLSClientHello].msglen} bytes\n\n' #add length to output
+                output += self.fitStr('Cipher Suites:', self.layers[TLSClientHello].ciphers) #add cipher suites list to output
+            elif TLSServerHello in self.layers: #if true the packet is a server hello response
+                output += f'Handshake Type: Server Hello\n\n' #add handshake tyoe to output
+                output += f'Length: {self.layers[TLSServerHello].msglen} bytes\n\n' #add length to output
+                output += f'Cipher Suite: {self.layers[TLSServerHello].cipher}\n\n' #add cipher suite number to output
+            elif TLSClientKeyExchange in self.layers: #if true the packet is a client key exchange response
+                output += f'Handshake Type: Client Key Exchange\n\n' #add handshake tyoe to output
+                output += f'Length: {self.layers[TLSClientKeyExchange].msglen} bytes\n\n' #add length to output
+            elif TLSServerKeyExchange in self.layers: #if true the packet is a server key exchange response
+                output += f'Handshake Type: Server Key Exchange\n\n' #add handshake tyoe to output
+                output += f'Length: {self.layers[TLSServerKeyExchange].msglen} bytes\n\n' #add length to output
+            elif TLSNewSessionTicket in self.layers: #if true the packet is a new session ticket response
+                output += f'Handshake Type: New Session Ticket\n\n' #add handshake tyoe to output
+                output += f'Length: {self.layers[TLSNewSessionTicket].msglen} bytes\n\n' #add length to output
+        return output
+    
+#---------------------------------------------------------TLS-END-----------------------------------------------------------#
+
+#-----------------------------------------------------------ICMP------------------------------------------------------------#
+class ICMP_Packet(Default_Packet):
+    icmpTypes = { 
+        0: 'Echo Reply', 3: 'Destination Unreachable', 4: 'Source Quench', 5: 'Redirect', 8: 'Echo Request', 9: 'Router Advertisement',
+        10: 'Router Selection', 11: 'Time Exceeded', 12: 'Parameter Problem', 13: 'Timestamp', 14: 'Timestamp Reply', 15: 'Information Request',
+        16: 'Information Reply', 17: 'Address Mask Request', 18: 'Address Mask Reply'}
+    
+    def __init__(self, packet=None, id=None):
+        super().__init__('ICMP', packet, id) #call parent ctor
+        if ICMP in self.layers: #checks if packet is icmp
+            self.packetType = ICMP #add packet type
+
+    
+    #method for brief packet information
+    def info(self):
+        output = ''
+        packetSize = self.layers.getSize() #represent the packet size
+        icmpType = self.icmpTypes[self.layers[ICMP].type] if self.layers[ICMP].type in self.icmpTypes else self.layers[ICMP].type #represents icmp type based on the icmpTypes dictionary
+        icmpCode = self.layers[ICMP].code #represents icmp code
+        if IP in self.layers: #if packet has ip layer
+            srcIp = self.layers[IP].src #represents the source ip
+            dstIp = self.layers[IP].dst #represents the destination ip
+            output += f'{self.name} Packet: ({srcIp}) --> ({dstIp}) | Type: {icmpType}, Code: {icmpCode} | Size: {packetSize} bytes' #add to output the packet info with ip
+        elif IPv6 in self.layers: #if packet has ipv6 layer
+            srcIp = self.layers[IPv6].src #represents the source ip
+            dstIp = self.layers[IPv6].dst #represents the destination ip
+            output += f'{self.name} Packet: ({srcIp}) --> ({dstIp}) | Type: {icmpType}, Code: {icmpCode} | Size: {packetSize} bytes' #add to output the packet info with ip
+        else:
+            output += f'{self.name} Packet: Type: {icmpType}, Code: {icmpCode} | Size: {packetSize} bytes' #add to output the packet info 
+        return output
+
+
+    #method for packet information
+    def moreInfo(self): 
+        output = ''
+        if ICMP in self.layers: #if packet has icmp layer
+            icmpType = self.icmpTypes[self.layers[ICMP].type] if self.layers[ICMP].type in self.icmpTypes else self.layers[ICMP].type #represents icmp type based on the icmpTypes dictionary
+            icmpCode = self.layers[ICMP].code #represents icmp code
+            icmpSeq = self.layers[ICMP].seq #represents icmp sequence number
+            icmpId = self.layers[ICMP].id #represents icmp identifier
+            output += f'{self.name} Packet:\n\n' #add packet name to output
+            output += self.ipInfo() #call ip method for more ip info
+            output += f'Type: {icmpType}\n\n' #add icmp type to output
+            output += f'Code: {icmpCode}\n\n' #add icmp code to output
+            output += f'Sequence Number: {icmpSeq}\n\n' #add icmp sequence number
+            output += f'Identifier: {icmpId}\n\n' #add icmp identifier
+        return output
+
+#---------------------------------------------------------ICMP-END----------------------------------------------------------#
+
+#-----------------------------------------------------------DHCP------------------------------------------------------------#
+class DHCP_Packet(Default_Packet):
+    def __init__(self, packet=None, id=None):
+        super().__init__('DHCP', packet, id) #call parent ctor
+        if DHCP in self.layers: #if packet is DHCP
+            self.packetType = DHCP #set packet type
+        
+    
+    #method to retreive the option from the options list in DHCP packet
+    def getOption(self, parameter):
+        byteParameters = ['hostname', 'vendor_class_id', 'client_id'] #list that includes parameters to decode
+        for option in self.layers[DHCP].options: #if true the packet is DHCP
+            if option[0] == parameter: # if true we found a valid parameter in the list
+                if parameter == 'name_server' and len(option) > 2: #if DHCP returned multiple name servers 
+                    return ", ".join(option[1:]) #return all names with a comma seperating them
+                elif parameter in byteParameters: #if parameter in byteParameter list
+                    return option[1].decode() #we return the decoded parameter
+                else: #else we return the parameter in the list
+                    return option[1] #return the value in the tuple in list
+        return None #else we return none if parameter is'nt in the list
+                    
+
+    #method for packet information
+    def moreInfo(self):
+        output = super().moreInfo() #call parent moreInfo method
+        if DHCP in self.layers: #if true its a DHCP packet
+            dhcpPacket = self.layers[DHCP] #set the DHCP packet in variable
+            if dhcpPacket.options[0][1] == 1 or dhcpPacket.options[0][1] == 3: #if true its a dicovery/request DHCP packet
+                hostname = self.getOption('hostname') #get the hostname from options
+                serverID = self.getOption('server_id') #get the server id from options
+                requestedAddress = self.getOption('requested_addr') #get the requested address from options
+                vendorClassID = self.getOption('vendor_class_id') #get vendor class id from options
+                paramReqList = self.getOption('param_req_list') #get parameter request list from options
+                output += f'DHCP Type: Discover\n\n' if dhcpPacket.options[0][1] == 1 else f'DHCP Type: Request\n\n' #add type of DHCP, discovery or request
+                output += f'Host Name: {hostname}\n\n' if hostname else '' #add hostname to output
+                output += f'Server ID: {serverID}\n\n' if dhcpPacket.options[0][1] == 3 and serverID else '' #add server id to output
+                output += f'Requested Address: {requestedAddress}\n\n' if requestedAddress else '' #add requested addresses to outpit
+                output += f'Vendor Class ID: {vendorClassID}\n\n' if vendorClassID else '' #add vendor class id to output
+                output += self.fitStr('Parameter Request list:', ', '.join(map(str, paramReqList))) if paramReqList else '' #add parameter request list to output
+            elif dhcpPacket.options[0][1] == 2 or dhcpPacket.options[0][1] == 5: #if true its a offer/aknowledge DHCP packet
+                subnetMask = self.getOption('subnet_mask') #get subnet mask from options
+                broadcastAddress = self.getOption('broadcast_address') #get boradcast address from options
+                leaseTime = self.getOption('lease_time') #get lease time from options
+                router = self.getOption('router') #get router from options
+                serverName = self.getOption('name_server') #get server name from options
+                output += f'DHCP Type: Offer\n\n' if dhcpPacket.options[0][1] == 2 else f'DHCP Type: Acknowledge\n\n' #add type of DHCP, offer or acknowledge
+                output += f'Subnet Mask: {subnetMask}\n\n' if subnetMask else '' #add subnet mask to output
+                output += f'Broadcast Address: {broadcastAddress}\n\n' if broadcastAddress else '' #add broadcast address to output
+                output += f'Lease Time: {leaseTime}\n\n' if leaseTime else '' #add lease time to output
+                output += f'Router Address: {router}\n\n' if router else '' #add router address to output
+                output += f'Offered Address: {self.layers[BOOTP].yiaddr}\n\n' if dhcpPacket.options[0][1] == 2 else f'Acknowledged Address: {self.layers[BOOTP].yiaddr}\n\n' #add specific info about the packet
+                output += self.fitStr('Server Name:', serverName) if serverName else '' #add server name to output
+            elif dhcpPacket.options[0][1] == 7: #if true its a release DHCP packet
+                serverID = self.getOption('server_id') #get server id from options
+                output += f'DHCP Type: Release\n\n' #add type to output
+                output += f'Server ID: {serverID}\n\n' if serverID else '' #add server id to output
+            elif dhcpPacket.options[0][1] == 8: #if true its a information DHCP packet
+                hostname = self.getOption('hostname') #get hostname from output
+                vendorClassID = self.getOption('vendor_class_id') #get vendor class id from options
+                output += f'DHCP Type: Information\n\n' #add type to output
+                output += f'Host Name: {hostname}\n\n' if hostname else '' #add hostname to output
+                output += f'Vendor Class ID: {vendorClassID}\n\n' if vendorClassID else '' #add vendor class id to output
+        return output
+    
+#----------------------------------------------------------DHCP-END---------------------------------------------------------#
+
+# -----------------------------------------------------------ARP------------------------------------------------------------#
+class ARP_Packet(Default_Packet):
+    hardwareTypes = {
+        1: 'Ethernet', 4: 'Ethernet II', 6: 'IEEE 802 (Token Ring)', 8: 'ArcNet', 15: 'Frame Relay', 17: 'ATM',
+        18: 'HDLC', 23: 'IEEE 802.11 (Wi-Fi)', 32: 'Fibre Channel', 41: 'InfiniBand', 42: 'IPv6 over Ethernet', 512: 'PPP'}
+
+    protocolTypes = {
+        1: 'Ethernet', 2045: 'VLAN Tagging (802.1Q)', 2046: 'RARP', 2048: 'IPv4', 2049: 'X.25', 2054: 'ARP', 32902: 'RARP', 33058: 'AppleTalk (Appletalk AARP)', 
+        33079: 'AppleTalk', 34304: 'PPP', 4525: 'IPv6', 34887: 'PPPoE Discovery', 35020: 'MPLS', 35023: 'PPPoE (PPP over Ethernet)', 35048: 'MPLS Multicast', 35117: 'PPPoE Session'}
+
+    def __init__(self, packet=None, id=None):
+        super().__init__('ARP', packet, id) #call parent ctor
+        if ARP in self.layers: #checks if packet is arp
+            self.packetType = ARP #add packet type
+    
+
+    #method for brief packet information
+    def info(self):
+        output = ''
+        srcMac = self.layers[ARP].hwsrc #represents arp source mac address
+        srcIp = self.layers[ARP].psrc #represents arp source ip address
+        dstMac = self.layers[ARP].hwdst #represents arp destination mac address
+        dstIp = self.layers[ARP].pdst #represents arp destination ip address
+        arpOperation = 'Request' if self.layers[ARP].op == 1 else 'Reply' #represents arp operation
+        packetSize = self.layers.getSize() #represents the packet size 
+        output += f'{self.name} Packet: ({srcIp}):({srcMac}) --> ({dstIp}):({dstMac}) Type: {arpOperation} | Size: {packetSize} bytes' #add the packet info to output
+        return output
+
+
+    #method for packet information
+    def moreInfo(self):
+        output = ''
+        if ARP in self.layers: #if packet has layer of arp
+            hardwareType = self.hardwareTypes[self.layers[ARP].hwtype] if self.layers[ARP].hwtype in self.hardwareTypes else self.layers[ARP].hwtype #represents hardware type based on the hardwareTypes dictionary
+            protocolType = self.protocolTypes[self.layers[ARP].ptype] if self.layers[ARP].ptype in self.protocolTypes else self.layers[ARP].ptype #represents protocol type based on the protocolTypes dictionary
+            output += f'{self.name} Packet:\n\n' #add packet name to output
+            output += f'Source MAC: {self.layers[ARP].hwsrc}\n\n' #add arp source mac address
+            output += f'Destination MAC: {self.layers[ARP].hwdst}\n\n' #add arp destination mac address
+            output += f'Source IP: {self.layers[ARP].psrc}\n\n' #add arp source ip address
+            output += f'Destination IP: {self.layers[ARP].pdst}\n\n' #add arp destination ip address
+            output += f'Packet Size: {self.layers.getSize()} bytes\n\n' #add packet size
+            output += f'Operation: {"Request" if self.layers[ARP].op == 1 else "Reply"}\n\n' #add the arp operation to output
+            output += f'Hardware Type: {hardwareType}\n\n' #add the hardware type to output
+            output += f'Hardware Length: {self.layers[ARP].hwlen} bytes\n\n' #add hardware length to output
+            output += f'Protocol Type: {protocolType}\n\n' #add protocol type to output
+            output += f'Protocol Length: {self.layers[ARP].plen} bytes\n\n' #add protocol length to output
+        return output
+        
+#-----------------------------------------------------------ARP-END---------------------------------------------------------#
+
+#-----------------------------------------------------------IGMP------------------------------------------------------------#
+class IGMP_Packet(Default_Packet):
+    igmpTypes = {
+        17: 'Membership Query', 18: 'Membership Report v1', 22: 'Membership Report v2', 23: 'Leave Group', 30: 'Membership Report v3',
+        31: 'Multicast Router Advertisement', 32: 'Multicast Router Solicitation', 33: 'Multicast Router Termination'}
+
+    def __init__(self, packet=None, id=None):
+        super().__init__('IGMP', packet, id) #call parent ctor
+        if IGMP in self.layers: #checks if packet is IGMP
+            self.packetType = IGMP #add pacet type
+            
+
+    #method for brief packet information
+    def info(self):
+        output = ''
+        srcMac = self.layers.srcMac #represents the source mac address
+        dstMac = self.layers.dstMac #represents the destination mac address
+        packetSize = self.layers.getSize() #size of the packet
+        igmpType = self.igmpTypes[self.layers[IGMP].type] #represents the igmp type
+        if IP in self.layers: #if packet have ip address so we add the packet info with ip and type
+            srcIp = self.layers[IP].src #represents the source ip of packet
+            dstIp = self.layers[IP].dst #represents the destination ip of packet
+            output += f'{self.name} Packet: ({srcIp}) --> ({dstIp}) Type: {igmpType} | Size: {packetSize} bytes' #insert info to output
+        elif IPv6 in self.layers:  #if packet have ipv6 address so we add the packet info with ip and type
+            srcIp = self.layers[IPv6].src #set the source ip
+            dstIp = self.layers[IPv6].dst #set the destination ip
+            output += f'{self.name} Packet: ({srcIp}) --> ({dstIp}) Type: {igmpType} | Size: {packetSize} bytes' #insert info to output
+        else: #if packet doesnt have ip layer we print its mac address annd type
+            output += f'{self.name} Packet: ({srcMac}) --> ({dstMac}) Type: {igmpType} | Size: {packetSize} bytes' #insert info to output
+        return output   
+
+
+    #method for packet information
+    def moreInfo(self):
+        output = super().moreInfo() #call parent moreInfo
+        if IGMP in self.layers: #if true it means packet is IGMP
+            igmpType = self.igmpTypes[self.layers[IGMP].type] if self.layers[IGMP].type in self.igmpTypes else self.layers[IGMP].type #represents IGMP type based on the igmpTypes dictionary
+            output += f'Type: {igmpType}\n\n' #add IGMP type to output
+            output += f'Group Address: {self.layers[IGMP].gaddr}\n\n' #add IGMP group address to output
+            output += f'Maximum Response Code: {self.layers[IGMP].mrcode}\n\n' #add IGMP mrcode to output
+            output += f'Checksum: {self.layers[IGMP].chksum}\n\n' #add IGMP checksum to output
+        return output
+
+#---------------------------------------------------------IGMP-END----------------------------------------------------------#
+
+#-----------------------------------------------------------STP-------------------------------------------------------------#
+class STP_Packet(Default_Packet):
+    def __init__(self, packet=None, id=None):
+        super().__init__('STP', packet, id) #call parent ctor
+        if STP in self.layers: #checks if packet is stp
+            self.packetType = STP #add pacet type
+
+
+    #method for brief packet information
+    def info(self):
+        output = ''
+        packetSize = self.layers.getSize() #represents the stp packet size
+        output += f'{self.name} Packet: ({self.layers.srcMac}) --> ({self.layers.dstMac}) | Size: {packetSize} bytes' #add packet info to output
+        return output
+
+    
+    #method for packet information
+    def moreInfo(self):
+        output = ''
+        if STP in self.layers: #if packet is an stp packet
+            stpProto = self.layers[STP].proto #represents stp protocol
+            stpVersion = self.layers[STP].version #represents stp version
+            stpBridgeId = self.layers[STP].bridgeid #represents stp bridge id
+            stpPortId = self.layers[STP].portid #represents stp port id
+            stpPathCost = self.layers[STP].pathcost #represents stp path cost
+            stpAge = self.layers[STP].age #represents stp age
+            output += f'{self.name} Packet:\n\n' #add packet name to output
+            output += f'STP Protocol: {stpProto}\n\n' #add stp protocol to output
+            output += f'Version: {stpVersion}\n\n' #add stp version to output
+            output += f'Source MAC: {self.layers.srcMac}\n\n' #add source mac address to output
+            output += f'Destination MAC: {self.layers.dstMac}\n\n' #add destination mac address to output
+            output += f'Bridge ID: {stpBridgeId}\n\n' #add bridge id tto output
+            output += f'Port ID: {stpPortId}\n\n' #add port id to output
+            output += f'Path Cost: {stpPathCost}\n\n' #add path cost to output
+            output += f'Age: {stpAge}\n\n' #add stp age to output
+        output += f'Packet Size: {self.layers.getSize()} bytes\n\n' #add packet size to output
+        return output
+
+# ---------------------------------------------------------STP-END----------------------------------------------------------#
+
+#-------------------------------------------------------PacketRecord--------------------------------------------------------#
+#compact record of a handled packet, keeps only the raw bytes and a few summary fields, full dissection happens on demand
+class PacketRecord():
+    __slots__ = ('id', 'raw', 'time', 'linkType', 'packetClass', 'srcIp', 'dstIp', 'srcPort', 'dstPort', 'summary', 'payload', 'credentials', 'interface') #slots for low memory usage per packet
+
+    def __init__(self, id, raw, time, linkType, packetClass, srcIp=None, dstIp=None, srcPort=None, dstPort=None, summary=None, payload=None, credentials=None, interface=None):
+        self.id = id #represents the id of the packet
+        self.raw = raw #represents the raw bytes of the frame
+        self.time = time #represents the capture timestamp of the packet
+        self.linkType = linkType #represents the pcap link type for decoding the raw bytes
+        self.packetClass = packetClass #represents the packet class for rendering the decoded packet
+        self.srcIp = sys.intern(srcIp) if srcIp else None #represents the source ip, addresses repeat a lot so we intern them
+        self.dstIp = sys.intern(dstIp) if dstIp else None #represents the destination ip
+        self.srcPort = srcPort #represents the source port
+        self.dstPort = dstPort #represents the destination port
+        self.summary = summary #brief information of the packet if it was already rendered
+        self.payload = payload #tcp payload from tcp reassembly the frame is dissected with, none for the frame's own payload
+        self.credentials = credentials if credentials or credentials is None else credentialExtractor.noCredentials #login credentials of http requests if they were searched, empty results share one dictionary
+        self.interface = interface #represents the interface the packet was captured on, none if its unknown, e.g. packets loaded from a file
+
+
+    #method that creates a packet record from a handled packet object
+    @classmethod
+    def fromPacketObject(cls, packetObject):
+        packet, layers = packetObject.getPacket(), packetObject.layers #the dissected packet of the handled packet object and its layer map
+        raw = bytes(packet.original) if getattr(packet, 'original', None) else bytes(packet) #the raw bytes of the frame
+        srcIp, dstIp, srcPort, dstPort = None, None, None, None #summary fields of the packet
+        ipLayer = layers.getIPLayer() #the ip layer of the packet if it has one
+        if ipLayer is not None: #if packet has ip layer we save the source and destination ip
+            srcIp, dstIp = ipLayer.src, ipLayer.dst
+        elif ARP in layers: #else if packet is arp we save the arp addresses
+            srcIp, dstIp = layers[ARP].psrc, layers[ARP].pdst
+        if TCP in layers or UDP in layers: #if packet is tcp or udp we save the ports
+            srcPort, dstPort = layers.srcPort, layers.dstPort
+        return cls(packetObject.getId(), raw, float(packet.time), conf.l2types.layer2num.get(type(packet), 1), type(packetObject), srcIp, dstIp, srcPort, dstPort, payload=packet.__dict__.get('reassembledPayload'), credentials=packetObject.credentials)
+
+
+    #get method for id
+    def getId(self):
+        return self.id
+
+
+    #get method for the packet size
+    def getSize(self):
+        return len(self.raw)
+
+
+    #method that decodes the raw bytes into a scapy packet
+    def decode(self):
+        return decodeFrame(self.raw, self.time, self.linkType, self.payload) #dissect the raw bytes with the matching link layer
+
+
+    #method that decodes the packet and creates its packet object, the object reuses the login credentials found before
+    def createPacketObject(self):
+        packetObject = self.packetClass(self.decode(), self.id)
+        packetObject.credentials = self.credentials
+        return packetObject
+
+
+    #method that returns the packet object of the record, decoded packet objects are kept in a bounded LRU cache
+    def getPacketObject(self):
+        with decodedLock: #the capture thread and the GUI thread both use the cache
+            packetObject = decodedPackets.get(self.id) #check if packet was decoded recently
+            if packetObject is not None: #if true we found the decoded packet object in cache
+                decodedPackets.move_to_end(self.id) #mark the packet object as recently used
+                return packetObject
+        packetObject = self.createPacketObject() #decode the packet and create its packet object, outside the lock so other threads don't wait for it
+        with decodedLock:
+            decodedPackets[self.id] = packetObject #insert the packet object to the cache
+            if len(decodedPackets) > decodedCacheSize: #if cache is full we remove the least recently used packet object
+                decodedPackets.popitem(last=False)
+        return packetObject
+
+
+    #get method for the dissected packet
+    def getPacket(self):
+        return self.getPacketObject().getPacket()
+
+
+    #method representing the packet briefly, the brief information is rendered once and kept in the record
+    def info(self):
+        if self.summary is None: #if true the packet wasn't rendered yet
+            self.summary = self.getPacketObject().info()
+        return self.summary
+
+
+    #method that represents the packet information more deeply, rendered text is kept in the bounded info cache
+    #without cache the packet is decoded without replacing recently used packets in caches, its text is only cached if the budget has room for it
+    def moreInfo(self, cache=True):
+        output = infoCache.get(self.id) #check if packet was rendered recently
+        if output is None: #if true we render the packet and insert it to cache
+            output = self.getPacketObject().moreInfo() if cache else self.createPacketObject().moreInfo()
+            if self.interface is not None: #if true we add the interface after the packet name
+                packetName, _, details = output.partition('\n\n')
+                output = f'{packetName}\n\nInterface: {self.interface}\n\n{details}'
+            infoCache.put(self.id, output, cache)
+        return output
+
+#-----------------------------------------------------PacketRecord-END------------------------------------------------------#
+
+#---------------------------------------------------------InfoCache---------------------------------------------------------#
+#LRU cache of the extended information of packets by packet id, bounded by the memory of the cached text instead of the number of packets
+#the text of a packet can be tens of kilobytes (e.g. long payloads or cipher suites), so a count limit doesn't bound the memory
+class InfoCache():
+    maxBytes = 0 #memory budget of the cached text in bytes, zero disables the cache
+    usedBytes = 0 #memory of the cached text in bytes
+    entries = None #ordered dictionary of (text, size) by packet id, least recently used first
+    lock = None #lock for the entries, the export thread reads the cache while the GUI inserts to it
+    hitCount = 0 #number of lookups that found the packet in cache
+    missCount = 0 #number of lookups that didn't find the packet in cache
+
+    def __init__(self, maxBytes=32 << 20):
+        self.maxBytes = maxBytes
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+
+    #method that returns the number of cached packets
+    def __len__(self):
+        return len(self.entries)
+
+
+    #method that returns the cached text of a packet and marks it as recently used, none if it's not cached
+    def get(self, id):
+        with self.lock:
+            entry = self.entries.get(id)
+            if entry is None:
+                self.missCount += 1
+                return None
+            self.entries.move_to_end(id) #mark the packet as recently used
+            self.hitCount += 1
+            return entry[0]
+
+
+    #method that inserts the text of a packet, least recently used packets are removed until it fits in the budget
+    #without evict the text is only inserted if the budget has room for it, so a long export doesn't replace recently inspected packets
+    def put(self, id, text, evict=True):
+        size = sys.getsizeof(text) #memory of the text
+        with self.lock:
+            if size > self.maxBytes or (not evict and self.usedBytes + size > self.maxBytes): #if true the text doesn't fit in the budget
+                return
+            previous = self.entries.pop(id, None) #replace previous text of the packet if cached
+            if previous is not None:
+                self.usedBytes -= previous[1]
+            self.entries[id] = (text, size)
+            self.usedBytes += size
+            self.trimEntries()
+
+
+    #method that removes least recently used packets until the cached text fits in the budget, the lock must be held
+    def trimEntries(self):
+        while self.usedBytes > self.maxBytes and self.entries:
+            self.usedBytes -= self.entries.popitem(last=False)[1][1]
+
+
+    #method that removes the text of a packet, e.g. when the packet is evicted
+    def remove(self, id):
+        with self.lock:
+            entry = self.entries.pop(id, None)
+            if entry is not None:
+                self.usedBytes -= entry[1]
+
+
+    #method that sets the memory budget in bytes, zero disables the cache
+    def setMaxBytes(self, maxBytes):
+        with self.lock:
+            self.maxBytes = maxBytes
+            self.trimEntries()
+
+
+    #method that removes all cached text
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.usedBytes = 0
+
+#-------------------------------------------------------InfoCache-END-------------------------------------------------------#
+
+#---------------------------------------------------PacketColumnStore-------------------------------------------------------#
+#compact column store of the summary fields of packets for the packet list, each column is an array so a row takes a few dozen bytes
+#addresses and packet classes are kept once in tables and rows keep their indexes, brief information is kept as utf-8 in one buffer
+class PacketColumnStore():
+    ids = None #array of packet ids
+    times = None #array of capture timestamps
+    protocols = None #array of indexes into the packet classes table
+    srcAddresses = None #array of indexes into the addresses table for source addresses
+    dstAddresses = None #array of indexes into the addresses table for destination addresses
+    srcPorts = None #array of source ports, -1 if packet has no ports
+    dstPorts = None #array of destination ports, -1 if packet has no ports
+    lengths = None #array of frame lengths
+    summaryOffsets = None #array of offsets of the brief information of each row in summary buffer, it has one more entry than rows
+    summaryBuffer = None #utf-8 bytes of the brief information of all rows, rows without brief information have an empty slice
+    summaryBase = 0 #offset of the start of summary buffer, offsets keep growing when the oldest rows are removed
+    addresses = None #table of addresses, the first entry is the empty address
+    addressIds = None #dictionary of addresses and their indexes in addresses table
+    packetClasses = None #table of packet classes
+    packetClassIds = None #dictionary of packet classes and their indexes in packet classes table
+    protocolIndex = None #secondary index of rows by packet class index, each value is an array of row numbers in ascending order
+    srcAddressIndex = None #secondary index of rows by source address index
+    dstAddressIndex = None #secondary index of rows by destination address index
+    srcPortIndex = None #secondary index of rows by source port
+    dstPortIndex = None #secondary index of rows by destination port
+    rowBase = 0 #number of rows removed from the start of the store, row numbers in the secondary indexes count from the first row ever added
+    trimmedBase = 0 #row base of the last time removed rows were trimmed from the secondary indexes
+
+    def __init__(self):
+        self.ids, self.times, self.protocols, self.lengths = array('Q'), array('d'), array('B'), array('I')
+        self.srcAddresses, self.dstAddresses, self.srcPorts, self.dstPorts = array('I'), array('I'), array('i'), array('i')
+        self.summaryOffsets, self.summaryBuffer = array('Q', [0]), bytearray()
+        self.addresses, self.addressIds, self.packetClasses, self.packetClassIds = [''], {'': 0}, [], {}
+        self.protocolIndex, self.srcAddressIndex, self.dstAddressIndex, self.srcPortIndex, self.dstPortIndex = {}, {}, {}, {}, {}
+
+
+    #method that returns the number of rows, the summary offsets are appended last so rows are complete while another thread adds rows
+    def __len__(self):
+        return len(self.summaryOffsets) - 1
+
+
+    #method that returns the index of an address in addresses table, new addresses are added to the table
+    def getAddressId(self, address):
+        addressId = self.addressIds.get(address or '')
+        if addressId is None: #if true its a new address
+            addressId = self.addressIds[address] = len(self.addresses)
+            self.addresses.append(address)
+        return addressId
+
+
+    #method that adds a row for a packet record, summary is the brief information of the packet if it was rendered
+    def addRecord(self, record, summary=None):
+        packetClassId = self.packetClassIds.get(record.packetClass)
+        if packetClassId is None: #if true its a new packet class
+            packetClassId = self.packetClassIds[record.packetClass] = len(self.packetClasses)
+            self.packetClasses.append(record.packetClass)
+        srcAddressId, dstAddressId = self.getAddressId(record.srcIp), self.getAddressId(record.dstIp)
+        srcPort, dstPort = record.srcPort if record.srcPort is not None else -1, record.dstPort if record.dstPort is not None else -1
+        self.ids.append(record.id)
+        self.times.append(record.time)
+        self.protocols.append(packetClassId)
+        self.srcAddresses.append(srcAddressId)
+        self.dstAddresses.append(dstAddressId)
+        self.srcPorts.append(srcPort)
+        self.dstPorts.append(dstPort)
+        self.lengths.append(record.getSize())
+        row = self.rowBase + len(self) #row number of the new row in the secondary indexes
+        for index, key in ((self.protocolIndex, packetClassId), (self.srcAddressIndex, srcAddressId), (self.dstAddressIndex, dstAddressId), (self.srcPortIndex, srcPort), (self.dstPortIndex, dstPort)):
+            rows = index.get(key)
+            if rows is None: #if true its the first row with this value
+                rows = index[key] = array('I')
+            rows.append(row)
+        if summary: #add the brief information to the summary buffer
+            self.summaryBuffer += summary.encode()
+        self.summaryOffsets.append(self.summaryBase + len(self.summaryBuffer))
+
+
+    #method that removes the given number of oldest rows, used when packets are evicted
+    def removeRows(self, count):
+        for column in (self.ids, self.times, self.protocols, self.srcAddresses, self.dstAddresses, self.srcPorts, self.dstPorts, self.lengths):
+            del column[:count]
+        del self.summaryBuffer[:self.summaryOffsets[count] - self.summaryBase] #remove the brief information of the removed rows
+        self.summaryBase = self.summaryOffsets[count]
+        del self.summaryOffsets[:count]
+        self.rowBase += count
+        if self.rowBase - self.trimmedBase >= max(len(self), 1024): #removed rows are trimmed from the secondary indexes once enough rows were removed, so eviction stays constant time per row
+            self.trimIndexes()
+
+
+    #method that removes the row numbers of removed rows from the secondary indexes
+    def trimIndexes(self):
+        for index in (self.protocolIndex, self.srcAddressIndex, self.dstAddressIndex, self.srcPortIndex, self.dstPortIndex):
+            for key, rows in list(index.items()):
+                del rows[:bisect_left(rows, self.rowBase)]
+                if not rows: #if true no stored row has this value
+                    del index[key]
+        self.trimmedBase = self.rowBase
+
+
+    #method that returns the rows between start and stop with given value in a secondary index, rows are counted from the first stored row
+    def getIndexRows(self, index, key, start=0, stop=None):
+        rows = index.get(key)
+        if rows is None: #if true no row has this value
+            return []
+        stop = len(self) if stop is None else stop
+        first, last = bisect_left(rows, self.rowBase + start), bisect_left(rows, self.rowBase + stop) #the rows of the range in the index
+        return [row - self.rowBase for row in rows[first:last]]
+
+
+    #method that returns the brief information of a row, none if it wasn't rendered
+    def getSummary(self, row):
+        start, end = self.summaryOffsets[row] - self.summaryBase, self.summaryOffsets[row + 1] - self.summaryBase
+        return self.summaryBuffer[start:end].decode() if end > start else None
+
+
+    #method that returns the packet class of a row
+    def getPacketClass(self, row):
+        return self.packetClasses[self.protocols[row]]
+
+
+    #method that returns the protocol name of a row
+    def getProtocol(self, row):
+        return self.packetClasses[self.protocols[row]].__name__.replace('_Packet', '')
+
+
+    #method that returns the source address of a row
+    def getSource(self, row):
+        return self.addresses[self.srcAddresses[row]]
+
+
+    #method that returns the destination address of a row
+    def getDestination(self, row):
+        return self.addresses[self.dstAddresses[row]]
+
+#-------------------------------------------------PacketColumnStore-END-----------------------------------------------------#
+
+#---------------------------------------------------IndexedPacketStore------------------------------------------------------#
+#store of the handled packets of a loaded pcap file, keeps only the position of each packet in the offset index of the mapped file and its summary columns
+#packet records are created on demand from the mapped file, so memory use per packet is a few dozen bytes regardless of the frame size
+class IndexedPacketStore():
+    pcapIndex = None #offset index of the mapped pcap file
+    positions = None #array of positions in offset index by packet id
+    columns = None #column store of the summary fields by packet id, used by the packet list
+    payloads = None #dictionary of tcp payloads from tcp reassembly by packet id, only for packets that aren't dissected with their own payload
+
+    def __init__(self, pcapIndex, columns=None):
+        self.pcapIndex = pcapIndex #set the offset index of the file
+        self.positions = array('Q')
+        self.payloads = {}
+        self.columns = columns if columns is not None else PacketColumnStore() #set the column store if given, e.g. the store of the packet list
+
+
+    #method that returns the number of stored packets
+    def __len__(self):
+        return len(self.positions)
+
+
+    #method that adds a handled packet by its position in offset index, the packet id is its position in the store
+    def addPacket(self, position, record):
+        record.id = len(self.positions) #the id of the packet in the store
+        if record.payload is not None: #if true we keep the payload the packet is dissected with
+            self.payloads[record.id] = record.payload
+        self.columns.addRecord(record)
+        self.positions.append(position)
+
+
+    #method that creates the packet record of given packet id from the mapped file
+    def getRecord(self, id):
+        if not 0 <= id < len(self.positions): #if true there's no such packet
+            raise KeyError(id)
+        frame, timestamp, linkType = self.pcapIndex.getRecord(self.positions[id])
+        columns = self.columns
+        return PacketRecord(id, frame, timestamp, linkType, columns.getPacketClass(id), columns.getSource(id) or None, columns.getDestination(id) or None, columns.srcPorts[id] if columns.srcPorts[id] >= 0 else None, columns.dstPorts[id] if columns.dstPorts[id] >= 0 else None, payload=self.payloads.get(id))
+
+
+    #method for iterating over all packet records of the store
+    def getRecords(self):
+        for id in range(len(self.positions)):
+            yield self.getRecord(id)
+
+
+    #method that closes the mapped file
+    def close(self):
+        self.pcapIndex.close()
+
+#-------------------------------------------------IndexedPacketStore-END----------------------------------------------------#
+
+#-----------------------------------------------------PacketRetention-------------------------------------------------------#
+#retention limits of packet dictionary for long running captures, when a limit is reached the oldest packets are evicted like in a ring buffer
+#evicted packets can be spilled to a pcap file so nothing is lost
+class PacketRetention():
+    maxPackets = 0 #maximum number of stored packets, zero for unlimited
+    maxBytes = 0 #maximum number of stored frame bytes, zero for unlimited
+    maxAge = None #maximum age in seconds of stored packets relative to the newest packet, none for unlimited
+    spillFile = None #path of pcap file for evicted packets, none for discarding them
+    spillWriter = None #pcap writer of the spill file, opened on first eviction
+    storedBytes = 0 #number of frame bytes of the stored packets
+
+    def __init__(self, maxPackets=0, maxBytes=0, maxAge=None, spillFile=None):
+        self.maxPackets = maxPackets #set the maximum number of packets
+        self.maxBytes = maxBytes #set the maximum number of bytes
+        self.maxAge = maxAge #set the maximum age of packets
+        self.spillFile = spillFile #set the spill file if given
+
+
+    #method that accounts a newly stored packet record and evicts the oldest packets while a limit is exceeded
+    def addRecord(self, record):
+        self.storedBytes += record.getSize() #add the size of the new packet
+        while packetDictionary and self.isExceeded(record):
+            evicted = evictOldestPacket() #remove the oldest packet
+            if evicted is not None: #if true we release its bytes and spill it to file if needed
+                self.storedBytes -= evicted.getSize()
+                if self.spillFile is not None:
+                    self.spillPacket(evicted)
+
+
+    #method that checks if any of the limits is exceeded, newestRecord is the last stored packet record
+    def isExceeded(self, newestRecord):
+        if self.maxPackets and len(packetDictionary) > self.maxPackets: #if true there are too many packets
+            return True
+        if self.maxBytes and self.storedBytes > self.maxBytes: #if true the packets take too many bytes
+            return True
+        if self.maxAge is not None: #if true we check the age of the oldest packet
+            oldestRecord = packetDictionary.get(firstPacketId)
+            return oldestRecord is not None and newestRecord.time - oldestRecord.time > self.maxAge
+        return False
+
+
+    #method that writes an evicted packet record to the spill file
+    def spillPacket(self, record):
+        if self.spillWriter is None: #if true we open the spill file with link type of the first evicted packet
+            self.spillWriter = RawPcapWriter(self.spillFile, linktype=record.linkType)
+            self.spillWriter.write_header(None)
+        self.spillWriter.write_packet(record.raw, sec=int(record.time), usec=int((record.time - int(record.time)) * 1000000))
+
+
+    #method that flushes and closes the spill file
+    def close(self):
+        if self.spillWriter is not None:
+            self.spillWriter.close()
+            self.spillWriter = None
+
+#---------------------------------------------------PacketRetention-END-----------------------------------------------------#
+
+#-------------------------------------------------------PacketQueue---------------------------------------------------------#
+#bounded thread safe queue between the capture and the consumer of handled packets, e.g. the packet list of the GUI
+#when the queue is full the overflow policy decides if the newest packet is dropped, the oldest queued packet is dropped or the capture waits
+class PacketQueue():
+    overflowPolicies = ('block', 'dropNewest', 'dropOldest') #supported overflow policies
+    maxSize = 100000 #maximum number of queued packets, zero for unlimited
+    overflowPolicy = 'block' #policy for packets that don't fit in the queue
+    items = None #deque of queued packets
+    condition = None #condition for waiting until the queue has room
+    queuedCount = 0 #number of packets that were put in the queue
+    droppedCount = 0 #number of packets that were dropped by the overflow policy
+
+    def __init__(self, maxSize=100000, overflowPolicy='block'):
+        if overflowPolicy not in self.overflowPolicies: #if true the policy is unknown so we raise a ValueError exception
+            raise ValueError(f'Error, unknown overflow policy {overflowPolicy}, supported policies are: {", ".join(self.overflowPolicies)}.')
+        self.maxSize = maxSize #set the maximum number of packets
+        self.overflowPolicy = overflowPolicy #set the overflow policy
+        self.items = deque()
+        self.condition = threading.Condition()
+
+
+    #method that puts a packet in the queue, returns false if the packet was dropped or the stop method returned true while waiting for room
+    def put(self, item, stopMethod=None):
+        with self.condition:
+            while self.maxSize and len(self.items) >= self.maxSize: #if true the queue is full so we apply the overflow policy
+                if self.overflowPolicy == 'dropNewest': #drop the new packet
+                    self.droppedCount += 1
+                    return False
+                if self.overflowPolicy == 'dropOldest': #drop the oldest queued packet to make room for the new packet
+                    self.items.popleft()
+                    self.droppedCount += 1
+                    break
+                if stopMethod is not None and stopMethod(): #if true the capture was stopped while waiting
+                    return False
+                self.condition.wait(0.1) #wait for the consumer to take packets, wake up periodically to check the stop method
+            self.items.append(item)
+            self.queuedCount += 1
+            return True
+
+
+    #method that takes up to given number of packets from the queue in the order they were put
+    def getBatch(self, maxCount):
+        with self.condition:
+            batch = [self.items.popleft() for _ in range(min(maxCount, len(self.items)))]
+            self.condition.notify_all() #wake up the capture if it waits for room
+            return batch
+
+
+    #method that removes all queued packets, the counters are kept
+    def clear(self):
+        with self.condition:
+            self.items.clear()
+            self.condition.notify_all()
+
+
+    #method that returns the number of queued packets
+    def qsize(self):
+        return len(self.items)
+
+
+    #method that returns true if there are no queued packets
+    def empty(self):
+        return not self.items
+
+#-----------------------------------------------------PacketQueue-END-------------------------------------------------------#
+
+#----------------------------------------------------HELPER-FUNCTIONS-------------------------------------------------------#
+
+#method to print all available interfaces
+def getAvailableInterfaces():
+    #get a list of all available network interfaces
+    interfaces = get_if_list() #call get_if_list method to retrieve the available interfaces
+    if interfaces: #if there are interfaces we print them
+        print('Available network interfaces:')
+        i = 1 #counter for the interfaces 
+        for interface in interfaces: #print all availabe interfaces
+            if sys.platform.startswith('win32'): #if ran on windows we convert the guid number
+                print(f'{i}. {guidToStr(interface)}')
+            else: #else we are on other os so we print the interface 
+                print(f'{i}. {interface}')
+            i += 1
+    else: #else no interfaces were found
+        print('No network interfaces found.')
+
+
+#method for retrieving interface name from GUID number (Windows only)
+def guidToStr(guid):
+    try: #we try to import the specific windows method from scapy library
+        from scapy.arch.windows import get_windows_if_list
+    except ImportError as e: #we catch an import error if occurred
+        print(f'Error importing module: {e}') #print the error
+        return guid #we exit the function
+    interfaces = get_windows_if_list() #use the windows method to get list of guid number interfaces
+    for interface in interfaces: #iterating over the list of interfaces
+        if interface['guid'] == guid: #we find the matching guid number interface
+            return interface['name'] #return the name of the interface associated with guid number
+    return guid #else we didnt find the guid number so we return given guid
+
+
+#method for retrieving the network interfaces
+def getNetworkInterfaces():
+    networkNames = ['eth', 'wlan', 'en', 'enp', 'wlp', 'lo', 'Ethernet', 'Wi-Fi', '\\Device\\NPF_Loopback'] #this list represents the usual network interfaces that are available in various platfroms
+    interfaces = get_if_list() #get a list of the network interfaces
+    if sys.platform.startswith('win32'): #if current os is Windows we convert the guid number to interface name
+        interfaces = [guidToStr(interface) for interface in interfaces] #get a new list of network interfaces with correct names instead of guid numbers
+    matchedInterfaces = [interface for interface in interfaces if any(interface.startswith(name) for name in networkNames)] #we filter the list to retrieving ethernet and wifi interfaces
+    return matchedInterfaces #return the matched interfaces as list
+
+#-----------------------------------------------------HANDLE-FUNCTIONS------------------------------------------------------#
+#method that inserts a packet record to the packet dictionary with the next packet id and increases the counter
+def addRecord(record):
+    global packetCounter
+    record.id = packetCounter #set the id of the record
+    packetDictionary[record.id] = record #insert the packet record to packet dictionary
+    packetCounter += 1 #increase the counter
+    return record #finally return the record
+
+#method that inserts a compact record of the handled packet object to the packet dictionary
+def addPacket(packetObject):
+    addRecord(PacketRecord.fromPacketObject(packetObject)) #insert the packet record to packet dictionary
+    return packetObject #finally return the object
+
+#method that handles TCP packets
+def handleTCP(packet):
+    TCP_Object = TCP_Packet(packet, packetCounter) #create a new object for packet
+    return addPacket(TCP_Object) #insert it to packet dictionary and return the object
+
+#method that handles UDP packets
+def handleUDP(packet):
+    UDP_Object = UDP_Packet(packet, packetCounter) #create a new object for packet
+    return addPacket(UDP_Object) #insert it to packet dictionary and return the object
+
+#method that handles HTTP packets
+def handleHTTP(packet):
+    HTTP_Object = HTTP_Packet(packet, packetCounter) #create a new object for packet
+    HTTP_Object.loginInfo() #search the request for login credentials once, the record keeps them for rendering the packet again later
+    return addPacket(HTTP_Object) #insert it to packet dictionary and return the object
+
+#method that handles DNS packets
+def handleDNS(packet):
+    DNS_Object = DNS_Packet(packet, packetCounter) #create a new object for packet
+    return addPacket(DNS_Object) #insert it to packet dictionary and return the object
+
+#method that handles TLS packets
+def handleTLS(packet):
+    if getLayerMap(packet)[TLS].type == 22: #we need to capture handshakes TLS packets so 22 is the correct type
+        TLS_Object = TLS_Packet(packet, packetCounter) #create a new object for packet
+        return addPacket(TLS_Object) #insert it to packet dictionary and return the object
+    return None #else we return none
+
+#method that handles ICMP packets
+def handleICMP(packet):
+    ICMP_Object = ICMP_Packet(packet, packetCounter) #create a new object for packet
+    return addPacket(ICMP_Object) #insert it to packet dictionary and return the object
+
+#method that handles DHCP packets
+def handleDHCP(packet):
+    validParameters = [1, 2, 3, 5, 7, 8] #list that represents the valid paramteters for DHCP
+    if getLayerMap(packet)[DHCP].options[0][1] in validParameters: #we check if its a valid parameter
+        DHCP_Object = DHCP_Packet(packet, packetCounter) #create a new object for packet
+        return addPacket(DHCP_Object) #insert it to packet dictionary and return the object
+    return None #else we return none
+
+#method that handles ARP packets
+def handleARP(packet):
+    ARP_Object = ARP_Packet(packet, packetCounter) #create a new object for packet
+    return addPacket(ARP_Object) #insert it to packet dictionary and return the object
+
+#method that handles IGMP packets
+def handleIGMP(packet):
+    validParameters = [17, 18, 22, 23] #list that represents the valid paramteters for IGMP
+    if getLayerMap(packet)[IGMP].type in validParameters: #we check if its a valid parameter
+        IGMP_Object = IGMP_Packet(packet, packetCounter) #create a new object for packet
+        return addPacket(IGMP_Object) #insert it to packet dictionary and return the object
+    return None #else we return none
+
+#method that handles STP packets
+def handleSTP(packet):
+    STP_Object = STP_Packet(packet, packetCounter) #create a new object for packet
+    return addPacket(STP_Object) #insert it to packet dictionary and return the object
+
+#---------------------------------------------------HANDLE-FUNCTIONS-END----------------------------------------------------#
+
+packetDictionary = {} #initialize the packet dictionary of packet records
+packetCounter = 0 #global counter for dictionary elements
+decodedPackets = OrderedDict() #LRU cache of decoded packet objects for packet records
+decodedCacheSize = 256 #maximum number of decoded packet objects in cache
+decodedLock = threading.Lock() #lock for the decoded packets cache, the capture thread renders and evicts packets while the GUI thread shows them
+infoCache = InfoCache() #LRU cache of the extended information of packets, bounded by memory
+packetStore = None #indexed packet store of loaded pcap file, packets are kept in it instead of packet dictionary
+firstPacketId = 0 #id of the oldest packet in packet dictionary, packets before it were evicted by the retention limits
+
+#method that clears the packet dictionary and resets the packet counter for a new scan
+def clearPacketDictionary():
+    global packetCounter, packetStore, firstPacketId
+    packetDictionary.clear() #clear the main packet dictionary
+    with decodedLock:
+        decodedPackets.clear() #clear the decoded packets cache
+    infoCache.clear() #clear the extended information cache, packet ids start again
+    packetCounter = 0 #reset the packet counter
+    firstPacketId = 0 #reset the id of the oldest packet
+    if packetStore is not None: #if true we close the mapped file of the loaded pcap file
+        packetStore.close()
+        packetStore = None
+
+
+#method that sets the indexed packet store of a loaded pcap file, packets are then read from the mapped file instead of packet dictionary
+def setPacketStore(store):
+    global packetStore
+    packetStore = store
+
+
+#method that sets the memory budget in bytes of the extended information cache, zero disables the cache
+def setInfoCacheSize(maxBytes):
+    infoCache.setMaxBytes(maxBytes)
+
+
+#method that removes the oldest packet from packet dictionary and returns its record, ids are consecutive so this takes constant time
+def evictOldestPacket():
+    global firstPacketId
+    record = packetDictionary.pop(firstPacketId, None) #the oldest packet record
+    with decodedLock:
+        decodedPackets.pop(firstPacketId, None) #remove its decoded packet object from cache
+    infoCache.remove(firstPacketId) #remove its extended information from cache
+    firstPacketId += 1 #the next packet is now the oldest
+    return record
+
+
+#method that returns the id of the oldest stored packet, ids before it were evicted
+def getFirstPacketId():
+    return firstPacketId
+
+
+#method that returns the number of evicted packets since packets were last cleared
+def getEvictedCount():
+    return firstPacketId
+
+
+#method that returns the packet record with given packet id
+def getPacketRecord(id):
+    return packetStore.getRecord(id) if packetStore is not None else packetDictionary[id]
+
+
+#method that returns the number of stored packets
+def getPacketCount():
+    return len(packetStore) if packetStore is not None else len(packetDictionary)
+
+
+#method that returns the column store of the loaded pcap file, none if no pcap file is loaded
+def getPacketColumns():
+    return packetStore.columns if packetStore is not None else None
+
+
+#method that returns the range of ids of the stored packets, used for exporting a consistent snapshot while capturing
+def getPacketIdRange():
+    return range(len(packetStore)) if packetStore is not None else range(firstPacketId, packetCounter)
+
+
+#method for iterating over all stored packet records in order of their packet ids
+def getPacketRecords():
+    return packetStore.getRecords() if packetStore is not None else iter(list(packetDictionary.values()))
+
+
+#dictionary for packet kinds and their layers and methods for handling, the order represents the priority of each packet type
+captureDictionary = {
+    'HTTP': (HTTP, handleHTTP),
+    'TLS': (TLS, handleTLS),
+    'DHCP': (DHCP, handleDHCP),
+    'DNS': (DNS, handleDNS),
+    'TCP': (TCP, handleTCP),
+    'UDP': (UDP, handleUDP),
+    'ICMP': (ICMP, handleICMP),
+    'ARP': (ARP, handleARP),
+    'IGMP': (IGMP, handleIGMP),
+    'STP': (STP, handleSTP),
+}
+
+
+#dictionary of packet classes by name, used for rendering packets that were dissected in another process
+packetClasses = {packetClass.__name__: packetClass for packetClass in (TCP_Packet, UDP_Packet, HTTP_Packet, DNS_Packet, TLS_Packet, ICMP_Packet, DHCP_Packet, ARP_Packet, IGMP_Packet, STP_Packet)}
+
+
+#method that classifies a dissected packet with the packet filter and calls the matching handle method, returns the handled packet object or none
+#metrics are the pipeline metrics the time of the handle method is added to, none for no timing
+def classifyPacket(packet, packetFilter, metrics=None):
+    #for each packet we receive we send it to the dict to determine its identity and call the necessary handle method
+    layers = getLayerMap(packet) #map of the layers of the packet, kept for rendering the packet
+    for packetType, handler in packetFilter.items():
+        if packetType in layers: #if we found matching packet we call its handle method
+            return callHandler(handler, packet, metrics) #call handler method of the packet, none if packet is not valid
+    return None
+
+
+#method that calls the handle method of a packet and adds its time to the pipeline metrics if given, returns the handled packet object or none
+def callHandler(handler, packet, metrics=None):
+    if metrics is None: #if true the pipeline isn't timed
+        return handler(packet)
+    startTime = time.perf_counter() #start time of the handle method
+    handledPacket = handler(packet)
+    metrics.addStageTime('handle', startTime)
+    return handledPacket
+
+
+#method that classifies a raw frame with the fast path classifier and calls the matching handle method, returns the handled packet object or none
+#frames the classifier drops are never dissected, frames it is unsure about are dissected and classified with classifyPacket
+#frames with a payload from tcp reassembly are dissected with it and classified with classifyPacket, the classifier only sees the frame's own payload
+#metrics are the pipeline metrics the time of classification, dissection and the handle method is added to, none for no timing
+def classifyFrame(frame, timestamp, linkType, packetFilter, packetClassifier, payload=None, metrics=None):
+    startTime = time.perf_counter() if metrics is not None else None #start time of the first stage when timing the pipeline
+    if payload is not None: #if true the frame is dissected with its reassembled payload
+        packet = decodeFrame(frame, timestamp, linkType, payload)
+        if metrics is not None:
+            metrics.addStageTime('dissect', startTime)
+        return classifyPacket(packet, packetFilter, metrics)
+    decision = packetClassifier.classify(frame, linkType) #classify the frame from its raw bytes
+    if metrics is not None:
+        startTime = metrics.addStageTime('classify', startTime)
+    if decision is PacketClassifier.DROP: #if true no packet type of the filter matches so we skip dissection
+        return None
+    packet = decodeFrame(frame, timestamp, linkType) #dissect the frame for the handle method
+    if metrics is not None:
+        metrics.addStageTime('dissect', startTime)
+    if decision is not PacketClassifier.UNSURE and decision[0] in getLayerMap(packet): #if true we call the chosen handle method directly
+        return callHandler(decision[1], packet, metrics)
+    return classifyPacket(packet, packetFilter, metrics) #else we classify the dissected packet
+
+
+#method that compares the fast path classifier with classifyPacket on a list of raw frames, returns a dictionary of counts and mismatches
+#frames the classifier is unsure about and frames whose chosen layer scapy didn't dissect are counted, classifyFrame passes them to classifyPacket
+def verifyClassifier(frames, packetFilter):
+    packetClassifier = PacketClassifier(packetFilter) #the classifier for the given packet filter
+    results = {'frames': 0, 'dropped': 0, 'handled': 0, 'unsure': 0, 'fallbacks': 0, 'mismatches': []} #counts of the classification results
+    for index, (frame, timestamp, linkType) in enumerate(frames):
+        results['frames'] += 1
+        decision = packetClassifier.classify(frame, linkType) #classify the frame from its raw bytes
+        if decision is PacketClassifier.UNSURE: #if true the frame is classified by scapy anyway
+            results['unsure'] += 1
+            continue
+        expected = classifyPacket(decodeFrame(frame, timestamp, linkType), packetFilter) #the handled packet of the scapy path
+        if decision is PacketClassifier.DROP: #if true the fast path drops the frame without dissecting it
+            actual = None
+        else: #else the fast path calls the chosen handle method
+            packet = decodeFrame(frame, timestamp, linkType)
+            if decision[0] not in getLayerMap(packet): #if true scapy didn't dissect the chosen layer so classifyFrame falls back to classifyPacket
+                results['fallbacks'] += 1
+                continue
+            actual = decision[1](packet)
+        results['dropped' if actual is None else 'handled'] += 1
+        if type(expected) is not type(actual): #if true the fast path picked a different handle method
+            results['mismatches'].append((index, type(expected).__name__ if expected is not None else None, type(actual).__name__ if actual is not None else None))
+    clearPacketDictionary() #remove the records the handle methods inserted
+    return results
+
+
+#method that dissects a raw frame with the matching link layer, payload replaces the tcp payload with the messages tcp reassembly completed with the frame
+def decodeFrame(frame, timestamp, linkType, payload=None):
+    packet = conf.l2types.num2layer.get(linkType, conf.raw_layer)(frame) #dissect the frame with the matching link layer
+    packet.time = timestamp #set the capture timestamp of the frame
+    if payload is not None and packet.haslayer(TCP): #if true we dissect the reassembled payload in place of the tcp payload
+        tcpLayer = packet[TCP]
+        tcpLayer.remove_payload()
+        tcpLayer.add_payload(tcpLayer.guess_payload_class(payload)(payload)) #dissect the messages with the layer scapy binds to the ports
+        packet.reassembledPayload = payload #the record of the packet keeps the payload for dissecting it again
+    return packet
+
+
+#method that returns the ports that scapy binds to the given layer on top of the given base layer, e.g. tcp ports of HTTP
+def getLayerPorts(baseLayer, layer):
+    ports = set() #set of ports of the layer
+    for fields, payloadLayer in baseLayer.payload_guess: #iterate over the layer bindings of the base layer
+        if payloadLayer is layer: #if true the binding dissects the layer so we add its ports
+            ports.update(value for field, value in fields.items() if field in ('sport', 'dport'))
+    return sorted(ports)
+
+
+#method that returns a BPF expression that matches any of the given ports on top of the given transport protocol
+def getPortsExpression(transport, ports):
+    return f'({transport} and ({" or ".join(f"port {port}" for port in ports)}))'
+
+
+#method that compiles the packet types of the packet filter and the port and ip string into one BPF expression for the kernel
+#returns the BPF expression and a list of notes for packet types that still need a userspace check
+def getBPFFilter(packetFilter, PortandIp=''):
+    protocols = [protocol for protocol, (layer, handler) in captureDictionary.items() if layer in packetFilter] #names of chosen packet types
+    expressions, notes = [], [] #list of BPF expressions of the packet types and notes for userspace checks
+    for protocol in protocols:
+        if protocol in ('TCP', 'UDP', 'ICMP', 'ARP', 'IGMP', 'STP'): #these packet types are matched by a BPF keyword
+            expressions.append(protocol.lower())
+        elif protocol in ('HTTP', 'TLS') and 'TCP' not in protocols: #if tcp isn't chosen we narrow to the ports scapy dissects HTTP and TLS on
+            ports = getLayerPorts(TCP, captureDictionary[protocol][0])
+            expressions.append(getPortsExpression('tcp', ports))
+            notes.append(f'{protocol} detection on TCP ports {", ".join(map(str, ports))} is checked in userspace, {protocol} on other ports is not captured.')
+        elif protocol == 'DHCP' and 'UDP' not in protocols: #if udp isn't chosen we narrow to the DHCP ports
+            expressions.append(getPortsExpression('udp', getLayerPorts(UDP, BOOTP)))
+            notes.append('DHCP message types are checked in userspace.')
+        elif protocol == 'DNS': #DNS runs on top of both tcp and udp so we add the ports that aren't covered by a chosen transport
+            if 'TCP' not in protocols:
+                expressions.append(getPortsExpression('tcp', getLayerPorts(TCP, DNS)))
+            if 'UDP' not in protocols:
+                expressions.append(getPortsExpression('udp', getLayerPorts(UDP, DNS)))
+    if 'TLS' in protocols: #TLS record types can't be matched in BPF
+        notes.append('TLS handshake records are checked in userspace.')
+    if 'IGMP' in protocols: #IGMP message types are checked by the handle method
+        notes.append('IGMP message types are checked in userspace.')
+    expression = ' or '.join(expressions) #the packet types expression
+    if PortandIp: #if true we combine the packet types with the port and ip expression
+        expression = f'({expression}) and ({PortandIp})' if expression else PortandIp
+    return expression, notes
+
+
+#method that returns the packet filter dictionary of packet layers and their handle methods for the given packet type names
+def getPacketFilter(protocols=None):
+    protocols = captureDictionary.keys() if protocols is None else [protocol.upper() for protocol in protocols] #if no protocols given we capture all types
+    for protocol in protocols: #check that all given packet types are supported
+        if protocol not in captureDictionary: #if true the packet type is unknown so we raise a ValueError exception
+            raise ValueError(f'Error, unknown packet type {protocol}, supported types are: {", ".join(captureDictionary)}.')
+    packetFilter = {layer: handler for protocol, (layer, handler) in captureDictionary.items() if protocol in protocols} #keep the priority order of the capture dictionary
+    if not packetFilter: #if dictionary is empty we raise a new exception to indicate of an error 
+        raise Exception('Error, you must choose at least one type for scan.')
+    return packetFilter
+
+#---------------------------------------------------HELPER-FUNCTIONS-END----------------------------------------------------#
+
+#---------------------------------------------------PacketCaptureEngine-----------------------------------------------------#
+#capture engine that runs the packet pipeline without any GUI dependency, used by the GUI thread and the command line
+class PacketCaptureEngine():
+    interface = None #interface of network, or a list of interfaces that are captured in parallel, none for all interfaces
+    packetFilter = None #represents the packet type filter dictionary of layers and handle methods
+    PortandIp = None #string that represents the BPF filter for sniffer to filter with
+    timeout = None #capture duration in seconds, none for unlimited capture
+    count = 0 #number of handled packets to capture, zero for unlimited capture
+    packetSink = None #callable that receives each handled packet object
+    packetList = None #packet list for loading scan with pcap file
+    pcapFile = None #path of pcap or pcapng file for loading scan, streamed through the pipeline
+    pcapReader = None #streaming reader of the pcap file of current load, an offset index of the mapped file when indexFile is set
+    indexFile = False #flag for keeping the handled packets of the pcap file in an indexed packet store instead of packet dictionary
+    framePosition = 0 #position of current frame in the pcap file
+    batchSize = 256 #number of frames read from the pcap file before passing them to the pipeline
+    backend = 'auto' #name of the capture backend, auto prefers the TPACKET_V3 ring on Linux
+    backendOptions = None #dictionary of extra options for the capture backend, e.g. fanoutGroup
+    captureBackend = None #capture backend of current capture
+    kernelFilter = True #flag for compiling the chosen packet types into the kernel BPF filter
+    bpfFilter = None #BPF filter of current capture
+    filterNotes = None #notes for packet types that can't be fully expressed in BPF and are checked in userspace
+    workers = 0 #number of worker processes for dissection, zero for dissecting in the capture thread
+    packetClassifier = None #fast path classifier for raw frames, none if disabled
+    retention = None #retention limits of stored packets, none for keeping all packets
+    packetColumns = None #column store for the summary fields of packets of the indexed packet store, none for a new store
+    rollingWriter = None #rolling pcap writer that writes each handled packet to disk during the capture, none for no writing
+    dissectionPool = None #pool of worker processes of current capture
+    packetQueue = None #bounded queue the packet sink puts handled packets in, its counters are reported by getCounters
+    flowTable = None #flow table that accounts each handled packet to its conversation, none for no flow tracking
+    packetStatistics = None #columnar store of packet metadata for statistics, none for no statistics
+    reassembler = None #tcp reassembly of the frames, HTTP messages and TLS handshake records split across segments are dissected as a whole, none for no reassembly
+    metrics = None #pipeline metrics the stages of the capture thread are timed with, none for no instrumentation
+    frameInterface = None #interface of the frames that are handled, handled packets are tagged with it, none if its unknown
+    receivedCount = 0 #number of frames received from the capture backend or pcap file in current capture
+    dissectedCount = 0 #number of frames that were dissected and classified in current capture
+    filteredCount = 0 #number of dissected frames that don't match the chosen packet types
+    handledCount = 0 #number of handled packets in current capture
+    stopCapture = False #flag for capture status
+
+    def __init__(self, packetFilter, PortandIp='', interface=None, timeout=None, count=0, packetSink=None, packetList=None, backend='auto', backendOptions=None, workers=0, kernelFilter=True, fastPath=True, pcapFile=None, indexFile=False, retention=None, rollingWriter=None, packetColumns=None, packetQueue=None, flowTable=None, reassembler=None, packetStatistics=None, metrics=None):
+        self.packetFilter = packetFilter #set the packet filter for the pipeline
+        self.PortandIp = PortandIp #set the BPF filter string for filtering with desired port and ip
+        self.interface = interface if interface else None #initialize the network interface if given
+        self.timeout = timeout #set the capture duration if given
+        self.count = count #set the packet count limit if given
+        self.packetSink = packetSink #set the packet sink for handled packets
+        self.packetList = packetList #set the packet list if given
+        self.pcapFile = pcapFile #set the pcap file if given
+        self.indexFile = indexFile #set the indexed packet store flag
+        self.retention = retention #set the retention limits if given
+        self.rollingWriter = rollingWriter #set the rolling pcap writer if given
+        self.packetColumns = packetColumns #set the column store of the indexed packet store if given
+        self.packetQueue = packetQueue #set the packet queue of the packet sink if given
+        self.flowTable = flowTable #set the flow table if given
+        self.packetStatistics = packetStatistics #set the statistics store if given
+        self.reassembler = reassembler if HTTP in packetFilter or TLS in packetFilter else None #set the tcp reassembly if given, its only needed for dissecting HTTP and TLS
+        self.metrics = metrics #set the pipeline metrics if given
+        self.backend = backend #set the capture backend name
+        self.backendOptions = backendOptions if backendOptions else {} #set the capture backend options if given
+        self.workers = workers #set the number of dissection worker processes
+        self.kernelFilter = kernelFilter #set the kernel filter flag
+        self.packetClassifier = PacketClassifier(packetFilter) if fastPath else None #create the fast path classifier if enabled
+        self.bpfFilter, self.filterNotes = PortandIp, [] #BPF filter is the port and ip filter unless we add the packet types
+        if kernelFilter and packetList is None and pcapFile is None: #if true we compile the packet types into the BPF filter of the live capture
+            self.bpfFilter, self.filterNotes = getBPFFilter(packetFilter, PortandIp)
+            try: #we check that the combined filter compiles, else we fall back to the port and ip filter
+                compile_filter(self.bpfFilter, linktype=1)
+            except (ImportError, Scapy_Exception) as e: #if libpcap is missing or filter is invalid we check the packet types in userspace
+                self.bpfFilter, self.filterNotes = PortandIp, [f'Kernel packet type filter unavailable ({e}), all packet types are checked in userspace.']
+        if metrics is not None: #if true we export the counters and queue depths of the engine with the metrics
+            self.addMetrics(metrics)
+
+
+    #method that adds the counters and queue depths of the engine and its components to the pipeline metrics, they're read when metrics are exported
+    def addMetrics(self, metrics):
+        metrics.addMetric('sniffserpent_frames_total', 'counter', 'Frames of each pipeline counter, received frames are dissected and either filtered or handled', lambda: {f'counter="{name}"': value for name, value in self.getCounters().items() if name not in ('queued', 'queueDropped')}, 'Frames')
+        metrics.addMetric('sniffserpent_queue_depth', 'gauge', 'Items waiting in the queues of the pipeline', lambda: {
+            'queue="packet"': self.packetQueue.qsize() if self.packetQueue is not None else None,
+            'queue="dissection"': len(self.dissectionPool.frames) if self.dissectionPool is not None else None,
+            'queue="writer"': self.rollingWriter.frameQueue.qsize() if self.rollingWriter is not None else None
+        }, 'Queue Depths')
+        metrics.addMetric('sniffserpent_queue_dropped_total', 'counter', 'Items dropped by the queues of the pipeline because they were full', lambda: {
+            'queue="packet"': self.packetQueue.droppedCount if self.packetQueue is not None else None,
+            'queue="writer"': self.rollingWriter.droppedCount if self.rollingWriter is not None else None
+        }, 'Queue Drops')
+        metrics.addMetric('sniffserpent_interface_frames_total', 'counter', 'Frames of each interface of a multi interface capture, kernel received and dropped, dropped by the queue of the interface and merged into the pipeline', lambda: {
+            f'interface="{interface}",counter="{name}"': stats.get(name) for interface, stats in self.getStats().get('interfaces', {}).items() for name in ('received', 'dropped', 'queueDropped', 'merged')}, 'Interface Frames')
+        if self.reassembler is not None: #tcp reassembly buffers segments until their messages are complete
+            metrics.addMetric('sniffserpent_reassembly_bytes', 'gauge', 'Bytes buffered by tcp reassembly', lambda: self.reassembler.totalBytes, 'Reassembly Buffer Bytes')
+
+
+    #method that handles stopping the capture
+    def stop(self):
+        self.stopCapture = True #setting the stop flag to true will stop the loop in sniff
+
+
+    #method for sniff method of scapy to know status of flag
+    def checkStopFlag(self, packet):
+        return self.stopCapture #return the stopCapture flag
+
+
+    #method that handles the packet capturing, passes each handled packet object to the packet sink
+    def PacketCapture(self, packet):
+        self.receivedCount += 1 #increase the received frames counter
+        if self.reassembler is not None and getattr(packet, 'original', None): #if true we reassemble the raw frame of the packet
+            frame, timestamp, linkType = bytes(packet.original), float(packet.time), conf.l2types.layer2num.get(type(packet), 1)
+            payload = self.reassembler.addFrame(frame, timestamp, linkType) #the payload from tcp reassembly, none for the frame's own payload
+            if payload is not None: #if true we dissect the frame again with its reassembled payload
+                packet = decodeFrame(frame, timestamp, linkType, payload)
+        self.dispatchPacket(classifyPacket(packet, self.packetFilter, self.metrics)) #classify the packet and call its handle method
+
+
+    #method that counts a dissected frame and delivers its handled packet, handledPacket is none if the frame was filtered
+    def dispatchPacket(self, handledPacket):
+        self.dissectedCount += 1 #increase the dissected frames counter
+        if handledPacket != None: #check if its not none
+            self.deliverPacket(handledPacket)
+        else: #else the frame doesn't match the chosen packet types
+            self.filteredCount += 1
+
+
+    #method that passes a handled packet to the packet sink and checks the packet count limit, position is the position of its frame in the pcap file
+    def deliverPacket(self, handledPacket, position=None):
+        if self.indexFile and self.pcapFile is not None: #if true we keep only the position of the packet in the offset index of the file
+            storedRecord = packetDictionary.pop(handledPacket.getId()) #the record is moved to the indexed packet store
+            packetStore.addPacket(self.framePosition if position is None else position, storedRecord)
+            record = None #packets of the indexed packet store are not written or evicted
+        else: #else the record stays in the packet dictionary
+            storedRecord = record = packetDictionary.get(handledPacket.getId())
+        if self.flowTable is not None and storedRecord is not None: #if true we account the packet to its conversation
+            self.flowTable.addRecord(storedRecord)
+        if self.packetStatistics is not None and storedRecord is not None: #if true we add the metadata of the packet to the statistics
+            self.packetStatistics.addRecord(storedRecord)
+        if self.frameInterface is not None and storedRecord is not None and storedRecord.interface is None: #if true we tag the packet with the interface it was captured on
+            storedRecord.interface = self.frameInterface
+        if self.metrics is not None: #if true we count the packet for the protocol rates
+            self.metrics.addPacket((handledPacket.packetClass if isinstance(handledPacket, PacketRecord) else type(handledPacket)).__name__) #the dissection pool gives records of its packets
+        self.handledCount += 1 #increase the handled packets counter
+        if self.packetSink is not None: #if sink is set we pass the handled packet to it
+            self.packetSink(handledPacket)
+        if self.rollingWriter is not None and record is not None: #if true we queue the frame for the writer thread
+            self.rollingWriter.write(record.raw, record.time, record.linkType)
+        if self.retention is not None and record is not None: #if true we evict the oldest packets if a retention limit is reached
+            self.retention.addRecord(record)
+        if self.count and self.handledCount >= self.count: #if we reached the packet count limit we stop the capture
+            self.stop()
+
+
+    #method that handles a batch of raw frames from the capture backend, each frame is a tuple of (frame bytes, timestamp, link type)
+    #interface is the interface the frames were captured on, the multi interface backend passes it so each packet is tagged with its interface
+    def handleFrames(self, frames, interface=None):
+        if self.dissectionPool is not None: #if true we send the frames to the worker processes for dissection
+            self.receivedCount += len(frames) #increase the received frames counter
+            payloads = [self.reassembler.addFrame(*frame) for frame in frames] if self.reassembler is not None else None #frames are reassembled in capture order before they are sharded
+            self.dissectionPool.submit(frames, payloads, interface if interface is not None else self.frameInterface)
+            return
+        if interface is not None: #packets of the frames are tagged with their interface
+            self.frameInterface = interface
+        metrics = self.metrics #pipeline metrics, none for no timing
+        for frame, timestamp, linkType in frames:
+            if self.stopCapture: #if true we reached the packet count limit or capture was stopped
+                break
+            self.receivedCount += 1 #increase the received frames counter
+            self.framePosition += 1 #position of the frame in the pcap file, used by the indexed packet store
+            if self.reassembler is not None: #if true we get the payload from tcp reassembly, none for the frame's own payload
+                startTime = time.perf_counter() if metrics is not None else None
+                payload = self.reassembler.addFrame(frame, timestamp, linkType)
+                if metrics is not None:
+                    metrics.addStageTime('reassemble', startTime)
+            else: #else the frame keeps its own payload
+                payload = None
+            if self.packetClassifier is not None: #if true we classify the raw frame before dissecting it
+                self.dispatchPacket(classifyFrame(frame, timestamp, linkType, self.packetFilter, self.packetClassifier, payload, metrics))
+            elif metrics is not None: #else if true we time the dissection of the frame before classifying the packet
+                startTime = time.perf_counter()
+                packet = decodeFrame(frame, timestamp, linkType, payload)
+                metrics.addStageTime('dissect', startTime)
+                self.dispatchPacket(classifyPacket(packet, self.packetFilter, metrics))
+            else: #else we dissect the frame and classify the packet
+                self.dispatchPacket(classifyPacket(decodeFrame(frame, timestamp, linkType, payload), self.packetFilter))
+
+
+    #method that streams the records of the pcap file through the pipeline in batches, memory use does not depend on the file size
+    #with indexFile the file is read through its offset index and stays mapped after loading, so packets are decoded straight from the file by offset
+    def readPcapFile(self):
+        if self.indexFile: #if true we index the mapped file, the index is loaded from its sidecar file if the file was indexed before
+            self.pcapReader = PcapIndex(self.pcapFile) #raises ValueError if its not a pcap or pcapng file
+            setPacketStore(IndexedPacketStore(self.pcapReader, self.packetColumns)) #the store closes the mapped file when packets are cleared
+        else: #else we stream the file with the reader
+            self.pcapReader = PcapFileReader(self.pcapFile) #open the file, raises ValueError if its not a pcap or pcapng file
+        self.framePosition = -1 #position of the last frame passed to the pipeline
+        if self.workers > 0: #if true the worker processes dissect the frames
+            self.dissectionPool = DissectionPool(self, self.workers)
+            self.dissectionPool.start()
+        try:
+            frames = [] #current batch of frames
+            for frame in self.pcapReader:
+                if self.stopCapture: #if true the loading was stopped
+                    break
+                frames.append(frame)
+                if len(frames) >= self.batchSize: #if batch is full we pass it to the pipeline
+                    self.handleFrames(frames)
+                    frames = []
+            if frames and not self.stopCapture: #pass the last batch to the pipeline
+                self.handleFrames(frames)
+        finally:
+            if self.dissectionPool is not None: #wait for the workers to finish the remaining frames
+                self.dissectionPool.close()
+                self.dissectionPool = None
+            if not self.indexFile: #the indexed packet store keeps the file mapped
+                self.pcapReader.close()
+            if self.retention is not None: #flush the spill file of evicted packets
+                self.retention.close()
+            if self.rollingWriter is not None: #write the remaining frames and close the capture file
+                self.rollingWriter.close()
+
+
+    #method that returns the fraction of the pcap file that was loaded, between zero and one
+    def getProgress(self):
+        return self.pcapReader.getProgress() if self.pcapReader is not None else 0.0
+
+
+    #method that returns the statistics of the capture backend, including kernel received and dropped counts when available
+    def getStats(self):
+        return self.captureBackend.getStats() if self.captureBackend is not None else {}
+
+
+    #method that returns the counters of the packet pipeline of current capture, counters that are not available are none
+    #received frames are dissected and either filtered or handled, handled packets are queued or dropped by the packet queue, the kernel drops frames before they are received
+    def getCounters(self):
+        stats = self.getStats() #kernel statistics of the capture backend
+        return {
+            'received': self.receivedCount,
+            'dissected': self.dissectedCount,
+            'filtered': self.filteredCount,
+            'handled': self.handledCount,
+            'queued': self.packetQueue.qsize() if self.packetQueue is not None else None,
+            'queueDropped': self.packetQueue.droppedCount if self.packetQueue is not None else None,
+            'kernelReceived': stats.get('received'),
+            'kernelDropped': stats.get('dropped')
+        }
+
+
+    #run method of the engine, blocks until the capture is finished, stopped or the packet list is loaded
+    def run(self):
+        self.stopCapture = False #reset the stop flag for new capture
+        self.receivedCount, self.dissectedCount, self.filteredCount, self.handledCount = 0, 0, 0, 0 #reset the counters of the pipeline
+        self.frameInterface = self.interface if isinstance(self.interface, str) and self.packetList is None and self.pcapFile is None else None #packets of a scan on one interface are tagged with it, the multi interface backend tags each batch
+        if self.packetList is not None: #if true we received a packet list meaning we need to load scan from pcap file
+            for packet in self.packetList: #iterate through the packet list
+                if self.stopCapture: #if true the loading was stopped
+                    break
+                self.PacketCapture(packet) #call packetCapture method for each packet in list
+        elif self.pcapFile is not None: #else if we received a pcap file we stream its records through the pipeline
+            self.readPcapFile()
+        else: #else we need to start a regular scan, PermissionError is raised to the caller if we lack privileges
+            self.captureBackend = createBackend(self.backend, self.interface, self.bpfFilter, **self.backendOptions)
+            if self.workers > 0: #if true the capture thread only reads frames and the worker processes dissect them
+                self.dissectionPool = DissectionPool(self, self.workers)
+                self.dissectionPool.start()
+            try:
+                self.captureBackend.run(self) #run the capture loop of the backend
+            finally:
+                if self.dissectionPool is not None: #wait for the workers to finish the remaining frames
+                    self.dissectionPool.close()
+                    self.dissectionPool = None
+                if self.retention is not None: #flush the spill file of evicted packets
+                    self.retention.close()
+                if self.rollingWriter is not None: #write the remaining frames and close the capture file
+                    self.rollingWriter.close()
+
+#-------------------------------------------------PacketCaptureEngine-END---------------------------------------------------#
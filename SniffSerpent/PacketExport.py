@@ -0,0 +1,222 @@
+import csv
+import struct
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from FlowTable import getTransportHeader
+from PacketEngine import DNS_Packet, HTTP_Packet, TLS_Packet
+
+
+#-----------------------------------------------------HELPER-FUNCTIONS------------------------------------------------------#
+tlsHandshakeTypes = { #names of tls handshake message types
+    0: 'Hello Request', 1: 'Client Hello', 2: 'Server Hello', 4: 'New Session Ticket', 8: 'Encrypted Extensions', 11: 'Certificate',
+    12: 'Server Key Exchange', 13: 'Certificate Request', 14: 'Server Hello Done', 15: 'Certificate Verify', 16: 'Client Key Exchange', 20: 'Finished'}
+
+httpMethods = (b'GET', b'POST', b'PUT', b'DELETE', b'HEAD', b'OPTIONS', b'PATCH', b'CONNECT', b'TRACE') #methods of http requests
+
+#method that returns the ip protocol, tcp flags and transport payload of a packet record, the reassembled payload is used if the record has one
+def getTransportPayload(record):
+    header = getTransportHeader(record.raw, record.linkType) #the transport header of ip packets
+    if header is None:
+        return None, None, None
+    protocol, offset, end = header[:3]
+    if protocol == 6 and end >= offset + 20: #tcp segment, the flags are in byte 13 and the data offset in the upper nibble of byte 12
+        return protocol, record.raw[offset + 13], record.payload if record.payload is not None else record.raw[offset + (record.raw[offset + 12] >> 4) * 4:end]
+    if protocol == 17 and end >= offset + 8: #udp datagram with its fixed 8 bytes header
+        return protocol, None, record.raw[offset + 8:end]
+    return protocol, None, None
+
+
+#method that returns the name and type of the first question of a dns message, or (None, None) if it's malformed
+def getDNSQuestion(message):
+    if len(message) < 12 or not struct.unpack_from('!H', message, 4)[0]: #if true there's no question
+        return None, None
+    labels, offset, jumps = [], 12, 0 #labels of the name, offset of the next label and number of compression pointers followed
+    while offset < len(message):
+        length = message[offset]
+        if length == 0: #end of the name, the type follows it
+            if jumps == 0 and offset + 3 <= len(message): #the type is only after the name if we didn't follow a pointer
+                return '.'.join(labels) + '.', struct.unpack_from('!H', message, offset + 1)[0]
+            break
+        if length & 0xc0 == 0xc0: #compression pointer, questions rarely have them so we only read the name
+            if jumps >= 8 or offset + 2 > len(message):
+                break
+            offset, jumps = struct.unpack_from('!H', message, offset)[0] & 0x3fff, jumps + 1
+            continue
+        labels.append(message[offset + 1:offset + 1 + length].decode('ascii', 'replace'))
+        offset += length + 1
+    return ('.'.join(labels) + '.' if labels else None), None
+
+
+#method that returns the method, host and path of an http request, or (None, None, None) if it's not a request
+def getHTTPRequest(payload):
+    lineEnd = payload.find(b'\r\n') #end of the request line
+    requestLine = (payload[:lineEnd] if lineEnd >= 0 else payload).split(b' ') #method, path and version
+    if len(requestLine) < 2 or requestLine[0] not in httpMethods:
+        return None, None, None
+    host = None #host header of the request
+    headersEnd = payload.find(b'\r\n\r\n') #end of the headers
+    for line in payload[lineEnd + 2:headersEnd if headersEnd >= 0 else len(payload)].split(b'\r\n') if lineEnd >= 0 else ():
+        if line[:5].lower() == b'host:':
+            host = line[5:].strip().decode('utf-8', 'replace')
+            break
+    return requestLine[0].decode('ascii'), host, requestLine[1].decode('utf-8', 'replace')
+
+
+#method that returns the export row of a packet record, a tuple of the values of exportColumns
+def getExportRow(record):
+    dnsName, dnsType, httpMethod, httpHost, httpPath, tlsHandshake = None, None, None, None, None, None #fields of the application protocols
+    protocol, tcpFlags, payload = getTransportPayload(record) if record.srcIp is not None else (None, None, None) #ip protocol, tcp flags and transport payload of ip packets
+    if payload:
+        if record.packetClass is DNS_Packet: #dns over tcp has a two bytes length before the message
+            dnsName, dnsType = getDNSQuestion(payload[2:] if protocol == 6 else payload)
+        elif record.packetClass is HTTP_Packet:
+            httpMethod, httpHost, httpPath = getHTTPRequest(payload)
+        elif record.packetClass is TLS_Packet and payload[0] == 22 and len(payload) >= 6: #handshake record, the type of its first message is after the 5 bytes record header
+            tlsHandshake = tlsHandshakeTypes.get(payload[5], str(payload[5]))
+    return (round(record.time * 1000000), record.packetClass.__name__[:-len('_Packet')], record.srcIp, record.dstIp, record.srcPort, record.dstPort, len(record.raw),
+        tcpFlags, dnsName, dnsType, httpMethod, httpHost, httpPath, tlsHandshake, record.interface)
+
+#----------------------------------------------------HELPER-FUNCTIONS-END---------------------------------------------------#
+
+#--------------------------------------------------------ExportWriter-------------------------------------------------------#
+#base class for writing one row per packet record to a file, rows are written in batches so memory stays flat for any number of packets
+class ExportWriter(ABC):
+    exportColumns = ('time', 'protocol', 'srcIp', 'dstIp', 'srcPort', 'dstPort', 'length', 'tcpFlags', 'dnsQname', 'dnsQtype', 'httpMethod', 'httpHost', 'httpPath', 'tlsHandshakeType', 'interface') #names of the columns
+    batchSize = 16384 #number of rows kept before they are written as one batch
+    filePath = None #path of the file we write to
+    rows = None #rows of the current batch
+    writtenCount = 0 #number of rows written to the file
+
+    def __init__(self, filePath):
+        self.filePath = filePath
+        self.rows = []
+
+
+    #methods for using the writer in a with statement
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+    #method that adds the row of a packet record, the batch is written when it's full
+    def write(self, record):
+        self.rows.append(getExportRow(record))
+        if len(self.rows) >= self.batchSize: #if true we write the batch
+            self.flushRows()
+
+
+    #method that writes the rows of the current batch to the file
+    def flushRows(self):
+        if self.rows:
+            self.writeBatch(self.rows)
+            self.writtenCount += len(self.rows)
+            self.rows = []
+
+
+    #method that writes a batch of rows, implemented by each file format
+    @abstractmethod
+    def writeBatch(self, rows):
+        pass
+
+
+    #method that writes the last batch and closes the file
+    def close(self):
+        self.flushRows()
+
+#------------------------------------------------------ExportWriter-END-----------------------------------------------------#
+
+#-------------------------------------------------------CsvExportWriter-----------------------------------------------------#
+#writer for csv files with a header row, the time is written in ISO 8601 format in UTC and missing values are empty
+class CsvExportWriter(ExportWriter):
+    file = None #the open csv file
+    csvWriter = None #csv writer of the file
+
+    def __init__(self, filePath):
+        super().__init__(filePath)
+        self.file = open(filePath, 'w', newline='', encoding='utf-8')
+        self.csvWriter = csv.writer(self.file)
+        self.csvWriter.writerow(self.exportColumns)
+
+
+    #method that writes a batch of rows to the csv file
+    def writeBatch(self, rows):
+        self.csvWriter.writerows((datetime.fromtimestamp(row[0] / 1000000, timezone.utc).isoformat(),) + row[1:] for row in rows)
+
+
+    #method that writes the last batch and closes the file
+    def close(self):
+        if self.file is not None:
+            try:
+                super().close()
+            finally:
+                self.file.close()
+                self.file = None
+
+#-----------------------------------------------------CsvExportWriter-END---------------------------------------------------#
+
+#------------------------------------------------------ArrowExportWriter----------------------------------------------------#
+#writer for Arrow IPC files, each batch of rows is converted to typed columns and written as one record batch
+class ArrowExportWriter(ExportWriter):
+    pyarrow = None #the pyarrow module, imported when the writer is created
+    schema = None #arrow schema of the columns
+    writer = None #the arrow writer of the file
+
+    def __init__(self, filePath):
+        super().__init__(filePath)
+        try: #pyarrow is only needed for the Parquet and Arrow formats
+            import pyarrow
+        except ImportError:
+            raise ImportError('Parquet and Arrow export requires pyarrow, install it with: pip install pyarrow') from None
+        self.pyarrow = pyarrow
+        columnTypes = (pyarrow.timestamp('us', tz='UTC'), pyarrow.string(), pyarrow.string(), pyarrow.string(), pyarrow.uint16(), pyarrow.uint16(), pyarrow.uint32(),
+            pyarrow.uint8(), pyarrow.string(), pyarrow.uint16(), pyarrow.string(), pyarrow.string(), pyarrow.string(), pyarrow.string(), pyarrow.string()) #types of exportColumns
+        self.schema = pyarrow.schema(list(zip(self.exportColumns, columnTypes)))
+        self.writer = self.createWriter()
+
+
+    #method that opens the file for writing record batches
+    def createWriter(self):
+        return self.pyarrow.ipc.new_file(self.filePath, self.schema)
+
+
+    #method that writes a batch of rows as one record batch
+    def writeBatch(self, rows):
+        columns = [self.pyarrow.array(values, field.type) for values, field in zip(zip(*rows), self.schema)] #typed columns of the batch
+        self.writer.write_batch(self.pyarrow.RecordBatch.from_arrays(columns, schema=self.schema))
+
+
+    #method that writes the last batch and closes the file
+    def close(self):
+        if self.writer is not None:
+            try:
+                super().close()
+            finally:
+                self.writer.close()
+                self.writer = None
+
+#----------------------------------------------------ArrowExportWriter-END--------------------------------------------------#
+
+#-----------------------------------------------------ParquetExportWriter---------------------------------------------------#
+#writer for Parquet files, each batch of rows is written as one row group
+class ParquetExportWriter(ArrowExportWriter):
+    #method that opens the file for writing row groups
+    def createWriter(self):
+        import pyarrow.parquet
+        return pyarrow.parquet.ParquetWriter(self.filePath, self.schema, compression='zstd')
+
+#---------------------------------------------------ParquetExportWriter-END-------------------------------------------------#
+
+#-----------------------------------------------------CREATE-EXPORT-WRITER--------------------------------------------------#
+exportFormats = {'csv': CsvExportWriter, 'arrow': ArrowExportWriter, 'feather': ArrowExportWriter, 'ipc': ArrowExportWriter, 'parquet': ParquetExportWriter} #writers by format and file extension
+
+#method that creates the export writer of a file, the format is given or taken from the file extension
+def createExportWriter(filePath, exportFormat=None):
+    exportFormat = exportFormat or filePath.rsplit('.', 1)[-1].lower() #the format of the file
+    if exportFormat not in exportFormats:
+        raise ValueError(f'Unknown export format "{exportFormat}", use one of: csv, parquet, arrow')
+    return exportFormats[exportFormat](filePath)
+
+#---------------------------------------------------CREATE-EXPORT-WRITER-END------------------------------------------------#
@@ -0,0 +1,127 @@
+import threading
+import numpy as np
+from FlowTable import getTransportHeader
+from PacketEngine import packetClasses
+
+
+#----------------------------------------------------PacketStatistics-------------------------------------------------------#
+#columnar store of packet metadata in fixed width NumPy arrays, rows are appended in batches and statistics are computed with vectorized operations
+#addresses are kept once in a table and rows keep their codes, so each row takes 26 bytes and talkers are counted with bincount
+class PacketStatistics():
+    columnTypes = {'times': np.float64, 'lengths': np.uint32, 'protocols': np.uint8, 'tcpFlags': np.uint8, 'srcAddresses': np.uint32, 'dstAddresses': np.uint32, 'srcPorts': np.uint16, 'dstPorts': np.uint16} #columns and their types
+    protocolNames = tuple(name[:-len('_Packet')] for name in packetClasses) #names of packet types by protocol code
+    protocolCodes = {packetClass: code for code, packetClass in enumerate(packetClasses.values())} #protocol codes by packet class
+    sizeBins = (0, 64, 128, 256, 512, 1024, 1519, 9001, 65536) #edges of the packet size histogram, the last bins are jumbo frames and offloaded frames
+    batchSize = 4096 #number of rows kept in a list before they are appended to the arrays
+    columns = None #dictionary of arrays by column name, arrays have spare capacity after the rows
+    count = 0 #number of rows in the arrays
+    pending = None #list of rows that were not appended to the arrays yet
+    addresses = None #table of addresses by code, code zero is for packets without address
+    addressCodes = None #dictionary of address codes by address
+    lock = None #lock for the pending rows and arrays, packets are added by the capture thread while the GUI computes statistics
+
+    def __init__(self, capacity=65536):
+        self.columns = {name: np.zeros(capacity, dtype) for name, dtype in self.columnTypes.items()}
+        self.pending = []
+        self.addresses = ['']
+        self.addressCodes = {'': 0}
+        self.lock = threading.Lock()
+
+
+    #method that returns the number of rows
+    def __len__(self):
+        return self.count + len(self.pending)
+
+
+    #method that returns the code of an address, new addresses are added to the table
+    def getAddressCode(self, address):
+        code = self.addressCodes.get(address)
+        if code is None: #if true its a new address
+            code = self.addressCodes[address] = len(self.addresses)
+            self.addresses.append(address)
+        return code
+
+
+    #method that adds the metadata of a packet record, rows are appended to the arrays in batches
+    def addRecord(self, record):
+        header = getTransportHeader(record.raw, record.linkType) if record.srcIp is not None else None #the transport header of ip packets for the tcp flags
+        tcpFlags = record.raw[header[1] + 13] if header is not None and header[0] == 6 and header[2] >= header[1] + 14 else 0 #the tcp flags of the packet
+        with self.lock:
+            self.pending.append((record.time, len(record.raw), self.protocolCodes.get(record.packetClass, 255), tcpFlags, self.getAddressCode(record.srcIp or ''),
+                self.getAddressCode(record.dstIp or ''), record.srcPort or 0, record.dstPort or 0))
+            if len(self.pending) >= self.batchSize: #if true we append the batch to the arrays
+                self.flushRows()
+
+
+    #method that appends the pending rows to the arrays, the arrays double their capacity when full, the lock must be held
+    def flushRows(self):
+        if not self.pending:
+            return
+        count = self.count + len(self.pending) #number of rows after the batch
+        capacity = len(self.columns['times']) #current capacity of the arrays
+        if count > capacity: #if true we grow the arrays, the old arrays stay valid for readers that took them before
+            capacity = max(count, capacity * 2)
+            for name, column in self.columns.items():
+                grown = np.zeros(capacity, column.dtype)
+                grown[:self.count] = column[:self.count]
+                self.columns[name] = grown
+        for name, values in zip(self.columnTypes, zip(*self.pending)): #append each column of the batch
+            self.columns[name][self.count:count] = values
+        self.count = count
+        self.pending = []
+
+
+    #method that returns a dictionary of the columns with all rows, the arrays are views that later rows don't change
+    def getColumns(self):
+        with self.lock:
+            self.flushRows()
+            return {name: column[:self.count] for name, column in self.columns.items()}
+
+
+    #method that returns a list of (protocol, packets, bytes) for each packet type, sorted by bytes
+    def getProtocolBreakdown(self, columns=None):
+        columns = columns if columns is not None else self.getColumns()
+        packets = np.bincount(columns['protocols'], minlength=256) #number of packets of each protocol code
+        sizes = np.bincount(columns['protocols'], weights=columns['lengths'].astype(np.float64), minlength=256).astype(np.int64) #number of bytes of each protocol code
+        order = np.argsort(-sizes, kind='stable') #protocol codes by bytes
+        return [(self.protocolNames[code] if code < len(self.protocolNames) else 'Other', int(packets[code]), int(sizes[code])) for code in order if packets[code]]
+
+
+    #method that returns a list of (address, packets, bytes) of the addresses that sent and received the most bytes, or the most packets if byPackets is set
+    def getTopTalkers(self, count=10, byPackets=False, columns=None):
+        columns = columns if columns is not None else self.getColumns()
+        addressCount = len(self.addresses) #number of address codes, the table only grows so its length covers all rows
+        lengths = columns['lengths'].astype(np.float64) #weights for counting bytes, converted once for both directions
+        packets = np.bincount(columns['srcAddresses'], minlength=addressCount) + np.bincount(columns['dstAddresses'], minlength=addressCount) #packets each address sent or received
+        sizes = np.bincount(columns['srcAddresses'], weights=lengths, minlength=addressCount) + np.bincount(columns['dstAddresses'], weights=lengths, minlength=addressCount) #bytes each address sent or received
+        packets[0], sizes[0] = 0, 0 #packets without address are not talkers
+        values = packets if byPackets else sizes #the values we rank by
+        top = np.argpartition(-values, count)[:count] if len(values) > count else np.arange(len(values)) #codes of the top addresses in any order
+        top = top[np.argsort(-values[top], kind='stable')] #sort the top addresses
+        return [(self.addresses[code], int(packets[code]), int(sizes[code])) for code in top if packets[code]]
+
+
+    #method that returns a list of (low size, high size, packets) for the bins of the packet size histogram, packets longer than the last edge are in the last bin
+    def getSizeHistogram(self, bins=None, columns=None):
+        columns = columns if columns is not None else self.getColumns()
+        bins = bins if bins is not None else self.sizeBins #edges of the bins
+        indexes = np.clip(np.searchsorted(bins, columns['lengths'], side='right') - 1, 0, len(bins) - 2) #bin of each packet
+        counts = np.bincount(indexes, minlength=len(bins) - 1) #number of packets in each bin
+        return [(bins[index], bins[index + 1] - 1, int(counts[index])) for index in range(len(bins) - 1)]
+
+
+    #method that represents the statistics as text for the extended information section and the CLI
+    def moreInfo(self, count=10):
+        columns = self.getColumns()
+        totalBytes = int(columns['lengths'].sum(dtype=np.uint64)) #number of bytes of all packets
+        duration = float(columns['times'].max() - columns['times'].min()) if self.count else 0 #time between the first and last packet
+        output = f'Statistics: {self.count} packets, {totalBytes} bytes, {duration:.3f} seconds\n\n' #add the totals to output
+        output += 'Protocols:\n' #add the protocol breakdown to output
+        output += ''.join(f'{name}: {packets} packets, {sizes} bytes\n' for name, packets, sizes in self.getProtocolBreakdown(columns))
+        output += f'\nTop {count} Talkers:\n' #add the top talkers to output
+        output += ''.join(f'{address}: {packets} packets, {sizes} bytes\n' for address, packets, sizes in self.getTopTalkers(count, columns=columns))
+        output += '\nPacket Sizes:\n' #add the size histogram to output
+        output += ''.join(f'{low}-{high} bytes: {packets} packets\n' for low, high, packets in self.getSizeHistogram(columns=columns) if packets)
+        return output + '\n'
+
+#--------------------------------------------------PacketStatistics-END-----------------------------------------------------#
@@ -0,0 +1,407 @@
+import os
+import sys
+import mmap
+import time
+import struct
+import threading
+from queue import Queue, Empty, Full
+from array import array
+
+
+#------------------------------------------------------PcapFileReader-------------------------------------------------------#
+#streaming reader for pcap and pcapng files over a memory mapped file, the operating system pages the file in and out so memory use does not depend on the file size
+#each record is returned as a tuple of (frame bytes, timestamp, link type), the same format the capture backends pass to the engine
+class PcapFileReader():
+    pcapMagics = {0xa1b2c3d4: 1e-6, 0xa1b23c4d: 1e-9} #magic numbers of pcap files and their timestamp resolution
+    pcapngMagic = 0x0a0d0d0a #block type of the pcapng section header block, also the first bytes of the file
+    filePath = None #path of the file
+    file = None #file object of the file
+    data = None #memory mapped content of the file
+    fileSize = 0 #size of the file in bytes
+    fileFormat = None #format of the file, pcap or pcapng
+    byteOrder = '<' #byte order of the file or current pcapng section
+    linkType = None #link type of a pcap file
+    timeResolution = 1e-6 #timestamp resolution of a pcap file
+    interfaces = None #list of tuples of (link type, timestamp resolution, timestamp offset) of interfaces in current pcapng section
+    position = 0 #offset of the next record in the file
+
+    def __init__(self, filePath):
+        self.filePath = filePath #set the file path
+        self.fileSize = os.path.getsize(filePath) #get the file size for progress
+        if self.fileSize < 24: #if true the file is too short for any capture file, empty files can't be mapped
+            raise ValueError('Error, file is not a valid PCAP or PCAPNG file.')
+        self.file = open(filePath, 'rb') #open the file for reading
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) #map the whole file, pages are read on access
+            self.readFileHeader() #detect the file format, raises ValueError if file is not a pcap or pcapng file
+        except Exception:
+            self.close()
+            raise
+
+
+    #method for using the reader in a with statement
+    def __enter__(self):
+        return self
+
+
+    #method for closing the reader at the end of a with statement
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+    #method that unmaps and closes the file
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+    #method that returns the fraction of the file that was read, between zero and one
+    def getProgress(self):
+        return min(1.0, self.position / self.fileSize) if self.fileSize else 1.0
+
+
+    #method that returns the bytes of a frame by its offset and length in the file
+    def getFrame(self, offset, length):
+        return self.data[offset:offset + length]
+
+
+    #method that reads the file header and detects the file format and byte order
+    def readFileHeader(self):
+        for byteOrder in ('<', '>'): #check the magic number in both byte orders
+            magic = struct.unpack_from(byteOrder + 'I', self.data)[0]
+            if magic in self.pcapMagics: #if true its a pcap file
+                self.fileFormat, self.byteOrder, self.timeResolution = 'pcap', byteOrder, self.pcapMagics[magic]
+                self.linkType = struct.unpack_from(byteOrder + 'I', self.data, 20)[0] & 0x0fffffff #link type of the file without the FCS bits
+                self.position = 24 #records start after the global header
+                return
+        if struct.unpack_from('<I', self.data)[0] == self.pcapngMagic: #if true its a pcapng file, the block type is the same in both byte orders
+            self.fileFormat, self.interfaces, self.position = 'pcapng', [], 0 #the section header block is read by the record loop
+            return
+        raise ValueError('Error, file is not a valid PCAP or PCAPNG file.')
+
+
+    #method for iterating over the frames of the file
+    def __iter__(self):
+        data = self.data
+        for offset, length, timestamp, linkType in self.iterRecords():
+            yield data[offset:offset + length], timestamp, linkType
+
+
+    #method for iterating over the records of the file, returns tuples of (frame offset, frame length, timestamp, link type)
+    def iterRecords(self):
+        return self.readPcapRecords() if self.fileFormat == 'pcap' else self.readPcapngRecords()
+
+
+    #method that reads the records of a pcap file
+    def readPcapRecords(self):
+        recordHeader = struct.Struct(self.byteOrder + 'IIII') #represents the pcap record header of timestamp, captured length and original length
+        data, fileSize, position = self.data, self.fileSize, self.position
+        while position + 16 <= fileSize:
+            seconds, fraction, capturedLength, _ = recordHeader.unpack_from(data, position)
+            if position + 16 + capturedLength > fileSize: #if true the last record is truncated
+                break
+            self.position = position + 16 + capturedLength #offset of next record
+            yield position + 16, capturedLength, seconds + fraction * self.timeResolution, self.linkType
+            position = self.position
+
+
+    #method that reads the blocks of a pcapng file and returns the packet records
+    def readPcapngRecords(self):
+        data, fileSize = self.data, self.fileSize
+        while self.position + 12 <= fileSize:
+            position = self.position
+            if struct.unpack_from('<I', data, position)[0] == self.pcapngMagic: #if true its a section header block, it sets the byte order of the section
+                self.byteOrder = '<' if struct.unpack_from('<I', data, position + 8)[0] == 0x1a2b3c4d else '>'
+                self.interfaces = [] #interfaces are numbered from zero in each section
+            blockType, blockLength = struct.unpack_from(self.byteOrder + 'II', data, position)
+            if blockLength < 12 or position + blockLength > fileSize: #if true the block is malformed or truncated
+                break
+            self.position = position + blockLength #offset of next block
+            record = self.readPcapngBlock(blockType, position + 8, blockLength - 12)
+            if record is not None: #if true its a packet block
+                yield record
+
+
+    #method that parses a pcapng block body at given offset, returns a packet record for packet blocks and none for other blocks
+    def readPcapngBlock(self, blockType, offset, bodyLength):
+        data, byteOrder = self.data, self.byteOrder
+        if blockType == 6: #enhanced packet block
+            interfaceId, timestampHigh, timestampLow, capturedLength = struct.unpack_from(byteOrder + 'IIII', data, offset)
+            frameOffset = offset + 20
+        elif blockType == 3: #simple packet block, it has no timestamp and belongs to the first interface
+            interfaceId, timestampHigh, timestampLow = 0, 0, 0
+            frameOffset, capturedLength = offset + 4, min(struct.unpack_from(byteOrder + 'I', data, offset)[0], bodyLength - 4) #packet data is padded to 32 bits
+        elif blockType == 2: #obsolete packet block
+            interfaceId, timestampHigh, timestampLow, capturedLength = struct.unpack_from(byteOrder + 'H2xIII', data, offset)
+            frameOffset = offset + 20
+        elif blockType == 1: #interface description block, we keep the link type and timestamp options of the interface
+            self.interfaces.append(self.readInterfaceOptions(offset, bodyLength))
+            return None
+        else: #else its a block without packet data
+            return None
+        if interfaceId >= len(self.interfaces) or frameOffset + capturedLength > offset + bodyLength: #if true the packet refers to an unknown interface or is malformed
+            return None
+        linkType, timeResolution, timeOffset = self.interfaces[interfaceId]
+        return frameOffset, capturedLength, ((timestampHigh << 32) | timestampLow) * timeResolution + timeOffset, linkType
+
+
+    #method that parses an interface description block, returns a tuple of (link type, timestamp resolution, timestamp offset)
+    def readInterfaceOptions(self, offset, bodyLength):
+        data, byteOrder = self.data, self.byteOrder
+        linkType = struct.unpack_from(byteOrder + 'H', data, offset)[0] #link type of the interface
+        timeResolution, timeOffset = 1e-6, 0 #default resolution is microseconds
+        optionOffset, end = offset + 8, offset + bodyLength #options start after snap length
+        while optionOffset + 4 <= end: #iterate over the options until the end of options or the end of the block
+            code, length = struct.unpack_from(byteOrder + 'HH', data, optionOffset)
+            if code == 0: #end of options
+                break
+            value = data[optionOffset + 4:optionOffset + 4 + length]
+            if code == 9 and length == 1: #if_tsresol option, negative power of ten or of two if the high bit is set
+                timeResolution = 2 ** -(value[0] & 0x7f) if value[0] & 0x80 else 10 ** -value[0]
+            elif code == 14 and length == 8: #if_tsoffset option, seconds added to each timestamp
+                timeOffset = struct.unpack(byteOrder + 'q', value)[0]
+            optionOffset += 4 + ((length + 3) & ~3) #options are padded to 32 bits
+        return linkType, timeResolution, timeOffset
+
+#----------------------------------------------------PcapFileReader-END-----------------------------------------------------#
+
+#--------------------------------------------------------PcapIndex----------------------------------------------------------#
+#offset index of the packet records of a memory mapped pcap or pcapng file, frames are read straight from the mapped file by their offset
+#the index is stored in a sidecar file next to the capture, so opening the same file again doesn't need to scan it
+class PcapIndex():
+    sidecarExtension = '.sidx' #extension of the sidecar index file
+    sidecarMagic = b'SSPIDX01' #magic bytes and version of the sidecar index file
+    sidecarHeader = struct.Struct('<8sQdQH') #represents the sidecar header of magic, file size, file modification time, record count and link type count
+    pcapReader = None #reader of the mapped file
+    offsets = None #array of frame offsets in the file
+    lengths = None #array of frame lengths
+    timestamps = None #array of frame timestamps
+    linkTypeIds = None #array of indexes into the link types list for each frame
+    linkTypes = None #list of the link types in the file
+    complete = False #flag for index covering the whole file
+    position = 0 #number of records that were iterated, used for progress when index was loaded from sidecar
+
+    def __init__(self, filePath):
+        self.pcapReader = PcapFileReader(filePath) #map the file, raises ValueError if its not a pcap or pcapng file
+        self.offsets, self.lengths, self.timestamps, self.linkTypeIds, self.linkTypes = array('Q'), array('I'), array('d'), array('H'), []
+        self.complete = self.loadSidecar() #load the index from sidecar file if its valid for the file
+
+
+    #method for using the index in a with statement
+    def __enter__(self):
+        return self
+
+
+    #method for closing the index at the end of a with statement
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+    #method that closes the mapped file
+    def close(self):
+        self.pcapReader.close()
+
+
+    #method that returns the number of indexed records
+    def __len__(self):
+        return len(self.offsets)
+
+
+    #method that returns the path of the sidecar index file
+    def getSidecarPath(self):
+        return self.pcapReader.filePath + self.sidecarExtension
+
+
+    #method that returns the fraction of the file that was read, between zero and one
+    def getProgress(self):
+        if self.complete: #if true we iterate the loaded index
+            return self.position / len(self.offsets) if self.offsets else 1.0
+        return self.pcapReader.getProgress()
+
+
+    #method that returns the record at given position in index as a tuple of (frame bytes, timestamp, link type)
+    def getRecord(self, position):
+        return self.pcapReader.getFrame(self.offsets[position], self.lengths[position]), self.timestamps[position], self.linkTypes[self.linkTypeIds[position]]
+
+
+    #method for iterating over the records, returns tuples of (frame bytes, timestamp, link type)
+    #if index is not complete the file is scanned and indexed while iterating, the sidecar file is written when the whole file was read
+    def __iter__(self):
+        if self.complete: #if true we read the frames by their offsets in the index
+            for self.position in range(len(self.offsets)):
+                yield self.getRecord(self.position)
+            self.position = len(self.offsets)
+            return
+        linkTypeIds = {} #dictionary of link types and their indexes in link types list
+        for offset, length, timestamp, linkType in self.pcapReader.iterRecords(): #scan the file and add each record to the index
+            if linkType not in linkTypeIds:
+                linkTypeIds[linkType] = len(self.linkTypes)
+                self.linkTypes.append(linkType)
+            self.offsets.append(offset)
+            self.lengths.append(length)
+            self.timestamps.append(timestamp)
+            self.linkTypeIds.append(linkTypeIds[linkType])
+            yield self.pcapReader.getFrame(offset, length), timestamp, linkType
+        self.complete = True #the whole file was indexed
+        self.position = len(self.offsets)
+        self.saveSidecar()
+
+
+    #method that loads the index from the sidecar file, returns true if sidecar exists and matches the file
+    def loadSidecar(self):
+        try:
+            with open(self.getSidecarPath(), 'rb') as sidecar:
+                magic, fileSize, modifiedTime, count, linkTypeCount = self.sidecarHeader.unpack(sidecar.read(self.sidecarHeader.size))
+                stat = os.stat(self.pcapReader.filePath)
+                if magic != self.sidecarMagic or fileSize != stat.st_size or modifiedTime != stat.st_mtime: #if true the sidecar belongs to another version of the file
+                    return False
+                self.linkTypes = list(struct.unpack(f'<{linkTypeCount}I', sidecar.read(4 * linkTypeCount)))
+                for column in (self.offsets, self.lengths, self.timestamps, self.linkTypeIds): #read each column of the index
+                    column.fromfile(sidecar, count)
+                    if sys.byteorder != 'little': #sidecar columns are stored in little endian
+                        column.byteswap()
+            return True
+        except (OSError, EOFError, struct.error): #if sidecar doesn't exist or is truncated we build the index
+            self.offsets, self.lengths, self.timestamps, self.linkTypeIds, self.linkTypes = array('Q'), array('I'), array('d'), array('H'), []
+            return False
+
+
+    #method that writes the index to the sidecar file, the index is only an optimization so errors are ignored
+    def saveSidecar(self):
+        try:
+            stat = os.stat(self.pcapReader.filePath)
+            with open(self.getSidecarPath(), 'wb') as sidecar:
+                sidecar.write(self.sidecarHeader.pack(self.sidecarMagic, stat.st_size, stat.st_mtime, len(self.offsets), len(self.linkTypes)))
+                sidecar.write(struct.pack(f'<{len(self.linkTypes)}I', *self.linkTypes))
+                for column in (self.offsets, self.lengths, self.timestamps, self.linkTypeIds): #write each column of the index
+                    if sys.byteorder != 'little': #sidecar columns are stored in little endian
+                        column = array(column.typecode, column)
+                        column.byteswap()
+                    column.tofile(sidecar)
+        except OSError: #if directory is read only we keep the index in memory only
+            pass
+
+#------------------------------------------------------PcapIndex-END--------------------------------------------------------#
+
+#---------------------------------------------------RollingPcapWriter-------------------------------------------------------#
+#pcap writer for live captures that rotates files by size or time and keeps a maximum number of files, like tcpdump -C, -G and -W
+#frames are queued and written in batches by a writer thread, so a slow disk never blocks the capture thread
+class RollingPcapWriter():
+    fileHeader = struct.Struct('<IHHiIII') #represents the pcap global header of magic, version, time zone, accuracy, snap length and link type
+    recordHeader = struct.Struct('<IIII') #represents the pcap record header of timestamp, captured length and original length
+    filePath = None #path of the capture file, rotated files get a running number before the extension
+    maxFileSize = 0 #size in bytes for rotating to a new file, zero for no size limit
+    rotateInterval = None #time in seconds for rotating to a new file, none for no time limit
+    maxFiles = 0 #maximum number of files kept, the oldest file is removed when exceeded, zero for keeping all files
+    flushCount = 256 #number of frames written together in a batch
+    flushInterval = 1.0 #maximum time in seconds a frame waits before it is written
+    frameQueue = None #queue of frames waiting for the writer thread
+    writerThread = None #thread that writes the frames to disk
+    file = None #current file object
+    fileSize = 0 #number of bytes written to current file
+    fileTime = 0 #time current file was opened
+    fileNumber = 0 #running number of current file
+    filePaths = None #list of paths of the kept files, oldest first
+    linkType = None #link type of current file
+    writtenCount = 0 #number of frames written to disk
+    droppedCount = 0 #number of frames dropped because the queue was full
+    error = None #exception raised by the writer thread, writing stops after an error
+
+    def __init__(self, filePath, maxFileSize=0, rotateInterval=None, maxFiles=0, flushCount=256, flushInterval=1.0, queueSize=100000):
+        self.filePath = filePath #set the capture file path
+        self.maxFileSize = maxFileSize #set the size limit of each file
+        self.rotateInterval = rotateInterval #set the time limit of each file
+        self.maxFiles = maxFiles #set the maximum number of files
+        self.flushCount = flushCount #set the batch size
+        self.flushInterval = flushInterval #set the flush interval
+        self.frameQueue = Queue(maxsize=queueSize) #bounded queue so memory stays bounded if the disk can't keep up
+        self.filePaths = []
+        self.writerThread = threading.Thread(target=self.run, daemon=True)
+        self.writerThread.start()
+
+
+    #method that queues a frame for writing, never blocks, frames are dropped and counted if the queue is full
+    def write(self, frame, timestamp, linkType):
+        try:
+            self.frameQueue.put_nowait((frame, timestamp, linkType))
+        except Full: #if true the disk is too slow so we drop the frame instead of blocking the capture
+            self.droppedCount += 1
+
+
+    #method that writes the remaining frames and closes the current file
+    def close(self):
+        if self.writerThread is not None:
+            self.frameQueue.put(None) #tell the writer thread to finish
+            self.writerThread.join()
+            self.writerThread = None
+
+
+    #method that returns the path of the file with given running number, the first file keeps the original path
+    def getFilePath(self, fileNumber):
+        if fileNumber == 0:
+            return self.filePath
+        name, extension = os.path.splitext(self.filePath)
+        return f'{name}_{fileNumber:05d}{extension}'
+
+
+    #method that closes the current file and opens the next one, removes the oldest file if there are too many files
+    def rotateFile(self, linkType):
+        if self.file is not None: #close the current file
+            self.file.close()
+            self.fileNumber += 1
+        self.file = open(self.getFilePath(self.fileNumber), 'wb')
+        self.filePaths.append(self.file.name)
+        if self.maxFiles and len(self.filePaths) > self.maxFiles: #if true we remove the oldest file
+            os.remove(self.filePaths.pop(0))
+        self.file.write(self.fileHeader.pack(0xa1b2c3d4, 2, 4, 0, 0, 262144, linkType)) #write the pcap global header
+        self.fileSize, self.fileTime, self.linkType = self.fileHeader.size, time.monotonic(), linkType
+
+
+    #method that writes a batch of frames, rotates the file when it reached its size or time limit or the link type changed
+    def writeBatch(self, batch):
+        chunks = [] #pcap records of current file
+        for frame, timestamp, linkType in batch:
+            recordSize = self.recordHeader.size + len(frame)
+            if self.file is None or linkType != self.linkType or (self.maxFileSize and self.fileSize + recordSize > self.maxFileSize and self.fileSize > self.fileHeader.size) or (self.rotateInterval and time.monotonic() - self.fileTime >= self.rotateInterval):
+                if chunks: #write the records of the previous file before rotating
+                    self.file.write(b''.join(chunks))
+                    chunks = []
+                self.rotateFile(linkType)
+            seconds = int(timestamp) #seconds and microseconds of the timestamp
+            chunks.append(self.recordHeader.pack(seconds, int((timestamp - seconds) * 1000000), len(frame), len(frame)))
+            chunks.append(frame)
+            self.fileSize += recordSize
+        if chunks:
+            self.file.write(b''.join(chunks))
+        self.file.flush() #flush the batch so a crash loses at most one batch
+        self.writtenCount += len(batch)
+
+
+    #run method of the writer thread, collects frames into batches and writes them until the writer is closed
+    def run(self):
+        batch, lastFlush, closing = [], time.monotonic(), False
+        while not closing:
+            try:
+                item = self.frameQueue.get(timeout=self.flushInterval)
+                if item is None: #if true the writer was closed so we write the last batch
+                    closing = True
+                else:
+                    batch.append(item)
+            except Empty:
+                pass
+            if batch and (closing or len(batch) >= self.flushCount or time.monotonic() - lastFlush >= self.flushInterval):
+                if self.error is None: #after an error we only empty the queue
+                    try:
+                        self.writeBatch(batch)
+                    except OSError as e: #if disk is full or file can't be written we stop writing
+                        self.error = e
+                batch, lastFlush = [], time.monotonic()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+#-------------------------------------------------RollingPcapWriter-END-----------------------------------------------------#
@@ -0,0 +1,279 @@
+import os
+import time
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+#-----------------------------------------------------LatencyHistogram------------------------------------------------------#
+#histogram of durations in seconds with fixed bucket bounds, an observation costs one bisect so stages can be timed on every packet
+class LatencyHistogram():
+    defaultBounds = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10) #upper bounds of the buckets in seconds, the last bucket has no bound
+    bounds = None #upper bounds of the buckets in seconds
+    counts = None #number of observations in each bucket, one more than bounds for longer observations
+    count = 0 #number of observations
+    total = 0.0 #sum of the observations in seconds
+    maximum = 0.0 #longest observation in seconds
+
+    def __init__(self, bounds=None):
+        self.bounds = tuple(bounds) if bounds is not None else self.defaultBounds
+        self.counts = [0] * (len(self.bounds) + 1)
+
+
+    #method that adds a duration in seconds to the histogram
+    def observe(self, seconds):
+        self.counts[bisect_left(self.bounds, seconds)] += 1 #first bucket with a bound of at least the duration
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+
+    #method that returns an estimate of a quantile between zero and one, interpolated inside its bucket like histogram_quantile of Prometheus, none without observations
+    def getQuantile(self, quantile):
+        if not self.count:
+            return None
+        target, seen, lowerBound = quantile * self.count, 0, 0.0 #number of observations up to the quantile, the number counted so far and the lower bound of current bucket
+        for bound, count in zip(self.bounds, self.counts):
+            if count and seen + count >= target: #if true the quantile is in this bucket, observations are assumed to be spread evenly in it
+                return min(lowerBound + (bound - lowerBound) * (target - seen) / count, self.maximum)
+            seen += count
+            lowerBound = bound
+        return self.maximum #the quantile is in the last bucket, which has no upper bound
+
+#---------------------------------------------------LatencyHistogram-END----------------------------------------------------#
+
+#------------------------------------------------------PipelineMetrics------------------------------------------------------#
+#metrics of the capture pipeline, time spent in each stage, sampled latency of packets from capture to the packet list, packets of each protocol and queue depths
+#stages are timed by the thread that runs them, so each histogram has a single writer and no lock is needed, readers may see a histogram in the middle of an update
+#components that don't get a metrics object skip the timing with one check, so disabled instrumentation costs almost nothing
+class PipelineMetrics():
+    stageTitles = {'reassemble': 'TCP Reassembly', 'classify': 'Fast Path Classification', 'dissect': 'Scapy Dissection', 'handle': 'Handle Methods', 'info': 'Brief Information', 'render': 'Packet List Update'} #titles of the stages, in pipeline order
+    latencyTitles = {'queueWait': 'Packet Queue Wait', 'display': 'Capture To Packet List'} #titles of the sampled latencies
+    sampleInterval = 64 #one of this number of packets is followed from the packet queue to the packet list for the sampled latencies
+    startTime = None #time the metrics were created, for rates and uptime
+    stages = None #dictionary of latency histograms of the stages by name
+    latencies = None #dictionary of latency histograms of the sampled latencies by name
+    protocolCounts = None #dictionary of number of handled packets by packet type
+    renderedCount = 0 #number of rows added to the packet list
+    queuedTimes = None #dictionary of the time sampled packets were put in the packet queue by packet id
+    callbackMetrics = None #list of (name, type, help, title, function) of metrics read from other components when metrics are exported
+    rateSnapshot = None #tuple of (time, protocol counts) of the last rates, rates are computed since then
+
+    def __init__(self, sampleInterval=64):
+        self.sampleInterval = sampleInterval
+        self.startTime = time.time()
+        self.stages = {name: LatencyHistogram() for name in self.stageTitles}
+        self.latencies = {name: LatencyHistogram() for name in self.latencyTitles}
+        self.protocolCounts = {}
+        self.queuedTimes = {}
+        self.callbackMetrics = []
+        self.rateSnapshot = (time.perf_counter(), {})
+
+
+    #method that adds the time of a stage that started at startTime, returns the current time so consecutive stages can be timed with one clock read each
+    def addStageTime(self, stage, startTime):
+        now = time.perf_counter()
+        self.stages[stage].observe(now - startTime)
+        return now
+
+
+    #method that counts a handled packet of a packet type
+    def addPacket(self, packetType):
+        self.protocolCounts[packetType] = self.protocolCounts.get(packetType, 0) + 1
+
+
+    #method that marks a packet as put in the packet queue, only one of sampleInterval packets is followed
+    def markQueued(self, packetId):
+        if packetId % self.sampleInterval == 0:
+            self.queuedTimes[packetId] = time.perf_counter()
+
+
+    #method that adds the time of adding rows to the packet list that started at startTime and the sampled latencies of their packets
+    #rows is a list of (packet record, brief information), the latency from capture uses the capture timestamp of the packet
+    def addDisplayed(self, rows, startTime):
+        now = self.addStageTime('render', startTime)
+        self.renderedCount += len(rows)
+        if not self.queuedTimes: #if true no sampled packet is waiting
+            return
+        wallTime = time.time() #capture timestamps are wall clock times
+        for record, _ in rows:
+            queuedTime = self.queuedTimes.pop(record.id, None)
+            if queuedTime is not None: #if true the packet is sampled
+                self.latencies['queueWait'].observe(now - queuedTime)
+                self.latencies['display'].observe(max(wallTime - record.time, 0.0))
+        if len(self.queuedTimes) > 4096: #packets dropped by the packet queue are never shown, we forget the oldest of them
+            for packetId in sorted(self.queuedTimes)[:-1024]:
+                self.queuedTimes.pop(packetId, None)
+
+
+    #method that adds a metric read from another component when metrics are exported, like a queue depth or pipeline counter
+    #function returns a number or a dictionary of numbers by label text like 'queue="packet"', none values are skipped
+    def addMetric(self, name, metricType, help, function, title=None):
+        self.callbackMetrics.append((name, metricType, help, title or help, function))
+
+
+    #method that returns the values of a metric read from another component as a list of (labels, value)
+    @staticmethod
+    def getMetricValues(function):
+        try:
+            values = function()
+        except Exception: #if the component failed we skip its values, exporting metrics must not stop the capture
+            return []
+        items = values.items() if isinstance(values, dict) else (('', values),)
+        return [(labels, value) for labels, value in items if value is not None]
+
+
+    #method that returns a dictionary of packets per second of each packet type since the last call, or since the metrics were created on the first call
+    def getProtocolRates(self):
+        lastTime, lastCounts = self.rateSnapshot
+        now, counts = time.perf_counter(), dict(self.protocolCounts) #copy the counts, the capture thread may add packet types
+        self.rateSnapshot = (now, counts)
+        elapsed = max(now - lastTime, 0.001) #time since the last rates
+        return {packetType: (count - lastCounts.get(packetType, 0)) / elapsed for packetType, count in counts.items()}
+
+
+    #method that represents a duration in seconds as text with a readable unit
+    @staticmethod
+    def formatSeconds(seconds):
+        if seconds is None:
+            return '-'
+        if seconds < 0.001:
+            return f'{seconds * 1000000:.1f} us'
+        return f'{seconds * 1000:.1f} ms' if seconds < 1 else f'{seconds:.2f} s'
+
+
+    #method that represents a histogram as one line of text with its count, average, median, 99th percentile and maximum
+    def formatHistogram(self, title, histogram):
+        average = histogram.total / histogram.count if histogram.count else None
+        return f'{title}: {histogram.count} times, average {self.formatSeconds(average)}, p50 {self.formatSeconds(histogram.getQuantile(0.5))}, p99 {self.formatSeconds(histogram.getQuantile(0.99))}, max {self.formatSeconds(histogram.maximum if histogram.count else None)}\n\n'
+
+
+    #method that represents the metrics as text for the diagnostics in the extended information section and the CLI
+    def moreInfo(self):
+        output = f'Diagnostics: {time.time() - self.startTime:.1f} seconds, {sum(self.protocolCounts.values())} packets handled, {self.renderedCount} rows shown\n\n' #add the totals to output
+        output += 'Stage Times:\n\n' #add the time of each stage to output, stages that didn't run are skipped
+        output += ''.join(self.formatHistogram(title, self.stages[name]) for name, title in self.stageTitles.items() if self.stages[name].count)
+        if any(histogram.count for histogram in self.latencies.values()): #add the sampled latencies to output, only packets shown in the packet list are sampled
+            output += f'Sampled Latencies (1 of {self.sampleInterval} packets):\n\n'
+            output += ''.join(self.formatHistogram(title, self.latencies[name]) for name, title in self.latencyTitles.items())
+        for name, metricType, help, title, function in self.callbackMetrics: #add the metrics of other components to output
+            values = self.getMetricValues(function)
+            if values:
+                output += f'{title}: ' + ', '.join(' '.join([label.split('=', 1)[-1].strip('"') for label in labels.split(',')] + [str(value)]) if labels else f'{value}' for labels, value in values) + '\n\n'
+        output += 'Protocol Rates:\n\n' #add the packets per second of each packet type since the last diagnostics to output
+        output += ''.join(f'{packetType[:-len("_Packet")] if packetType.endswith("_Packet") else packetType}: {self.protocolCounts.get(packetType, 0)} packets, {rate:.1f} packets/s\n\n' for packetType, rate in sorted(self.getProtocolRates().items()))
+        return output
+
+
+    #method that returns the metrics in the Prometheus text exposition format
+    def getPrometheusText(self):
+        lines = []
+        for metricName, help, histograms, label in (('sniffserpent_stage_seconds', 'Time spent in each pipeline stage, per packet and per packet list update for render', self.stages, 'stage'),
+            ('sniffserpent_latency_seconds', f'Sampled latency of 1 of {self.sampleInterval} packets, queueWait is packet queue to packet list and display is capture timestamp to packet list', self.latencies, 'path')):
+            lines += [f'# HELP {metricName} {help}', f'# TYPE {metricName} histogram']
+            for name, histogram in histograms.items():
+                cumulative = 0 #prometheus buckets count all observations up to their bound
+                for bound, count in zip(histogram.bounds + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metricName}_bucket{{{label}="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metricName}_sum{{{label}="{name}"}} {histogram.total}')
+                lines.append(f'{metricName}_count{{{label}="{name}"}} {histogram.count}')
+        lines += ['# HELP sniffserpent_packets_total Handled packets of each packet type', '# TYPE sniffserpent_packets_total counter']
+        lines += [f'sniffserpent_packets_total{{protocol="{packetType[:-len("_Packet")] if packetType.endswith("_Packet") else packetType}"}} {count}' for packetType, count in sorted(dict(self.protocolCounts).items())]
+        lines += ['# HELP sniffserpent_rendered_rows_total Rows added to the packet list', '# TYPE sniffserpent_rendered_rows_total counter', f'sniffserpent_rendered_rows_total {self.renderedCount}']
+        for name, metricType, help, title, function in self.callbackMetrics: #metrics of other components
+            values = self.getMetricValues(function)
+            lines += [f'# HELP {name} {help}', f'# TYPE {name} {metricType}']
+            lines += [f'{name}{{{labels}}} {value}' if labels else f'{name} {value}' for labels, value in values]
+        lines += ['# HELP sniffserpent_uptime_seconds Seconds since the metrics were created', '# TYPE sniffserpent_uptime_seconds gauge', f'sniffserpent_uptime_seconds {time.time() - self.startTime:.3f}']
+        return '\n'.join(lines) + '\n'
+
+#----------------------------------------------------PipelineMetrics-END----------------------------------------------------#
+
+#------------------------------------------------------MetricsExporter------------------------------------------------------#
+#request handler of the metrics endpoint, serves the metrics of the server's exporter in the Prometheus text format on /metrics
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    #method that answers GET requests
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'): #if true the path is unknown
+            self.send_error(404)
+            return
+        metrics = self.server.exporter.metrics #metrics of current scan, none before the first scan
+        body = (metrics.getPrometheusText() if metrics is not None else '').encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    #method that logs requests, requests aren't logged so scrapes don't fill the terminal
+    def log_message(self, format, *args):
+        pass
+
+
+#exporter of pipeline metrics to a Prometheus text file that is rewritten every interval and to an HTTP endpoint on the local host
+#the file is written to a temporary file and renamed, so the node exporter textfile collector never reads a partial file
+class MetricsExporter():
+    metrics = None #metrics that are exported, may be replaced for each scan
+    filePath = None #path of the Prometheus text file, none for no file
+    interval = 5.0 #seconds between writes of the file
+    httpServer = None #HTTP server of the endpoint, none for no endpoint
+    port = None #port of the endpoint, the chosen port if zero was given
+    writerThread = None #thread that writes the file every interval
+    stopEvent = None #event for stopping the writer thread
+
+    def __init__(self, metrics=None, filePath=None, port=None, interval=5.0, host='127.0.0.1'):
+        self.metrics = metrics
+        self.filePath = filePath
+        self.interval = interval
+        self.stopEvent = threading.Event()
+        if port is not None: #bind the endpoint right away so a port in use is reported when the exporter is created
+            self.httpServer = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+            self.httpServer.daemon_threads = True
+            self.httpServer.exporter = self #the request handler reads the metrics through its server
+            self.port = self.httpServer.server_address[1]
+
+
+    #method that starts the writer thread and the endpoint
+    def start(self):
+        if self.httpServer is not None:
+            threading.Thread(target=self.httpServer.serve_forever, daemon=True).start()
+        if self.filePath is not None:
+            self.writerThread = threading.Thread(target=self.writeLoop, daemon=True)
+            self.writerThread.start()
+
+
+    #method of the writer thread, writes the file every interval until the exporter is stopped
+    def writeLoop(self):
+        while not self.stopEvent.wait(self.interval):
+            self.writeFile()
+
+
+    #method that writes the metrics to the file, a failed write is retried on the next interval
+    def writeFile(self):
+        if self.metrics is None or self.filePath is None:
+            return
+        tempPath = f'{self.filePath}.tmp' #the file is renamed over the old file when complete
+        try:
+            with open(tempPath, 'w', encoding='utf-8') as file:
+                file.write(self.metrics.getPrometheusText())
+            os.replace(tempPath, self.filePath)
+        except OSError as e:
+            print(f'Error writing metrics file: {e}')
+
+
+    #method that stops the writer thread and endpoint, the file is written a last time
+    def stop(self):
+        self.stopEvent.set()
+        if self.writerThread is not None:
+            self.writerThread.join()
+            self.writerThread = None
+        self.writeFile()
+        if self.httpServer is not None:
+            self.httpServer.shutdown()
+            self.httpServer.server_close()
+            self.httpServer = None
+
+#----------------------------------------------------MetricsExporter-END----------------------------------------------------#
@@ -1,887 +1,476 @@
 import sys
 import os
-import re
-import logging
-logging.getLogger('scapy.runtime').setLevel(logging.ERROR)
-from abc import ABC, abstractmethod
-import scapy.all as scapy
-from scapy.all import sniff, wrpcap, rdpcap, get_if_list, IP, IPv6, TCP, UDP, ICMP, ARP, Raw 
-from scapy.layers.dns import DNS
-from scapy.layers.http import HTTP, HTTPRequest, HTTPResponse
-from scapy.layers.dhcp import DHCP, BOOTP
-from scapy.layers.tls.all import TLS, TLSClientHello, TLSServerHello, TLSClientKeyExchange, TLSServerKeyExchange, TLSNewSessionTicket
-from scapy.contrib.igmp import IGMP
-from scapy.layers.l2 import STP
+import time
 from PyQt5.uic import loadUi
-from PyQt5.QtCore import pyqtSignal, Qt, QThread, QTimer, QSize, QRegExp
-from PyQt5.QtGui import QIcon, QPixmap, QStandardItem, QStandardItemModel, QRegExpValidator, QIntValidator
-from PyQt5.QtWidgets import QApplication, QDesktopWidget, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSpacerItem, QSizePolicy, QDialog, QLabel, QPushButton, QStyle, QHBoxLayout, QFileDialog
-from urllib.parse import unquote
-from queue import Queue
-
-
-#------------------------------------------------------Default_Packet-------------------------------------------------------#
-class Default_Packet(ABC): #abstarct class for default packet
-    name = None #represents the packet name
-    packet = None #represents the packet object itself for our use later
-    packetType = None #represents the packet type based on scapy known types
-    id = None #represents the id for the packet object, for ease of use in dictionary later
-
-    def __init__(self, name=None, packet=None, id=None): #ctor for default packet 
-        self.name = name
-        self.packet = packet
-        self.id = id
-        
-
-    #get method for id
-    def getId(self): 
-        return self.id #return the id 
-    
-
-    #set method for packet type
-    def setPacketType(self, packetType): 
-        self.packetType = packetType
-
-
-    #get method for packet object
-    def getPacket(self):
-        return self.packet #return the packet object
-    
-
-    #method for raw info capture
-    def rawInfo(self):
-        output = ''
-        if Raw in self.packet: #insert payload data (if available)
-            payload = self.packet[Raw].load #get payload data from packet
-            output += f'Payload Data: {payload.hex()}\n\n' #insert payload as hexadecimal
-        return output
-    
-
-    #method that handles a long string and makes it fit in the GUI 
-    def fitStr(self, st, info): 
-        output = ''
-        if info is not None: #if info not none we continue
-            if isinstance(info, list): #if given info is list we convert it to utf-8 string
-                info = ', '.join(item.decode('utf-8', 'replace') if isinstance(item, bytes) else str(item) for item in info) #decode the list into string
-            elif isinstance(info, bytes): #if given info is byte we convert it to utf-8 string
-                info = info.decode('utf-8', 'replace') #decode the byte to string
-            info = info.rstrip('.') #remove trailing dot if present
-            if len(info) >= 52: #if the string is longer then specified length we add a new line
-                temp = '\n'.join(info[i:i+52] for i in range(0, len(info), 52)) #iterating over the string and adding new line after specified amount of characters
-                output += f'{st}\n{temp}\n\n' #insert to the output 
-            elif len(f'{st}: {info}') >= 52: #if the info string and st string togther exceed the specified characters we add new line
-                output += f'{st}\n{info}\n\n' #insert to the output
-            else: #else info and st strings are not exceeding the specifed amount of characters
-                output += f'{st} {info}\n\n' #we add the original info and st strings to the output without a new line
-        else: #else info is none
-            output += f'{st} {info}\n\n' #add to output the value with none value 
-        return output
-
-
-    #method for retrieving login credentials from http packet
-    def loginInfo(self):
-        credentials = {} #credentials dictionary for username and password
-        httpRegex = lambda key: rf'{key}=([^&]+)' #regex for http payload template, regex that ends in & at the end (if present)
-        #list for usernames and password labels that are common in http payloads
-        usernames = ['username', 'Username', 'UserName', 'user', 'User', 'uname', 'Uname', 'usr', 'Usr', 'email', 'Email', 'login', 'Login', 'usrname', 'Usrname', 'uid', 'Uid']
-        passwords = ['password', 'Password', 'pass', 'Pass', 'pwd', 'Pwd', 'passwd', 'Passwd', 'pswd', 'psw', 'secret', 'Secret', 'secure', 'Secure', 'key', 'Key', 'auth', 'Auth']
-        if self.packet.haslayer(Raw) and self.packet.haslayer(HTTPRequest): #if true we have http request packet and it has a payload
-            payload = self.packet[Raw].load.decode('utf-8', 'replace') #we decode the payload of the packet 
-            for username in usernames: #we iterate over the usernames to check if there's a matching username label
-                if username in payload or username.upper() in payload: #if true we found a matching label
-                    userRegex = httpRegex(username) #create a regex with the username label and regex template
-                    usr = re.search(userRegex, payload) #we call search method of regex to check if the username matching the regex 
-                    if usr: #if true the username is valid
-                        credentials['username'] = unquote(usr.group(1)) #we add the username to the dictionary
-                        break
-            if credentials: #if we found a username, we continue to get the password
-                for password in passwords:  #we iterate over the passwords to check if there's a matching password label
-                    if password in payload or password.upper() in payload: #if true we found a matching label
-                        passRegex = httpRegex(password) #create a regex with the password label and regex template
-                        pwd = re.search(passRegex, payload) #we call search method of regex to check if the password matching the regex 
-                        if pwd: #if true the password is valid
-                            credentials['password'] = unquote(pwd.group(1)) #we add the password to the dictionary
-                            break
-        return credentials
-
-
-    #method for ip configuration capture
-    def ipInfo(self): 
-        output = ''
-        if self.packet.haslayer(IP): #if packet has ip layer
-            srcIp = self.packet[IP].src #represents the source ip
-            dstIp = self.packet[IP].dst #represents the destination ip
-            ttl = self.packet[IP].ttl #represents ttl parameter in packet
-            dscp = self.packet[IP].tos #represents dscp parameter in packet
-            output += self.fitStr('Source IP:', srcIp) #insert source ip to output
-            output += self.fitStr('Destination IP:', dstIp) #insert denstination ip to output
-            output += f'TTL: {ttl}, DSCP: {dscp}\n\n' #add both to output
-        elif self.packet.haslayer(IPv6): #if packet has ipv6 layer
-            srcIp = self.packet[IPv6].src #represents the source ip
-            dstIp = self.packet[IPv6].dst #represents the destination ip
-            hopLimit = self.packet[IPv6].hlim #represents the hop limit parameter in packet
-            trafficClass = self.packet[IPv6].tc #represnets the traffic class in packet
-            output += self.fitStr('Source IP:', srcIp) #insert source ip to output
-            output += self.fitStr('Destination IP:', dstIp) #insert denstination ip to output
-            output += f'Hop Limit: {hopLimit}, Traffic Class: {trafficClass}\n\n' #add them both to output
-        if hasattr(self.packet, 'chksum') and not self.packet.haslayer(IGMP): #if packet has checksum parameter (IGMP has its own)
-            output += f'Checksum: {self.packet.chksum}\n\n' #we add the checksum to output
-        output += f'Packet Size: {len(self.packet)} bytes\n\n' #add the packet size to output
-        return output
-
+from PyQt5.QtCore import pyqtSignal, Qt, QObject, QThread, QTimer, QSize, QRegExp, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QIcon, QPixmap, QRegExpValidator, QIntValidator
+from PyQt5.QtWidgets import QApplication, QDesktopWidget, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSpacerItem, QSizePolicy, QDialog, QLabel, QPushButton, QStyle, QHBoxLayout, QFileDialog, QMenu, QCheckBox
+from scapy.utils import RawPcapWriter
+from PacketEngine import PacketCaptureEngine, clearPacketDictionary, getPacketFilter, getNetworkInterfaces, getPacketRecord, getPacketCount, getPacketIdRange, getFirstPacketId, getEvictedCount, setInfoCacheSize, PacketRetention, PacketColumnStore, PacketQueue, getPacketColumns
+from PcapIO import PcapFileReader, RollingPcapWriter
+from DisplayFilter import DisplayFilter
+from FlowTable import FlowTable
+from TcpReassembly import TcpReassembler, followStream
+from PacketStatistics import PacketStatistics
+from PacketExport import createExportWriter
+from PipelineMetrics import PipelineMetrics, MetricsExporter
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
 
-    #method representing the packet briefly, derived classes may need to implement for different types
-    def info(self): 
-        output = '' #output string for information of packet
-        srcMac = self.packet.src #represents the source mac address
-        dstMac = self.packet.dst #represents the destination mac address
-        srcPort = '' #source port of packet
-        dstPort = '' #destination port of packet
-        packetSize = len(self.packet) #size of the packet
-
-        if self.packet.haslayer(TCP) or self.packet.haslayer(UDP): #if packet is tcp or udp we get port info
-            srcPort = self.packet.sport #represents the source port of packet
-            dstPort = self.packet.dport #represents the destination port of packet
-            if self.packet.haslayer(IP): #if packet have ip address so we print the packet info with ip and port
-                srcIp = self.packet[IP].src #represents the source ip of packet
-                dstIp = self.packet[IP].dst #represents the destination ip of packet
-                output += f'{self.name} Packet: ({srcIp}):({srcPort}) --> ({dstIp}):({dstPort})' #insert info to output
-            elif self.packet.haslayer(IPv6): #if packet have ipv6 address so we print the packet info with ip and port
-                srcIp = self.packet[IPv6].src #represents the source ip of packet
-                dstIp = self.packet[IPv6].dst #represents the destination ip of packet
-                output += f'{self.name} Packet: ({srcIp}):({srcPort}) --> ({dstIp}):({dstPort})' #insert info to output
-            else: #else no ip layer 
-                output += f'{self.name} Packet: ({srcMac}):({srcPort}) --> ({dstMac}):({dstPort})' #insert info without ip to output
-        if self.packet.haslayer(HTTP) and (self.packet.haslayer(HTTPResponse) or self.packet.haslayer(HTTPRequest)): #if true packet is http
-            if self.packet.haslayer(HTTPRequest) and self.loginInfo(): #if true it means we have a login request http packet (with username and password)
-                output += ' Type: Login Request' #add http login request type to ouput
-            else: #else its a regular request or response http packet
-                output += f' Type: {"Response" if self.packet.haslayer(HTTPResponse) else "Request"}' #add http type, response or request
-        if self.packet.haslayer(DHCP): #if packet is DHCP 
-            output += ' Type: Discover' if self.packet[DHCP].options[0][1] == 1 else '' #add type if discover
-            output += ' Type: Offer' if self.packet[DHCP].options[0][1] == 2 else '' #add type if offer
-            output += ' Type: Request' if self.packet[DHCP].options[0][1] == 3 else '' #add type if request
-            output += ' Type: Acknowledge' if self.packet[DHCP].options[0][1] == 5 else '' #add type if acknowledge
-            output += ' Type: Release' if self.packet[DHCP].options[0][1] == 7 else '' #add type if release
-            output += ' Type: Info' if self.packet[DHCP].options[0][1] == 8 else '' #add type if info
-        output += f' | Size: {packetSize} bytes' #insert packet size to output
-        return output
-
-
-    #method that represents the packet information more deeply, for derived classes to implement further
-    def moreInfo(self):
-        output = '' #output string for info
-        if self.packet.haslayer(TCP) or self.packet.haslayer(UDP): #if packet is tcp or udp
-            output += f'{self.name} Packet:\n\n' #insert packet name to output
-            output += f'Source Port: {self.packet.sport}\n\n' #insert source port to output
-            output += f'Destination Port: {self.packet.dport}\n\n' #insert destination port to output
-        else: #else its other packet type
-            output += f'{self.name} Packet:\n\n' #insert packet name to output
-            output += f'Source MAC: {self.packet.src}\n\n' #insert packet source mac address
-            output += f'Destination MAC: {self.packet.dst}\n\n' #insert packet destination mac address
-        output += self.ipInfo() #call ip method to add neccessary info if ip layer is present
-        return output
-
-#----------------------------------------------------Default_Packet-END-----------------------------------------------------#
-
-#-----------------------------------------------------------TCP-------------------------------------------------------------#
-class TCP_Packet(Default_Packet):
-    def __init__(self, packet=None, id=None): #ctor for tcp packet
-        super().__init__('TCP', packet, id) #call parent ctor
-        if packet.haslayer(TCP): #checks if packet is TCP
-            self.packetType = TCP #specify the packet type
-
-
-    #method for packet information
-    def moreInfo(self): 
-        output = f'{super().moreInfo()}' #call parent moreInfo method
-        #prints TCP flags
-        flags = self.packet[self.packetType].flags #tcp has flags, we extract the binary number that represents the flags
-        flagsDict = { #we add to a dictionary all the flags of tcp
-            'FIN': (flags & 0x01) != 0, #we extract FIN flag with '&' operator with 0x01(0001 in binary)
-            'SYN': (flags & 0x02) != 0, #we extract SYS flag with '&' operator with 0x02(0010 in binary)
-            'RST': (flags & 0x04) != 0, #we extract RST flag with '&' operator with 0x04(0100 in binary)
-            'PSH': (flags & 0x08) != 0, #we extract PSH flag with '&' operator with 0x08(1000 in binary)
-            'ACK': (flags & 0x10) != 0, #we extract ACK flag with '&' operator with 0x10(0001 0000 in binary)
-            'URG': (flags & 0x20) != 0, #we extract URG flag with '&' operator with 0x20(0010 0000 in binary)
-        }
-
-        output += f'Sequence Number: {self.packet.seq}\n\n' #add the sequence number to output
-        output += f'Acknowledgment Number: {self.packet.ack}\n\n' #add the acknowledgment number to output
-        output += f'Window Size: {self.packet.window} bytes\n\n' #add window size parameter to output
-        output += 'Flags:\n' #add the flags to output
-        temp = '' #temp string for our use 
-        for flag, value in flagsDict.items(): #iteration over the flags in tcp packet
-            if flag == 'ACK': #if flag is ACK we add new line for clean gui representation
-                temp += '\n' #add new line to temp
-            temp += f'{flag}: {value}, ' #add the current flag with its value
-        output += temp.rstrip(', ') #finally insert the flags to output 
-        output += '\n\n'
-        if self.packet[self.packetType].options: #add TCP Options (if available)
-            output += 'TCP Options:\n' #insert the tcp options to output
-            temp = '' #initializing temp to an empty string
-            for option in self.packet[self.packetType].options: #iteration over the options list
-                temp += f'{option[0]}: {option[1]}, ' #add the options to temp
-            output += temp.rstrip(', ') #strip the output for leading comma
-            output += '\n\n'
-        return output
-
-#---------------------------------------------------------TCP-END-----------------------------------------------------------#
-
-#-----------------------------------------------------------UDP-------------------------------------------------------------#
-class UDP_Packet(Default_Packet):
-    def __init__(self, packet=None, id=None): #ctor 
-        super().__init__('UDP', packet, id) #call parent ctor
-        if packet.haslayer(UDP): #checks if packet is UDP
-            self.packetType = UDP #add packet type
-
-
-#---------------------------------------------------------UDP-END-----------------------------------------------------------#
-
-#-----------------------------------------------------------HTTP------------------------------------------------------------#
-class HTTP_Packet(Default_Packet):
-    def __init__(self, packet=None, id=None):
-        super().__init__('HTTP', packet, id) # call parent ctor
-        if packet.haslayer(HTTP): #checks if packet is HTTP
-            self.packetType = HTTP #add packet type
-
-
-    #method for packet information
-    def moreInfo(self):
-        output = super().moreInfo() #call parent moreInfo method
-        if self.packet.haslayer(HTTP): #if packet has HTTP layer
-            httpPacket = self.packet[HTTP] #set the http packet
-            headers = {} #set headers to be an empty dictionary
-            if self.packet.haslayer(HTTPResponse): #if packet is http response
-                httpPacket = self.packet[HTTPResponse] #set the packet as http response
-            elif self.packet.haslayer(HTTPRequest): #if packet is http request
-                httpPacket = self.packet[HTTPRequest] #set the packet as http request
-            
-            if httpPacket.haslayer(HTTPResponse) or httpPacket.haslayer(HTTPRequest): #if http packets is response or request
-                for field in httpPacket.fields_desc: #iterating over fields desc list to retrive the headers dictionary
-                    fieldName = field.name #field name of packet
-                    fieldValue = getattr(httpPacket, fieldName) #field value of packet
-                    if isinstance(fieldValue, bytes): #if field value is byte we decode it
-                        fieldValue = fieldValue.decode() #decode field name byte
-                    headers[fieldName] = fieldValue #finally we add field value to headers dictionary
-
-            if self.packet.haslayer(HTTPResponse): #if the packet is response
-                httpVersion = headers.get('Http_Version') #get the http version of packet
-                statusCode = httpPacket.Status_Code.decode() #get the status code of response packet
-                contentLength = headers.get('Content_Length') #get the content length of response packet
-                server = headers.get('Server') #get the server of response packet
-                output += 'Type: Response\n\n' #add type of packet to output
-                output += f'HTTP Version: {httpVersion}\n\n' #add http version to output
-                output += f'Status Code: {statusCode}\n\n' #add status code to output
-                output += f'Content Length: {contentLength} bytes\n\n' #add content length to output
-                output += self.fitStr('Server:', server) #add server of packet to output
-
-            elif self.packet.haslayer(HTTPRequest): #if the packet is request
-                httpLogin = self.loginInfo() #call loginInfo method to get login credentials (if available)
-                httpVersion = headers.get('Http_Version') #get the http version of packet
-                method = httpPacket.Method.decode() #get the method name of request packet
-                url = httpPacket.Host.decode() + httpPacket.Path.decode() #get the url of the request packet
-                accept = headers.get('Accept') #get the accept info of request
-                referer = headers.get('Referer') #get the referer of request
-                output += 'Type: Login Request\n\n' if httpLogin else 'Type: Request\n\n' #add type of packet to output based on http info
-                output += f'HTTP Version: {httpVersion}\n\n' #add http version to output
-                output += f'Method: {method}\n\n' #add method to output
-                output += self.fitStr('URL:', url) #add url to output
-                if httpLogin: #if true we have captured login information
-                    output += 'Login Credentials:\n\n' #add login credentials to output
-                    output += self.fitStr('Username:', httpLogin['username']) #add usernname from our httpLogin dict
-                    output += self.fitStr('Password:', httpLogin['password']) #add password from our httpLogin dict
-                output += self.fitStr('Accept:', accept) #add accept to output
-                output += self.fitStr('Referer:', referer) #add referer to output
-        return output
-    
-#---------------------------------------------------------HTTP-END----------------------------------------------------------#
-
-#-----------------------------------------------------------DNS-------------------------------------------------------------#
-class DNS_Packet(Default_Packet):
-    DNSRecordTypes = {
-        1: 'A', 28: 'AAAA', 18: 'AFSDB', 42: 'APL', 257: 'CAA', 60: 'CDNSKEY', 59: 'CDS', 37: 'CERT', 5: 'CNAME', 62: 'CSYNC',
-        49: 'DHCID', 32769: 'DLV', 39: 'DNAME', 48: 'DNSKEY', 43: 'DS', 108: 'EUI48', 109: 'EUI64', 13: 'HINFO', 55: 'HIP',
-        65: 'HTTPS', 45: 'IPSECKEY', 25: 'KEY', 36: 'KX', 29: 'LOC', 15: 'MX', 35: 'NAPTR', 2: 'NS', 47: 'NSEC', 50: 'NSEC3',
-        51: 'NSEC3PARAM', 61: 'OPENPGPKEY', 12: 'PTR', 17: 'RP', 46: 'RRSIG', 24: 'SIG', 53: 'SMIMEA', 6: 'SOA', 33: 'SRV',
-        44: 'SSHFP', 64: 'SVCB', 32768: 'TA', 249: 'TKEY', 52: 'TLSA', 250: 'TSIG', 16: 'TXT', 256: 'URI', 63: 'ZONEMD', 255: 'ANY'}
-    
-    DNSClassTypes = {1: 'IN', 2: 'CS', 3: 'CH', 4: 'HS', 255: 'ANY', 254: 'NONE', 32769: 'DLV'}
-
-    def __init__(self, packet=None, id=None):
-        super().__init__('DNS', packet, id) #call parent ctor
-        if packet.haslayer(DNS): #checks if packet is DNS
-            self.packetType = DNS #add packet type
-
-
-    #method for brief packet information
-    def info(self):
-        output = '' #output string for information of packet
-        dnsPacket = self.packet[DNS] #parameter for dns packet
-        srcMac = self.packet.src #representst the source mac address
-        dstMac = self.packet.dst #represents the destination mac address
-        srcIp = '' #represents the source ip address
-        dstIp = '' #represents the destination ip address
-        srcPort = '' #represents the source port
-        dstPort = '' #represents the destination port
-        packetSize = len(self.packet) #represenets the packet size
-
-        if self.packet.haslayer(TCP) or self.packet.haslayer(UDP): #if dns packet transmitted through tcp or udp 
-            srcPort = self.packet.sport #set the source port
-            dstPort = self.packet.dport #set the destination port
-            if self.packet.haslayer(IP): #if packet has ip layer
-                srcIp = self.packet[IP].src #set the source ip
-                dstIp = self.packet[IP].dst #set the destination ip
-                output += f'{self.name} Packet: ({srcIp}):({srcPort}) --> ({dstIp}):({dstPort})' #add the info with ip to output
-            elif self.packet.haslayer(IPv6): #else packet has ipv6 layer
-                srcIp = self.packet[IPv6].src #set the source ip
-                dstIp = self.packet[IPv6].dst #set the destination ip
-                output += f'{self.name} Packet: ({srcIp}):({srcPort}) --> ({dstIp}):({dstPort})' #add the info with ip to output
-            else: #else no ip layer 
-                output += f'{self.name} Packet: ({srcMac}):({srcPort}) --> ({dstMac}):({dstPort})' #insert info without ip to output
-
-        output += f' Type: {"Response" if dnsPacket.qr else "Request"}' #add the dns type, response or request
-        
-        if dnsPacket.an: #check if its response packet
-            dnsResponseType = self.DNSRecordTypes[dnsPacket.an.type] if dnsPacket.an.type in self.DNSRecordTypes else dnsPacket.an.type #represents dns record type based on the DNSRecordTypes dictionary
-            output += f' {dnsResponseType}' #add response record type
-        elif dnsPacket.qd: #else we check if its request packet
-            dnsRequestType = self.DNSRecordTypes[dnsPacket.qd.qtype] if dnsPacket.qd.qtype in self.DNSRecordTypes else dnsPacket.qd.qtype #represents dns record type based on the DNSRecordTypes dictionary
-            output += f' {dnsRequestType}' #add request record type
-            
-        output += f' | Size: {packetSize} bytes' #add the size of the packet
-        return output
-
-
-    #method for packet information
-    def moreInfo(self):
-        output = super().moreInfo() #call parent moreInfo method
-        if self.packet.haslayer(DNS): #if packet has DNS layer
-            dnsPacket = self.packet[DNS] #save the dns packet in parameter
-            output += f'ID: {dnsPacket.id}\n\n' #id of the dns packet
-            if dnsPacket.qr == 1: #means its a response packet
-                if dnsPacket.an: #if dns packet is response packet
-                    dnsResponseType = self.DNSRecordTypes[dnsPacket.an.type] if dnsPacket.an.type in self.DNSRecordTypes else dnsPacket.an.type #represents dns record type based on the DNSRecordTypes dictionary
-                    dnsResponseClass = self.DNSClassTypes[dnsPacket.an.rclass] if dnsPacket.an.rclass in self.DNSClassTypes else dnsPacket.an.rclass #represents dns class type based on the DNSClassTypes dictionary
-                    output += f'Type: Response\n\n' #add type of packet to output
-                    output += self.fitStr('Response Name:', dnsPacket.an.rrname) #add repsonse name to output
-                    output += f'Response Type: {dnsResponseType}, ' #add response type to output
-                    output += f'Response Class: {dnsResponseClass}\n\n' #add response class to output
-                    output += f'Num Responses: {len(dnsPacket.an)}\n\n' #add number of responses to output
-                    if hasattr(dnsPacket.an, 'rdata'): #check if rdata attribute exists
-                        output += self.fitStr('Response Data:', dnsPacket.an.rdata) #specify the rdata parameter
-            else: #means its a request packet
-                if dnsPacket.qd:
-                    dnsRequestType = self.DNSRecordTypes[dnsPacket.qd.qtype] if dnsPacket.qd.qtype in self.DNSRecordTypes else dnsPacket.qd.qtype #represents dns record type based on the DNSRecordTypes dictionary
-                    dnsRequestClass = self.DNSClassTypes[dnsPacket.qd.qclass] if dnsPacket.qd.qclass in self.DNSClassTypes else dnsPacket.qd.qclass #represents dns class type based on the DNSClassTypes dictionary
-                    output += f'Type: Request\n\n' #add type of packet to output
-                    output += self.fitStr('Request Name:', dnsPacket.qd.qname) #add request name to output
-                    output += f'Request Type: {dnsRequestType}, ' #add request type to output
-                    output += f'Request Class: {dnsRequestClass}\n\n' #add request class to output
-                    output += f'Num Requests: {len(dnsPacket.qd)}\n\n' #add num of requests to output
-        return output
-    
-#---------------------------------------------------------DNS-END-----------------------------------------------------------#
-
-#-----------------------------------------------------------TLS-------------------------------------------------------------#
-class TLS_Packet(Default_Packet):
-    def __init__(self, packet=None, id=None):
-        super().__init__('TLS', packet, id) #call parent ctor
-        if packet.haslayer(TLS): #checks if packet is TLS
-            self.packetType = TLS #add packet type
-    
-    
-    #method for packet information
-    def moreInfo(self):
-        output = super().moreInfo() #call parent moreInfo method
-        if self.packet.haslayer(TLS): #if packet has TLS layer
-            tlsPacket = self.packet[TLS] #save the TLS packet in parameter
-            output += f'Version: {tlsPacket.version}\n\n' #version of the TLS packet
-            if self.packet.haslayer(TLSClientHello): #if true the packet is a client hello response
-                output += f'Handshake Type: Client Hello\n\n' #add handshake type to output
-                output += f'Length: {self.packet[TLSClientHello].msglen} bytes\n\n' #add length to output
-                output += self.fitStr('Cipher Suites:', self.packet[TLSClientHello].ciphers) #add cipher suites list to output
-            elif self.packet.haslayer(TLSServerHello): #if true the packet is a server hello response
-                output += f'Handshake Type: Server Hello\n\n' #add handshake tyoe to output
-                output += f'Length: {self.packet[TLSServerHello].msglen} bytes\n\n' #add length to output
-                output += f'Cipher Suite: {self.packet[TLSServerHello].cipher}\n\n' #add cipher suite number to output
-            elif self.packet.haslayer(TLSClientKeyExchange): #if true the packet is a client key exchange response
-                output += f'Handshake Type: Client Key Exchange\n\n' #add handshake tyoe to output
-                output += f'Length: {self.packet[TLSClientKeyExchange].msglen} bytes\n\n' #add length to output
-            elif self.packet.haslayer(TLSServerKeyExchange): #if true the packet is a server key exchange response
-                output += f'Handshake Type: Server Key Exchange\n\n' #add handshake tyoe to output
-                output += f'Length: {self.packet[TLSServerKeyExchange].msglen} bytes\n\n' #add length to output
-            elif self.packet.haslayer(TLSNewSessionTicket): #if true the packet is a new session ticket response
-                output += f'Handshake Type: New Session Ticket\n\n' #add handshake tyoe to output
-                output += f'Length: {self.packet[TLSNewSessionTicket].msglen} bytes\n\n' #add length to output
-        return output
-    
-#---------------------------------------------------------TLS-END-----------------------------------------------------------#
-
-#-----------------------------------------------------------ICMP------------------------------------------------------------#
-class ICMP_Packet(Default_Packet):
-    icmpTypes = { 
-        0: 'Echo Reply', 3: 'Destination Unreachable', 4: 'Source Quench', 5: 'Redirect', 8: 'Echo Request', 9: 'Router Advertisement',
-        10: 'Router Selection', 11: 'Time Exceeded', 12: 'Parameter Problem', 13: 'Timestamp', 14: 'Timestamp Reply', 15: 'Information Request',
-        16: 'Information Reply', 17: 'Address Mask Request', 18: 'Address Mask Reply'}
-    
-    def __init__(self, packet=None, id=None):
-        super().__init__('ICMP', packet, id) #call parent ctor
-        if packet.haslayer(ICMP): #checks if packet is icmp
-            self.packetType = ICMP #add packet type
-
-    
-    #method for brief packet information
-    def info(self):
-        output = ''
-        packetSize = len(self.packet) #represent the packet size
-        icmpType = self.icmpTypes[self.packet[ICMP].type] if self.packet[ICMP].type in self.icmpTypes else self.packet[ICMP].type #represents icmp type based on the icmpTypes dictionary
-        icmpCode = self.packet[ICMP].code #represents icmp code
-        if self.packet.haslayer(IP): #if packet has ip layer
-            srcIp = self.packet[IP].src #represents the source ip
-            dstIp = self.packet[IP].dst #represents the destination ip
-            output += f'{self.name} Packet: ({srcIp}) --> ({dstIp}) | Type: {icmpType}, Code: {icmpCode} | Size: {packetSize} bytes' #add to output the packet info with ip
-        elif self.packet.haslayer(IPv6): #if packet has ipv6 layer
-            srcIp = self.packet[IPv6].src #represents the source ip
-            dstIp = self.packet[IPv6].dst #represents the destination ip
-            output += f'{self.name} Packet: ({srcIp}) --> ({dstIp}) | Type: {icmpType}, Code: {icmpCode} | Size: {packetSize} bytes' #add to output the packet info with ip
-        else:
-            output += f'{self.name} Packet: Type: {icmpType}, Code: {icmpCode} | Size: {packetSize} bytes' #add to output the packet info 
-        return output
-
-
-    #method for packet information
-    def moreInfo(self): 
-        output = ''
-        if self.packet.haslayer(ICMP): #if packet has icmp layer
-            icmpType = self.icmpTypes[self.packet[ICMP].type] if self.packet[ICMP].type in self.icmpTypes else self.packet[ICMP].type #represents icmp type based on the icmpTypes dictionary
-            icmpCode = self.packet[ICMP].code #represents icmp code
-            icmpSeq = self.packet[ICMP].seq #represents icmp sequence number
-            icmpId = self.packet[ICMP].id #represents icmp identifier
-            output += f'{self.name} Packet:\n\n' #add packet name to output
-            output += self.ipInfo() #call ip method for more ip info
-            output += f'Type: {icmpType}\n\n' #add icmp type to output
-            output += f'Code: {icmpCode}\n\n' #add icmp code to output
-            output += f'Sequence Number: {icmpSeq}\n\n' #add icmp sequence number
-            output += f'Identifier: {icmpId}\n\n' #add icmp identifier
-        return output
-
-#---------------------------------------------------------ICMP-END----------------------------------------------------------#
-
-#-----------------------------------------------------------DHCP------------------------------------------------------------#
-class DHCP_Packet(Default_Packet):
-    def __init__(self, packet=None, id=None):
-        super().__init__('DHCP', packet, id) #call parent ctor
-        if packet.haslayer(DHCP): #if packet is DHCP
-            self.packetType = DHCP #set packet type
-        
-    
-    #method to retreive the option from the options list in DHCP packet
-    def getOption(self, parameter):
-        byteParameters = ['hostname', 'vendor_class_id', 'client_id'] #list that includes parameters to decode
-        for option in self.packet[DHCP].options: #if true the packet is DHCP
-            if option[0] == parameter: # if true we found a valid parameter in the list
-                if parameter == 'name_server' and len(option) > 2: #if DHCP returned multiple name servers 
-                    return ", ".join(option[1:]) #return all names with a comma seperating them
-                elif parameter in byteParameters: #if parameter in byteParameter list
-                    return option[1].decode() #we return the decoded parameter
-                else: #else we return the parameter in the list
-                    return option[1] #return the value in the tuple in list
-        return None #else we return none if parameter is'nt in the list
-                    
-
-    #method for packet information
-    def moreInfo(self):
-        output = super().moreInfo() #call parent moreInfo method
-        if self.packet.haslayer(DHCP): #if true its a DHCP packet
-            dhcpPacket = self.packet[DHCP] #set the DHCP packet in variable
-            if dhcpPacket.options[0][1] == 1 or dhcpPacket.options[0][1] == 3: #if true its a dicovery/request DHCP packet
-                hostname = self.getOption('hostname') #get the hostname from options
-                serverID = self.getOption('server_id') #get the server id from options
-                requestedAddress = self.getOption('requested_addr') #get the requested address from options
-                vendorClassID = self.getOption('vendor_class_id') #get vendor class id from options
-                paramReqList = self.getOption('param_req_list') #get parameter request list from options
-                output += f'DHCP Type: Discover\n\n' if dhcpPacket.options[0][1] == 1 else f'DHCP Type: Request\n\n' #add type of DHCP, discovery or request
-                output += f'Host Name: {hostname}\n\n' if hostname else '' #add hostname to output
-                output += f'Server ID: {serverID}\n\n' if dhcpPacket.options[0][1] == 3 and serverID else '' #add server id to output
-                output += f'Requested Address: {requestedAddress}\n\n' if requestedAddress else '' #add requested addresses to outpit
-                output += f'Vendor Class ID: {vendorClassID}\n\n' if vendorClassID else '' #add vendor class id to output
-                output += self.fitStr('Parameter Request list:', ', '.join(map(str, paramReqList))) if paramReqList else '' #add parameter request list to output
-            elif dhcpPacket.options[0][1] == 2 or dhcpPacket.options[0][1] == 5: #if true its a offer/aknowledge DHCP packet
-                subnetMask = self.getOption('subnet_mask') #get subnet mask from options
-                broadcastAddress = self.getOption('broadcast_address') #get boradcast address from options
-                leaseTime = self.getOption('lease_time') #get lease time from options
-                router = self.getOption('router') #get router from options
-                serverName = self.getOption('name_server') #get server name from options
-                output += f'DHCP Type: Offer\n\n' if dhcpPacket.options[0][1] == 2 else f'DHCP Type: Acknowledge\n\n' #add type of DHCP, offer or acknowledge
-                output += f'Subnet Mask: {subnetMask}\n\n' if subnetMask else '' #add subnet mask to output
-                output += f'Broadcast Address: {broadcastAddress}\n\n' if broadcastAddress else '' #add broadcast address to output
-                output += f'Lease Time: {leaseTime}\n\n' if leaseTime else '' #add lease time to output
-                output += f'Router Address: {router}\n\n' if router else '' #add router address to output
-                output += f'Offered Address: {self.packet[BOOTP].yiaddr}\n\n' if dhcpPacket.options[0][1] == 2 else f'Acknowledged Address: {self.packet[BOOTP].yiaddr}\n\n' #add specific info about the packet
-                output += self.fitStr('Server Name:', serverName) if serverName else '' #add server name to output
-            elif dhcpPacket.options[0][1] == 7: #if true its a release DHCP packet
-                serverID = self.getOption('server_id') #get server id from options
-                output += f'DHCP Type: Release\n\n' #add type to output
-                output += f'Server ID: {serverID}\n\n' if serverID else '' #add server id to output
-            elif dhcpPacket.options[0][1] == 8: #if true its a information DHCP packet
-                hostname = self.getOption('hostname') #get hostname from output
-                vendorClassID = self.getOption('vendor_class_id') #get vendor class id from options
-                output += f'DHCP Type: Information\n\n' #add type to output
-                output += f'Host Name: {hostname}\n\n' if hostname else '' #add hostname to output
-                output += f'Vendor Class ID: {vendorClassID}\n\n' if vendorClassID else '' #add vendor class id to output
-        return output
-    
-#----------------------------------------------------------DHCP-END---------------------------------------------------------#
-
-# -----------------------------------------------------------ARP------------------------------------------------------------#
-class ARP_Packet(Default_Packet):
-    hardwareTypes = {
-        1: 'Ethernet', 4: 'Ethernet II', 6: 'IEEE 802 (Token Ring)', 8: 'ArcNet', 15: 'Frame Relay', 17: 'ATM',
-        18: 'HDLC', 23: 'IEEE 802.11 (Wi-Fi)', 32: 'Fibre Channel', 41: 'InfiniBand', 42: 'IPv6 over Ethernet', 512: 'PPP'}
-
-    protocolTypes = {
-        1: 'Ethernet', 2045: 'VLAN Tagging (802.1Q)', 2046: 'RARP', 2048: 'IPv4', 2049: 'X.25', 2054: 'ARP', 32902: 'RARP', 33058: 'AppleTalk (Appletalk AARP)', 
-        33079: 'AppleTalk', 34304: 'PPP', 4525: 'IPv6', 34887: 'PPPoE Discovery', 35020: 'MPLS', 35023: 'PPPoE (PPP over Ethernet)', 35048: 'MPLS Multicast', 35117: 'PPPoE Session'}
-
-    def __init__(self, packet=None, id=None):
-        super().__init__('ARP', packet, id) #call parent ctor
-        if packet.haslayer(ARP): #checks if packet is arp
-            self.packetType = ARP #add packet type
-    
-
-    #method for brief packet information
-    def info(self):
-        output = ''
-        srcMac = self.packet[ARP].hwsrc #represents arp source mac address
-        srcIp = self.packet[ARP].psrc #represents arp source ip address
-        dstMac = self.packet[ARP].hwdst #represents arp destination mac address
-        dstIp = self.packet[ARP].pdst #represents arp destination ip address
-        arpOperation = 'Request' if self.packet[ARP].op == 1 else 'Reply' #represents arp operation
-        packetSize = len(self.packet) #represents the packet size 
-        output += f'{self.name} Packet: ({srcIp}):({srcMac}) --> ({dstIp}):({dstMac}) Type: {arpOperation} | Size: {packetSize} bytes' #add the packet info to output
-        return output
-
-
-    #method for packet information
-    def moreInfo(self):
-        output = ''
-        if self.packet.haslayer(ARP): #if packet has layer of arp
-            hardwareType = self.hardwareTypes[self.packet[ARP].hwtype] if self.packet[ARP].hwtype in self.hardwareTypes else self.packet[ARP].hwtype #represents hardware type based on the hardwareTypes dictionary
-            protocolType = self.protocolTypes[self.packet[ARP].ptype] if self.packet[ARP].ptype in self.protocolTypes else self.packet[ARP].ptype #represents protocol type based on the protocolTypes dictionary
-            output += f'{self.name} Packet:\n\n' #add packet name to output
-            output += f'Source MAC: {self.packet[ARP].hwsrc}\n\n' #add arp source mac address
-            output += f'Destination MAC: {self.packet[ARP].hwdst}\n\n' #add arp destination mac address
-            output += f'Source IP: {self.packet[ARP].psrc}\n\n' #add arp source ip address
-            output += f'Destination IP: {self.packet[ARP].pdst}\n\n' #add arp destination ip address
-            output += f'Packet Size: {len(self.packet)} bytes\n\n' #add packet size
-            output += f'Operation: {"Request" if self.packet[ARP].op == 1 else "Reply"}\n\n' #add the arp operation to output
-            output += f'Hardware Type: {hardwareType}\n\n' #add the hardware type to output
-            output += f'Hardware Length: {self.packet[ARP].hwlen} bytes\n\n' #add hardware length to output
-            output += f'Protocol Type: {protocolType}\n\n' #add protocol type to output
-            output += f'Protocol Length: {self.packet[ARP].plen} bytes\n\n' #add protocol length to output
-        return output
-        
-#-----------------------------------------------------------ARP-END---------------------------------------------------------#
-
-#-----------------------------------------------------------IGMP------------------------------------------------------------#
-class IGMP_Packet(Default_Packet):
-    igmpTypes = {
-        17: 'Membership Query', 18: 'Membership Report v1', 22: 'Membership Report v2', 23: 'Leave Group', 30: 'Membership Report v3',
-        31: 'Multicast Router Advertisement', 32: 'Multicast Router Solicitation', 33: 'Multicast Router Termination'}
-
-    def __init__(self, packet=None, id=None):
-        super().__init__('IGMP', packet, id) #call parent ctor
-        if packet.haslayer(IGMP): #checks if packet is IGMP
-            self.packetType = IGMP #add pacet type
-            
-
-    #method for brief packet information
-    def info(self):
-        output = ''
-        srcMac = self.packet.src #represents the source mac address
-        dstMac = self.packet.dst #represents the destination mac address
-        packetSize = len(self.packet) #size of the packet
-        igmpType = self.igmpTypes[self.packet[IGMP].type] #represents the igmp type
-        if self.packet.haslayer(IP): #if packet have ip address so we add the packet info with ip and type
-            srcIp = self.packet[IP].src #represents the source ip of packet
-            dstIp = self.packet[IP].dst #represents the destination ip of packet
-            output += f'{self.name} Packet: ({srcIp}) --> ({dstIp}) Type: {igmpType} | Size: {packetSize} bytes' #insert info to output
-        elif self.packet.haslayer(IPv6):  #if packet have ipv6 address so we add the packet info with ip and type
-            srcIp = self.packet[IPv6].src #set the source ip
-            dstIp = self.packet[IPv6].dst #set the destination ip
-            output += f'{self.name} Packet: ({srcIp}) --> ({dstIp}) Type: {igmpType} | Size: {packetSize} bytes' #insert info to output
-        else: #if packet doesnt have ip layer we print its mac address annd type
-            output += f'{self.name} Packet: ({srcMac}) --> ({dstMac}) Type: {igmpType} | Size: {packetSize} bytes' #insert info to output
-        return output   
-
-
-    #method for packet information
-    def moreInfo(self):
-        output = super().moreInfo() #call parent moreInfo
-        if self.packet.haslayer(IGMP): #if true it means packet is IGMP
-            igmpType = self.igmpTypes[self.packet[IGMP].type] if self.packet[IGMP].type in self.igmpTypes else self.packet[IGMP].type #represents IGMP type based on the igmpTypes dictionary
-            output += f'Type: {igmpType}\n\n' #add IGMP type to output
-            output += f'Group Address: {self.packet[IGMP].gaddr}\n\n' #add IGMP group address to output
-            output += f'Maximum Response Code: {self.packet[IGMP].mrcode}\n\n' #add IGMP mrcode to output
-            output += f'Checksum: {self.packet[IGMP].chksum}\n\n' #add IGMP checksum to output
-        return output
-
-#---------------------------------------------------------IGMP-END----------------------------------------------------------#
-
-#-----------------------------------------------------------STP-------------------------------------------------------------#
-class STP_Packet(Default_Packet):
-    def __init__(self, packet=None, id=None):
-        super().__init__('STP', packet, id) #call parent ctor
-        if packet.haslayer(STP): #checks if packet is stp
-            self.packetType = STP #add pacet type
-
-
-    #method for brief packet information
-    def info(self):
-        output = ''
-        packetSize = len(self.packet) #represents the stp packet size
-        output += f'{self.name} Packet: ({self.packet.src}) --> ({self.packet.dst}) | Size: {packetSize} bytes' #add packet info to output
-        return output
-
-    
-    #method for packet information
-    def moreInfo(self):
-        output = ''
-        if self.packet.haslayer(STP): #if packet is an stp packet
-            stpProto = self.packet[STP].proto #represents stp protocol
-            stpVersion = self.packet[STP].version #represents stp version
-            stpBridgeId = self.packet[STP].bridgeid #represents stp bridge id
-            stpPortId = self.packet[STP].portid #represents stp port id
-            stpPathCost = self.packet[STP].pathcost #represents stp path cost
-            stpAge = self.packet[STP].age #represents stp age
-            output += f'{self.name} Packet:\n\n' #add packet name to output
-            output += f'STP Protocol: {stpProto}\n\n' #add stp protocol to output
-            output += f'Version: {stpVersion}\n\n' #add stp version to output
-            output += f'Source MAC: {self.packet.src}\n\n' #add source mac address to output
-            output += f'Destination MAC: {self.packet.dst}\n\n' #add destination mac address to output
-            output += f'Bridge ID: {stpBridgeId}\n\n' #add bridge id tto output
-            output += f'Port ID: {stpPortId}\n\n' #add port id to output
-            output += f'Path Cost: {stpPathCost}\n\n' #add path cost to output
-            output += f'Age: {stpAge}\n\n' #add stp age to output
-        output += f'Packet Size: {len(self.packet)} bytes\n\n' #add packet size to output
-        return output
-
-# ---------------------------------------------------------STP-END----------------------------------------------------------#
-
-#----------------------------------------------------HELPER-FUNCTIONS-------------------------------------------------------#
-
-#method to print all available interfaces
-def getAvailableInterfaces():
-    #get a list of all available network interfaces
-    interfaces = get_if_list() #call get_if_list method to retrieve the available interfaces
-    if interfaces: #if there are interfaces we print them
-        print('Available network interfaces:')
-        i = 1 #counter for the interfaces 
-        for interface in interfaces: #print all availabe interfaces
-            if sys.platform.startswith('win32'): #if ran on windows we convert the guid number
-                print(f'{i}. {guidToStr(interface)}')
-            else: #else we are on other os so we print the interface 
-                print(f'{i}. {interface}')
-            i += 1
-    else: #else no interfaces were found
-        print('No network interfaces found.')
-
-
-#method for retrieving interface name from GUID number (Windows only)
-def guidToStr(guid):
-    try: #we try to import the specific windows method from scapy library
-        from scapy.arch.windows import get_windows_if_list
-    except ImportError as e: #we catch an import error if occurred
-        print(f'Error importing module: {e}') #print the error
-        return guid #we exit the function
-    interfaces = get_windows_if_list() #use the windows method to get list of guid number interfaces
-    for interface in interfaces: #iterating over the list of interfaces
-        if interface['guid'] == guid: #we find the matching guid number interface
-            return interface['name'] #return the name of the interface associated with guid number
-    return guid #else we didnt find the guid number so we return given guid
-
-
-#method for retrieving the network interfaces
-def getNetworkInterfaces():
-    networkNames = ['eth', 'wlan', 'en', 'enp', 'wlp', 'lo', 'Ethernet', 'Wi-Fi', '\\Device\\NPF_Loopback'] #this list represents the usual network interfaces that are available in various platfroms
-    interfaces = get_if_list() #get a list of the network interfaces
-    if sys.platform.startswith('win32'): #if current os is Windows we convert the guid number to interface name
-        interfaces = [guidToStr(interface) for interface in interfaces] #get a new list of network interfaces with correct names instead of guid numbers
-    matchedInterfaces = [interface for interface in interfaces if any(interface.startswith(name) for name in networkNames)] #we filter the list to retrieving ethernet and wifi interfaces
-    return matchedInterfaces #return the matched interfaces as list
-
-#-----------------------------------------------------HANDLE-FUNCTIONS------------------------------------------------------#
-#method that handles TCP packets
-def handleTCP(packet):
-    global packetCounter
-    TCP_Object = TCP_Packet(packet, packetCounter) #create a new object for packet
-    packetDictionary[TCP_Object.getId()] = TCP_Object #insert it to packet dictionary
-    packetCounter += 1 #increase the counter
-    return TCP_Object #finally return the object
-
-#method that handles UDP packets
-def handleUDP(packet):
-    global packetCounter
-    UDP_Object = UDP_Packet(packet, packetCounter) #create a new object for packet
-    packetDictionary[UDP_Object.getId()] = UDP_Object #insert it to packet dictionary
-    packetCounter += 1 #increase the counter
-    return UDP_Object #finally return the object
-
-#method that handles HTTP packets
-def handleHTTP(packet):
-    global packetCounter
-    HTTP_Object = HTTP_Packet(packet, packetCounter) #create a new object for packet
-    packetDictionary[HTTP_Object.getId()] = HTTP_Object #insert it to packet dictionary
-    packetCounter += 1 #increase the counter
-    return HTTP_Object #finally return the object
-
-#method that handles DNS packets
-def handleDNS(packet):
-    global packetCounter
-    DNS_Object = DNS_Packet(packet, packetCounter) #create a new object for packet
-    packetDictionary[DNS_Object.getId()] = DNS_Object #insert it to packet dictionary
-    packetCounter += 1 #increase the counter
-    return DNS_Object #finally return the object
-
-#method that handles TLS packets
-def handleTLS(packet):
-    global packetCounter
-    if packet[TLS].type == 22: #we need to capture handshakes TLS packets so 22 is the correct type
-        TLS_Object = TLS_Packet(packet, packetCounter) #create a new object for packet
-        packetDictionary[TLS_Object.getId()] = TLS_Object #insert it to packet dictionary
-        packetCounter += 1 #increase the counter
-        return TLS_Object #finally return the object
-    return None #else we return none
-
-#method that handles ICMP packets
-def handleICMP(packet):
-    global packetCounter 
-    ICMP_Object = ICMP_Packet(packet, packetCounter) #create a new object for packet
-    packetDictionary[ICMP_Object.getId()] = ICMP_Object #insert it to packet dictionary
-    packetCounter += 1 #increase the counter
-    return ICMP_Object #finally return the object
-
-#method that handles DHCP packets
-def handleDHCP(packet):
-    global packetCounter
-    validParameters = [1, 2, 3, 5, 7, 8] #list that represents the valid paramteters for DHCP
-    if packet[DHCP].options[0][1] in validParameters: #we check if its a valid parameter
-        DHCP_Object = DHCP_Packet(packet, packetCounter) #create a new object for packet
-        packetDictionary[DHCP_Object.getId()] = DHCP_Object #insert it to packet dictionary
-        packetCounter += 1 #increase the counter
-        return DHCP_Object #finally return the object
-    return None #else we return none
-
-#method that handles ARP packets
-def handleARP(packet):
-    global packetCounter
-    ARP_Object = ARP_Packet(packet, packetCounter) #create a new object for packet
-    packetDictionary[ARP_Object.getId()] = ARP_Object #insert it to packet dictionary
-    packetCounter += 1 #increase the counter
-    return ARP_Object #finally return the object
-
-#method that handles IGMP packets
-def handleIGMP(packet):
-    global packetCounter
-    validParameters = [17, 18, 22, 23] #list that represents the valid paramteters for IGMP
-    if packet[IGMP].type in validParameters: #we check if its a valid parameter
-        IGMP_Object = IGMP_Packet(packet, packetCounter) #create a new object for packet
-        packetDictionary[IGMP_Object.getId()] = IGMP_Object #insert it to packet dictionary
-        packetCounter += 1 #increase the counter
-        return IGMP_Object #finally return the object
-    return None #else we return none
-
-#method that handles STP packets
-def handleSTP(packet):
-    global packetCounter
-    STP_Object = STP_Packet(packet, packetCounter) #create a new object for packet
-    packetDictionary[STP_Object.getId()] = STP_Object #insert it to packet dictionary
-    packetCounter += 1 #increase the counter
-    return STP_Object #finally return the object
-
-#---------------------------------------------------HANDLE-FUNCTIONS-END----------------------------------------------------#
-
-packetDictionary = {} #initialize the packet dictionary
-packetCounter = 0 #global counter for dictionary elements
-
-#---------------------------------------------------HELPER-FUNCTIONS-END----------------------------------------------------#
 
 #---------------------------------------------------PacketCaptureThread-----------------------------------------------------#
-#thread class for capturing packets in real time
+#thread class for capturing packets in real time, a thin consumer of the headless PacketCaptureEngine
 class PacketCaptureThread(QThread):
-    packetCaptured = pyqtSignal(int) #signal for the thread to update the main for changes
     setGUIState = pyqtSignal(bool) #signal for the thread to set the GUI elements from the main window
     permissionError = pyqtSignal() #signal for permission error to tell GUI to show messagebox for error
-    interface = None #interface of network 
     packetQueue = None #packet queue pointer for the thread
-    packetFilter = None #represents the packet type filter for sniffer
-    PortandIp = None #string that represents port and ip for sniffer to filter with
-    packetList = None #packet list for loading scan with pcap file
-    stopCapture = False #flag for capture status
+    captureEngine = None #capture engine that runs the packet pipeline
+    pcapFile = None #path of pcap file for loading scan
+    renderInfo = True #flag for rendering the brief information of captured packets, cleared by the refresh scheduler when the packet list can't keep up
+    metrics = None #pipeline metrics of the scan, none for no instrumentation
 
-    def __init__(self, packetQueue, packetFilter, PortandIp, interface='', packetList=None):
+    def __init__(self, packetQueue, packetFilter, PortandIp, interface='', pcapFile=None, retention=None, rollingWriter=None, packetColumns=None, flowTable=None, reassembler=None, packetStatistics=None, metrics=None):
         super(PacketCaptureThread, self).__init__()
-        self.interface = interface #initialize the network interface if given
         self.packetQueue = packetQueue #setting the packetQueue from the packet sniffer class
-        self.packetFilter = packetFilter #set the packet filter for scapy sniff method
-        self.PortandIp = PortandIp #set the port and ip string for filthering with desired pord and ip
-        self.packetList = packetList #set the packet list if given
-        packetBuffer = 1000 if self.packetList else 500 #buffer for number of packets added to GUI
-        self.updateTimer = QTimer(self) #initialzie the QTimer
-        self.updateTimer.timeout.connect(lambda: self.packetCaptured.emit(packetBuffer)) #connect the signal to gui to update the packet list when timer elapses
-        self.updateTimer.start(2000) #setting the timer to elapse every 2 seconds (can adjust according to the load)
+        self.pcapFile = pcapFile #set the pcap file if given
+        self.metrics = metrics #set the pipeline metrics if given
+        packetSink = None if self.pcapFile else self.queuePacket #loaded packets are kept in the indexed packet store and rendered by the packet list model, scans put the packet's info in the queue
+        self.captureEngine = PacketCaptureEngine(packetFilter, PortandIp, interface, packetSink=packetSink, pcapFile=pcapFile, indexFile=True, retention=retention, rollingWriter=rollingWriter, packetColumns=packetColumns, packetQueue=packetQueue, flowTable=flowTable, reassembler=reassembler, packetStatistics=packetStatistics, metrics=metrics)
 
 
-    #methdo that handles stopping the scan
-    def stop(self):
-        self.stopCapture = True #setting the stop flag to true will stop the loop in sniff
+    #method that receives each handled packet from the engine and puts its record and info in the bounded queue, a full queue drops packets or waits by its overflow policy
+    def queuePacket(self, handledPacket):
+        startTime = time.perf_counter() if self.metrics is not None else None #start time of the brief information for diagnostics
+        packetInfo = (getPacketRecord(handledPacket.getId()), handledPacket.info() if self.renderInfo else None) #the packet record and brief information of the packet for the packet list, rendered on demand if not set
+        if self.metrics is not None: #if true we add the time of the brief information and mark the packet for the sampled latencies
+            if self.renderInfo:
+                self.metrics.addStageTime('info', startTime)
+            self.metrics.markQueued(handledPacket.getId())
+        self.packetQueue.put(packetInfo, self.isStopped) #if the queue is full and blocks we wait until GUI takes packets or the scan is stopped
 
 
-    #method for sniff method of scapy to know status of flag 
-    def checkStopFlag(self, packet):
-        return self.stopCapture #return the stopCapture flag
+    #method that returns true if the scan was stopped
+    def isStopped(self):
+        return self.captureEngine.stopCapture
 
 
-    #method that handles the packet capturing
-    def PacketCapture(self, packet): 
-        #for each packet we receive we send it to the dict to determine its identity and call the necessary handle method
-        for packetType, handler in self.packetFilter.items():
-            if packet.haslayer(packetType): #if we found matching packet we call its handle method
-                handledPacket = handler(packet) #call handler method of each packet
-                if handledPacket != None: #check if its not none
-                    self.packetQueue.put(handledPacket.info()) #we put the packet's info in the queue for later use 
-                break #break from the loop when handled the packet
+    #methdo that handles stopping the scan
+    def stop(self):
+        self.captureEngine.stop() #setting the stop flag of the engine will stop the loop in sniff
 
 
-    #run method for the thread, initialzie the scan, call scapy sniff method with necessary parameters
+    #run method for the thread, runs the capture engine with necessary parameters
     def run(self):
         self.setGUIState.emit(False) #set GUI elements to be unclickable for scan
-        if self.packetList is not None: #if true we received a packet list meaning we need to load scan from pcap file
-            for packet in self.packetList: #iterate through the packet list 
-                self.PacketCapture(packet) #call packetCapture method for each packet in list
-            while not self.packetQueue.empty(): #now we keep thread alive until all packets were loaded
-                if self.packetQueue.empty(): #if true the queue is empty so we can finish
-                    break #break the loop to end loading
-                QThread.sleep(2) #we give the thread to sleep for 2 seconds for gui responsiveness
-        else: #else we need to start a regular scan
-            try: #we call sniff with desired interface and filters for port and ip
-                sniff(iface=self.interface, prn=self.PacketCapture, filter=self.PortandIp, stop_filter=self.checkStopFlag, store=0)
-            except PermissionError: #if user didn't run in administrative privileges we emit signal to show messagebox with error
-                self.permissionError.emit() #emit a signal to GUI to show permission error message box
-                print('Permission denied. Please run again with administrative privileges.') #print permission error message in terminal
-            except Exception as e: #we catch an exception if something happend while sniffing
-                print(f'An error occurred while sniffing: {e}') #print error message in terminal
+        for note in self.captureEngine.filterNotes: #print notes for packet types the kernel filter can't fully match, they are checked in userspace
+            print(f'Filter note: {note}')
+        try: #we run the capture engine with desired interface and filters for port and ip
+            self.captureEngine.run()
+        except PermissionError: #if user didn't run in administrative privileges we emit signal to show messagebox with error
+            self.permissionError.emit() #emit a signal to GUI to show permission error message box
+            print('Permission denied. Please run again with administrative privileges.') #print permission error message in terminal
+        except Exception as e: #we catch an exception if something happend while sniffing
+            print(f'An error occurred while sniffing: {e}') #print error message in terminal
         self.setGUIState.emit(True) #after thread finishes we set the GUI elements to be clickable again
 
 #--------------------------------------------------PacketCaptureThread-END--------------------------------------------------#
 
+#----------------------------------------------------PacketTableModel-------------------------------------------------------#
+#table model for the packet list, reads rows from a compact column store and renders values only for the rows the table view shows
+#scans add rows in batches from the packet queue, packets of a loaded pcap file are read from the column store of the indexed packet store
+class PacketTableModel(QAbstractTableModel):
+    columnNames = ('No.', 'Time', 'Source', 'Destination', 'Protocol', 'Length', 'Info') #names of the columns
+    columns = None #column store of the rows
+    packetCount = 0 #number of rows in the model
+    storeCount = 0 #number of column store rows the model has seen, rows that don't match the display filter are not shown
+    startTime = None #timestamp of the first packet, times are shown relative to it
+    rowOrder = None #array of shown column store rows in sorted order counted from the first row ever added (see rowBase of column store), none when all rows are shown in the order of packet ids
+    displayFilter = None #display filter of the shown rows, none for showing all rows
+    sortColumn = 0 #column the rows are sorted by
+    sortOrder = Qt.AscendingOrder #order the rows are sorted in
+    infoCache = None #LRU cache of brief information of recently shown packets that were not rendered when captured
+    infoCacheSize = 2048 #maximum number of packets in cache
+
+    def __init__(self, columns=None):
+        super(PacketTableModel, self).__init__()
+        self.columns = columns if columns is not None else PacketColumnStore() #column store of loaded file or a new store for scans
+        self.infoCache = OrderedDict()
+
+
+    #method that returns the number of rows in the model
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.packetCount
+
+
+    #method that returns the number of columns in the model
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columnNames)
+
+
+    #method that returns the names of the columns for the header
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columnNames[section]
+        return None
+
+
+    #method that returns the column store row of a row in the model
+    def getStoreRow(self, row):
+        return self.rowOrder[row] - self.columns.rowBase if self.rowOrder is not None else row
+
+
+    #method that returns the packet id of a row in the model
+    def getPacketId(self, row):
+        return self.columns.ids[self.getStoreRow(row)]
+
+
+    #method that returns the value of a cell, values are rendered only when the table view shows the cell
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid() or index.row() >= self.packetCount:
+            return None
+        row, column, columns = self.getStoreRow(index.row()), index.column(), self.columns
+        if column == 0: #packet id
+            return str(columns.ids[row])
+        elif column == 1: #time relative to first packet
+            return f'{columns.times[row] - self.startTime:.6f}'
+        elif column == 2: #source address
+            return columns.getSource(row)
+        elif column == 3: #destination address
+            return columns.getDestination(row)
+        elif column == 4: #protocol of packet
+            return columns.getProtocol(row)
+        elif column == 5: #frame length
+            return str(columns.lengths[row])
+        return self.getInfo(row) #brief information of packet
+
+
+    #method that returns the brief information of a column store row, packets of a loaded file are rendered from the mapped file on first use
+    def getInfo(self, row):
+        packetInfo = self.columns.getSummary(row) #brief information rendered when packet was captured
+        if packetInfo is not None:
+            return packetInfo
+        packetId = self.columns.ids[row]
+        packetInfo = self.infoCache.get(packetId) #check if packet was rendered recently
+        if packetInfo is not None: #if true we mark the packet as recently used
+            self.infoCache.move_to_end(packetId)
+            return packetInfo
+        packetInfo = getPacketRecord(packetId).info() #render the brief information of the packet
+        self.infoCache[packetId] = packetInfo
+        if len(self.infoCache) > self.infoCacheSize: #if cache is full we remove the least recently used packet
+            self.infoCache.popitem(last=False)
+        return packetInfo
+
+
+    #method that adds a batch of packet records with their brief information to the column store and inserts their rows
+    def addRecords(self, records):
+        for record, packetInfo in records:
+            self.columns.addRecord(record, packetInfo)
+        self.updateRowCount()
+
+
+    #method that inserts the rows that were added to the column store since last update with a single insert, sorted rows are added at the end
+    #new rows are checked with the display filter if set, returns the number of new column store rows
+    def updateRowCount(self):
+        storeCount = len(self.columns) #number of complete rows in the column store
+        newRows = storeCount - self.storeCount
+        if newRows <= 0: #if true there are no new rows
+            return 0
+        if self.startTime is None: #the first packet sets the start time
+            self.startTime = self.columns.times[0]
+        if self.displayFilter is not None: #if true we show only the new rows that match the display filter
+            shownRows = self.displayFilter.filterRows(self.columns, self.storeCount, storeCount)
+            rowBase = self.columns.rowBase
+            shownRows = array('I', (row + rowBase for row in shownRows))
+        else: #else all new rows are shown
+            shownRows = range(self.storeCount + self.columns.rowBase, storeCount + self.columns.rowBase)
+        self.storeCount = storeCount
+        if shownRows: #if true we insert the shown rows
+            self.beginInsertRows(QModelIndex(), self.packetCount, self.packetCount + len(shownRows) - 1)
+            if self.rowOrder is not None: #new rows are added after the sorted rows until the table is sorted again
+                self.rowOrder.extend(shownRows)
+            self.packetCount += len(shownRows)
+            self.endInsertRows()
+        return newRows
+
+
+    #method that returns the number of column store rows the model didn't add yet
+    def getBacklog(self):
+        return len(self.columns) - self.storeCount
+
+
+    #method that returns true if rows are shown in the order of packet ids, so new rows are added at the end
+    def isInCaptureOrder(self):
+        return self.sortColumn == 0 and self.sortOrder == Qt.AscendingOrder
+
+
+    #method that removes the given number of oldest rows, used when packets are evicted
+    def removeOldestRows(self, count):
+        if count <= 0:
+            return
+        if self.rowOrder is None: #if true the oldest rows are the first rows of the model
+            self.beginRemoveRows(QModelIndex(), 0, count - 1)
+            self.columns.removeRows(count)
+            self.storeCount -= count
+            self.packetCount -= count
+            self.endRemoveRows()
+        elif self.isInCaptureOrder(): #if true the shown rows of the removed rows are the first rows of the model
+            removedRows = bisect_left(self.rowOrder, self.columns.rowBase + count)
+            if removedRows > 0: #remove the shown rows
+                self.beginRemoveRows(QModelIndex(), 0, removedRows - 1)
+            self.columns.removeRows(count)
+            self.storeCount -= count
+            if removedRows > 0:
+                del self.rowOrder[:removedRows]
+                self.packetCount -= removedRows
+                self.endRemoveRows()
+        else: #else the removed rows are spread over the sorted rows so we reset the model
+            self.beginResetModel()
+            self.columns.removeRows(count)
+            self.storeCount -= count
+            self.rowOrder = array('I', (row for row in self.rowOrder if row >= self.columns.rowBase))
+            self.packetCount = len(self.rowOrder)
+            self.endResetModel()
+
+
+    #method that sets the display filter and shows the matching rows in the current sort order, none shows all rows
+    def setDisplayFilter(self, displayFilter):
+        self.beginResetModel()
+        self.displayFilter = displayFilter
+        shownRows = displayFilter.filterRows(self.columns, 0, self.storeCount) if displayFilter is not None else None #rows of the display filter counted from the first stored row
+        self.rowOrder = self.orderRows(shownRows)
+        self.packetCount = len(self.rowOrder) if self.rowOrder is not None else self.storeCount
+        self.endResetModel()
+
+
+    #method that returns the rows in the current sort order counted from the first row ever added, rows are all rows if not given
+    #returns none if all rows are shown in the order of packet ids
+    def orderRows(self, rows=None):
+        columns = self.columns
+        if self.isInCaptureOrder(): #rows are already in the order of packet ids
+            return array('I', map(columns.rowBase.__add__, rows)) if rows is not None else None
+        sortKeys = { #key methods of the sortable columns by column store row
+            0: columns.ids.__getitem__,
+            1: columns.times.__getitem__,
+            2: columns.getSource,
+            3: columns.getDestination,
+            4: columns.getProtocol,
+            5: columns.lengths.__getitem__,
+        }
+        rows = rows if rows is not None else range(self.storeCount)
+        return array('I', map(columns.rowBase.__add__, sorted(rows, key=sortKeys[self.sortColumn], reverse=self.sortOrder == Qt.DescendingOrder))) #python sort is stable so equal values keep the order of packet ids
+
+
+    #method that sorts the rows by given column, the info column keeps the current order
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column > 5: #if true the column is not sortable
+            return
+        self.layoutAboutToBeChanged.emit()
+        shownRows = array('I', sorted(map(self.getStoreRow, range(self.packetCount)))) if self.displayFilter is not None else None #the shown rows in the order of packet ids
+        self.sortColumn, self.sortOrder = column, order
+        self.rowOrder = self.orderRows(shownRows)
+        self.layoutChanged.emit()
+
+#--------------------------------------------------PacketTableModel-END-----------------------------------------------------#
+
+#----------------------------------------------------RefreshScheduler-------------------------------------------------------#
+#scheduler for updating the packet list, adapts the update interval and the number of rows per update to the queue depth and a time budget per update
+#when the packet list follows the newest rows and can't keep up, captured packets are queued without their brief information, it's rendered only if their rows are shown
+class RefreshScheduler(QObject):
+    minInterval = 16 #shortest time in milliseconds between updates, used while packets are waiting
+    maxInterval = 250 #longest time in milliseconds between updates, the interval grows up to it while no packets arrive
+    minBudget = 16 #time in milliseconds an update may take when few packets are waiting
+    maxBudget = 50 #time in milliseconds an update may take when many packets are waiting
+    chunkSize = 256 #number of rows added to the packet list together
+    tailBacklog = 20000 #number of queued rows above which captured packets are queued without brief information while following the tail
+    updateMethod = None #method that adds up to given number of queued rows and returns the number of added rows
+    backlogMethod = None #method that returns the number of queued rows
+    followTailMethod = None #method that returns true if the packet list follows the newest rows
+    captureThread = None #capture thread that queues the packets
+    updateTimer = None #single shot timer of next update
+    interval = 16 #current time in milliseconds between updates
+    rowTime = 0.00002 #average time in seconds of adding a row, measured on each update
+
+    def __init__(self, updateMethod, backlogMethod, followTailMethod, parent=None):
+        super(RefreshScheduler, self).__init__(parent)
+        self.updateMethod = updateMethod #set the update method
+        self.backlogMethod = backlogMethod #set the queue depth method
+        self.followTailMethod = followTailMethod #set the follow tail method
+        self.updateTimer = QTimer(self)
+        self.updateTimer.setSingleShot(True)
+        self.updateTimer.timeout.connect(self.update)
+
+
+    #method that starts updating for given capture thread
+    def start(self, captureThread=None):
+        self.captureThread = captureThread #set the capture thread
+        self.interval = self.minInterval
+        self.updateTimer.start(self.interval)
+
+
+    #method that adds all queued rows and stops updating
+    def stop(self):
+        self.updateTimer.stop()
+        while self.updateMethod(self.chunkSize) > 0: #add the remaining rows
+            continue
+        self.captureThread = None
+
+
+    #method that adds queued rows until the time budget is used and schedules the next update
+    def update(self):
+        backlog = self.backlogMethod() #number of queued rows
+        budget = min(self.maxBudget, max(self.minBudget, backlog * self.rowTime * 1000)) / 1000 #time budget of this update in seconds
+        startTime, addedRows = time.perf_counter(), 0
+        while True: #add chunks of rows until the queue is empty or the budget is used
+            added = self.updateMethod(self.chunkSize)
+            addedRows += added
+            if added < self.chunkSize or time.perf_counter() - startTime >= budget:
+                break
+        if addedRows > 0: #measure the average time of adding a row
+            self.rowTime = 0.8 * self.rowTime + 0.2 * (time.perf_counter() - startTime) / addedRows
+        backlog = self.backlogMethod() #number of rows still queued
+        if self.captureThread is not None: #if we follow the tail and can't keep up, new packets are queued without rendering their brief information
+            self.captureThread.renderInfo = not (self.followTailMethod() and backlog > self.tailBacklog)
+        if backlog > 0: #if rows are still waiting we update again soon
+            self.interval = self.minInterval
+        elif addedRows >= self.chunkSize: #if many rows arrived since last update we update more often
+            self.interval = max(self.minInterval, self.interval // 2)
+        elif addedRows == 0: #if no rows arrived we back off
+            self.interval = min(self.maxInterval, self.interval * 2)
+        self.updateTimer.start(self.interval)
+
+#--------------------------------------------------RefreshScheduler-END-----------------------------------------------------#
+
+#----------------------------------------------------PacketExportThread-----------------------------------------------------#
+#thread class for saving scan data in background, streams the packets to the file in chunks so the GUI stays responsive
+#the exported packets are a snapshot of the ids that were stored when the export started, so scans can be saved while capturing
+class PacketExportThread(QThread):
+    exportProgress = pyqtSignal(int) #signal for the thread to update the saving progress in percent
+    exportFinished = pyqtSignal(str, str, str) #signal for the thread to show the result with title, message and icon
+    filePath = None #path of the file we save to
+    fileType = None #type of the file, text, pcap, csv, parquet or arrow
+    packetIds = None #range of packet ids of the snapshot
+    chunkSize = 1000 #number of packets written to the file together
+    columnFileTypes = ('CSV File (*.csv)', 'Parquet File (*.parquet)', 'Arrow File (*.arrow)') #file types written with one row of typed columns for each packet
+    stopExport = False #flag for export status
+
+    def __init__(self, filePath, fileType):
+        super(PacketExportThread, self).__init__()
+        self.filePath = filePath #set the file path
+        self.fileType = fileType #set the file type
+        self.packetIds = getPacketIdRange() #take the snapshot of the stored packet ids
+
+
+    #method that handles cancelling the export
+    def stop(self):
+        self.stopExport = True
+
+
+    #method for iterating over the packet records of the snapshot, packets that were evicted since the export started are skipped
+    def getRecords(self):
+        for index, packetId in enumerate(self.packetIds):
+            if self.stopExport: #if true the export was cancelled
+                return
+            try:
+                record = getPacketRecord(packetId)
+            except KeyError: #if packet was evicted we skip it
+                continue
+            if index % self.chunkSize == 0: #update the progress once in each chunk
+                self.exportProgress.emit(int(index * 100 / len(self.packetIds)))
+            yield record
+
+
+    #method that writes the raw bytes of each packet record to a pcap file without decoding it
+    def exportPcap(self):
+        pcapWriter = None #pcap writer, opened with the link type of the first packet
+        try:
+            for packet in self.getRecords():
+                if pcapWriter is None: #open the pcap file with link type of the packets
+                    pcapWriter = RawPcapWriter(self.filePath, linktype=packet.linkType)
+                    pcapWriter.write_header(None) #write the pcap file header
+                pcapWriter.write_packet(packet.raw, sec=int(packet.time), usec=int((packet.time - int(packet.time)) * 1000000))
+        finally:
+            if pcapWriter is not None: #flush and close the pcap file
+                pcapWriter.close()
+
+
+    #method that writes the extended information of each packet to a text file, packets are decoded without replacing the cache of the packet list
+    def exportText(self):
+        with open(self.filePath, 'w') as file: #we open the file for writing
+            chunk = [] #extended information of current chunk of packets
+            for packet in self.getRecords():
+                chunk.append('------------------------------------------------------------------------------------\n\n')
+                chunk.append(packet.moreInfo(cache=False)) #the packet info (extended information)
+                chunk.append('------------------------------------------------------------------------------------\n\n')
+                if len(chunk) >= self.chunkSize * 3: #if chunk is full we write it to the file
+                    file.write(''.join(chunk))
+                    chunk = []
+            file.write(''.join(chunk)) #write the last chunk
+
+
+    #method that writes one row with typed columns for each packet record to a csv, parquet or arrow file, rows are written in batches
+    def exportColumns(self):
+        with createExportWriter(self.filePath) as exportWriter: #the writer for the format of the file extension
+            for packet in self.getRecords():
+                exportWriter.write(packet)
+
+
+    #run method for the thread, exports the snapshot to the file and emits the result
+    def run(self):
+        try:
+            if self.fileType == 'PCAP File (*.pcap)': #means user chose pcap file
+                self.exportPcap()
+                message = 'Saved scan detalis to PCAP file.'
+            elif self.fileType in self.columnFileTypes: #means user chose a csv, parquet or arrow file
+                self.exportColumns()
+                message = f'Saved scan detalis to {self.fileType.split(" ")[0]} file.'
+            else: #else user chose a txt file
+                self.exportText()
+                message = 'Saved scan detalis to text file.'
+            if self.stopExport: #if true the export was cancelled, the file has the packets that were saved before cancelling
+                self.exportFinished.emit('Save Cancelled', 'Saving scan cancelled.', 'Information')
+            else:
+                self.exportProgress.emit(100)
+                self.exportFinished.emit('Scan Saved', message, 'Information') #notify the user for success
+        except Exception as e: #if error happend we print the error to terminal and notify the user
+            print(f'Error occurred while saving: {e}')
+            self.exportFinished.emit('Save Error', f'Error occurred while saving: {e}', 'Critical')
+
+#--------------------------------------------------PacketExportThread-END---------------------------------------------------#
+
 #-------------------------------------------------------Application---------------------------------------------------------#
 #main class for the application that handles the GUI and the packet sniffing
 class PacketSniffer(QMainWindow):
     packetCaptureThread = None #current thread that capturing packets 
-    packetModel = None #packet list model for QListView 
-    packetQueue = None #queue for packets before adding them to list (thread safe)
+    packetModel = None #packet table model for the packet list
+    packetQueue = None #bounded queue for packets before adding them to list (thread safe)
+    packetQueueSize = 100000 #maximum number of packets waiting to be added to the packet list, zero for unlimited
+    packetQueuePolicy = 'block' #policy when the packet queue is full, block waits for the packet list, dropNewest or dropOldest drop packets from the packet list (they are still stored)
+    captureEngine = None #capture engine of current or last scan, its counters are shown in the packet status
+    displayFilter = None #display filter of the packet list, none for showing all packets
+    flowTable = None #flow table of current or last scan, conversations of the packets
+    flowCount = 100 #number of conversations with the most bytes shown in conversations
+    packetStatistics = None #columnar store of packet metadata of current or last scan for statistics
+    talkerCount = 10 #number of top talkers shown in statistics
+    packetExportThread = None #current thread that saves scan data
+    infoCacheBytes = 32 << 20 #memory budget in bytes for the extended information of recently shown or saved packets, zero disables the cache
+    saveFileTypes = {'Text File (*.txt)': '.txt', 'PCAP File (*.pcap)': '.pcap', 'CSV File (*.csv)': '.csv', 'Parquet File (*.parquet)': '.parquet', 'Arrow File (*.arrow)': '.arrow'} #file types for saving scan data and their extensions
+    refreshScheduler = None #scheduler that updates the packet list while capturing or loading
+    retentionPackets = 1000000 #maximum number of packets kept during a scan, the oldest packets are evicted when reached, zero for unlimited
+    retentionBytes = 1 << 30 #maximum number of frame bytes kept during a scan, zero for unlimited
+    retentionAge = None #maximum age in seconds of packets kept during a scan, none for unlimited
+    retentionSpillFile = None #path of pcap file for evicted packets, none for discarding them
+    rollingFile = None #path of pcap file that scans are written to while capturing, none for no writing
+    rollingFileSize = 100000000 #size in bytes for rotating to a new pcap file, zero for no size limit
+    rollingInterval = None #time in seconds for rotating to a new pcap file, none for no time limit
+    rollingMaxFiles = 10 #maximum number of pcap files kept, zero for keeping all files
+    reassemblyEnabled = False #flag for tcp reassembly of scans, HTTP messages and TLS handshakes split across segments are shown with the segment that completes them
+    metricsEnabled = True #flag for timing the pipeline stages of scans for diagnostics
+    metricsFile = None #path of Prometheus text file the pipeline metrics are written to, none for no file
+    metricsPort = None #port of the local HTTP endpoint that serves the pipeline metrics on /metrics, none for no endpoint
+    metricsInterval = 5 #seconds between writes of the metrics file
+    pipelineMetrics = None #pipeline metrics of current or last scan, none if disabled
+    metricsExporter = None #exporter of the pipeline metrics to the metrics file and endpoint
     validIp = True #set validIp flag to true
     isClosing = False #set isClosing flag to false
 
@@ -889,9 +478,17 @@ class PacketSniffer(QMainWindow):
         super(PacketSniffer, self).__init__()
         loadUi('SniffSerpent.ui', self) #load the ui file of the sniffer
         self.initUI() #call init method
-        self.packetModel = QStandardItemModel() #set the QListView model for adding items to it
+        self.packetModel = PacketTableModel() #set the table model for adding packets to it
         self.PacketList.setModel(self.packetModel) #set the model for the packetlist in gui
-        self.packetQueue = Queue() #initialize the packet queue
+        self.packetQueue = PacketQueue(self.packetQueueSize, self.packetQueuePolicy) #initialize the packet queue
+        setInfoCacheSize(self.infoCacheBytes) #set the memory budget of the extended information cache
+        self.refreshScheduler = RefreshScheduler(self.updatePacketList, self.getPacketBacklog, self.isFollowingTail, self) #initialize the scheduler that updates the packet list
+        if self.metricsEnabled and (self.metricsFile or self.metricsPort is not None): #if true we export the pipeline metrics of scans
+            try: #the endpoint is bound right away, a port in use raises OSError
+                self.metricsExporter = MetricsExporter(filePath=self.metricsFile, port=self.metricsPort, interval=self.metricsInterval)
+                self.metricsExporter.start()
+            except OSError as e: #if the endpoint can't be bound we run without exporting
+                print(f'Error starting metrics exporter: {e}')
         
     
     #method to initialize GUI methods and events
@@ -905,10 +502,21 @@ class PacketSniffer(QMainWindow):
         self.LoadScanButton.clicked.connect(self.LoadScanClicked) #add method to handle load scan button
         self.ClearButton.clicked.connect(self.ClearClicked) #add method to handle clear button 
         self.SaveScanButton.clicked.connect(self.SaveScanClicked) #add method to handle save scan button
+        self.CancelLoadButton.clicked.connect(self.CancelLoadClicked) #add method to handle cancel load button
+        self.LoadProgressBar.setVisible(False) #progress and cancel button are shown only while loading a pcap file or saving
+        self.CancelLoadButton.setVisible(False)
         infoImageLabel.clicked.connect(self.infoImageLabelClicked) #add method to handle clicks on infoImageLabel
         self.PacketList.doubleClicked.connect(self.handleItemDoubleClicked) #add method to handle clicks on the items in packet list
+        self.PacketList.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder) #packets are shown in order of their ids until user sorts by another column
+        self.PacketList.verticalHeader().setDefaultSectionSize(28) #all rows have the same height so the table view doesn't need to render every row for layout
+        for column, width in enumerate((80, 120, 200, 200, 90, 80)): #set the widths of the columns, the info column takes the remaining width
+            self.PacketList.setColumnWidth(column, width)
         self.setLineEditValidate() #call the method to set the validators for the QLineEdit for port and ip
         self.IPLineEdit.textChanged.connect(self.checkIPValidity) #connect signal for textChanged for IP to determine its validity
+        self.DisplayFilterLineEdit.textChanged.connect(self.checkDisplayFilterValidity) #connect signal for textChanged for display filter to determine its validity
+        self.DisplayFilterLineEdit.returnPressed.connect(self.applyDisplayFilter) #apply the display filter when user presses enter
+        self.PacketList.setContextMenuPolicy(Qt.CustomContextMenu) #show a menu of conversation actions when user right clicks the packet list
+        self.PacketList.customContextMenuRequested.connect(self.showPacketMenu)
         self.initComboBox() #set the combobox interface names 
         self.center() #make the app open in center of screen
         self.show() #show the application
@@ -916,9 +524,14 @@ class PacketSniffer(QMainWindow):
 
     #method for closing the program and managing the packetCapture thread
     def closeEvent(self, event):
+        if self.isExporting(): #if true we stop saving and wait for the export thread to finish
+            self.packetExportThread.stop()
+            self.packetExportThread.wait()
         if self.packetCaptureThread is not None and self.packetCaptureThread.isRunning(): #if true we have a scan running
             self.isClosing = True #set the isClosing flag to true to indicate that user wants to close program
             self.StopScanClicked() #call StopScanClicked method to stop the scan
+        if self.metricsExporter is not None: #write the metrics file a last time and close the endpoint
+            self.metricsExporter.stop()
         event.accept() #accept the close event
 
 
@@ -946,6 +559,28 @@ class PacketSniffer(QMainWindow):
             self.IPLineEdit.setStyleSheet(style)
     
 
+    #method to check the display filter line edit validity in gui, invalid filters get a red border like the ip line edit
+    def checkDisplayFilterValidity(self):
+        try: #we parse the display filter to check it
+            if self.DisplayFilterLineEdit.text().strip():
+                DisplayFilter(self.DisplayFilterLineEdit.text())
+            borderColor = 'black'
+        except ValueError: #if filter is invalid we show a red border
+            borderColor = 'rgb(139,0,0)'
+        self.DisplayFilterLineEdit.setStyleSheet(f'QLineEdit {{ background-color: rgba(32,33,35,255); border-radius: 10px; border-style: outset; border-width: 2px; border-color: {borderColor}; padding: 4px; }}')
+
+
+    #method that applies the display filter to the packet list, an empty filter shows all packets
+    def applyDisplayFilter(self):
+        text = self.DisplayFilterLineEdit.text().strip() #the display filter user entered
+        try: #we parse the display filter, invalid filters raise a ValueError exception
+            self.displayFilter = DisplayFilter(text) if text else None
+        except ValueError as e: #if filter is invalid we show error message
+            CustomMessageBox('Filter Error', str(e), 'Critical', False) #show error message box
+            return
+        self.packetModel.setDisplayFilter(self.displayFilter) #show the matching packets, new packets are checked as they arrive
+
+
     #method for setting the settings for ip and port line edit lables
     def setLineEditValidate(self):
         IPRegex = QRegExp(r"^((25[0-5]|2[0-4][0-9]|[0-1]?[0-9][0-9]?)\.){3}(25[0-5]|2[0-4][0-9]|[0-1]?[0-9][0-9]?)$") #regex for IP template (192.168.1.1)
@@ -965,8 +600,15 @@ class PacketSniffer(QMainWindow):
             self.InterfaceComboBox.addItems(interfaces) #add items to combobox
         if len(interfaces) >= 2: #if we have more then one available interface 
             self.InterfaceComboBox.addItem('All') #we add "All" option to scan all available interfaces
+            self.InterfaceComboBox.addItem('Choose...') #we add "Choose..." option to scan a chosen subset of the interfaces
     
     
+    #method that returns the network interfaces of the combobox for capturing on several interfaces, with the loopback interface name of windows
+    def getInterfaces(self):
+        interfaces = [self.InterfaceComboBox.itemText(index) for index in range(self.InterfaceComboBox.count())] #the items of the combobox
+        return ['\\Device\\NPF_Loopback' if interface == 'Loopback' else interface for interface in interfaces if interface not in ('All', 'Choose...')]
+
+
     #method that return desktop directory if available, else the home directory
     def getDirectory(self):
         defaultDirectory = os.path.join(os.path.expanduser('~'), 'Desktop') #set default directory to be desktop 
@@ -987,16 +629,32 @@ class PacketSniffer(QMainWindow):
 
 
     #method for initialize the packet thread
-    def initPacketThread(self, packetFilter, PortAndIP, interface='', packetList=None):
-        self.packetCaptureThread = PacketCaptureThread(self.packetQueue, packetFilter, PortAndIP, interface, packetList) #initialzie the packet thread with the queue we initialized and interface
-        self.packetCaptureThread.packetCaptured.connect(self.updatePacketList) #connect the packet thread to updatePacketList method
+    def initPacketThread(self, packetFilter, PortAndIP, interface='', pcapFile=None):
+        retention = PacketRetention(self.retentionPackets, self.retentionBytes, self.retentionAge, self.retentionSpillFile) #retention limits so long running scans don't exhaust memory
+        rollingWriter = RollingPcapWriter(self.rollingFile, self.rollingFileSize, self.rollingInterval, self.rollingMaxFiles) if self.rollingFile and pcapFile is None else None #write scans to disk while capturing if enabled
+        packetColumns = self.packetModel.columns if pcapFile else None #loaded packets are added to the column store of the packet list by the indexed packet store
+        self.packetQueue = PacketQueue(self.packetQueueSize, self.packetQueuePolicy) #new packet queue so its counters belong to this scan
+        self.flowTable = FlowTable() #new flow table for the conversations of this scan
+        self.packetStatistics = PacketStatistics() #new statistics store for this scan
+        reassembler = TcpReassembler() if self.reassemblyEnabled else None #tcp reassembly so HTTP messages and TLS handshakes split across segments are shown as a whole
+        self.pipelineMetrics = PipelineMetrics() if self.metricsEnabled else None #new pipeline metrics for the diagnostics of this scan
+        if self.pipelineMetrics is not None: #the packet list backlog is read from the GUI
+            self.pipelineMetrics.addMetric('sniffserpent_packet_list_backlog', 'gauge', 'Packets waiting to be added to the packet list', self.getPacketBacklog, 'Packet List Backlog')
+        if self.metricsExporter is not None: #export the metrics of this scan
+            self.metricsExporter.metrics = self.pipelineMetrics
+        self.packetCaptureThread = PacketCaptureThread(self.packetQueue, packetFilter, PortAndIP, interface, pcapFile, retention, rollingWriter, packetColumns, self.flowTable, reassembler, self.packetStatistics, self.pipelineMetrics) #initialzie the packet thread with the queue we initialized and interface
+        self.captureEngine = self.packetCaptureThread.captureEngine if pcapFile is None else None #show the counters of scans in the packet status
         self.packetCaptureThread.setGUIState.connect(self.handleGUIState) #connect the packet thread to handleGUIState method
         self.packetCaptureThread.permissionError.connect(self.sniffErrorMessageBox) #connnect the packet thread to sniffErrorMessageBox method
-        self.packetCaptureThread.start() #calling the run method of the thread to start the scan    
+        self.packetCaptureThread.start() #calling the run method of the thread to start the scan
+        self.refreshScheduler.start(self.packetCaptureThread) #start updating the packet list
 
 
     #method to handle the start scan button, initializing the packet sniffing
     def StartScanClicked(self):
+        if self.isExporting(): #if scan is being saved we can't start a new scan that clears the packets
+            CustomMessageBox('Save In Progress', 'Cannot start scan while scan is being saved!', 'Warning', False) #show error message box
+            return
         if self.packetCaptureThread is None or not self.packetCaptureThread.isRunning(): #checks if no thread is set for sniffer  
             try:
                 packetFilter = self.packetFilter() #call packet filter for filtered dictionary based on check boxes state
@@ -1011,8 +669,13 @@ class PacketSniffer(QMainWindow):
             if interface == '': #if the input is empty it means no availabe interface found
                 CustomMessageBox('No Available Interface', 'Cannot find available network interface.', 'Critical', False) #show error message box
                 return #stop the initialization of scan
-            elif interface == 'All': #if user chose "All" option so we scan all available network interfaces
-                self.initPacketThread(packetFilter, PortAndIP) #initialzie the packet thread without specifing a interface, we scan all interfaces
+            elif interface == 'All': #if user chose "All" option so we scan all available network interfaces, each interface is captured by its own worker
+                self.initPacketThread(packetFilter, PortAndIP, self.getInterfaces()) #initialzie the packet thread with the list of interfaces
+            elif interface == 'Choose...': #if user chose "Choose..." option we ask for the interfaces to scan
+                interfaces = InterfaceDialog(self.getInterfaces(), self).getInterfaces() #the chosen interfaces, empty if user cancelled
+                if not interfaces: #if true no interface was chosen so we don't start the scan
+                    return
+                self.initPacketThread(packetFilter, PortAndIP, interfaces if len(interfaces) > 1 else interfaces[0]) #initialzie the packet thread with the chosen interfaces
             elif interface == 'Loopback': #if true we need to scan on loopback interface on windows
                 interface = '\\Device\\NPF_Loopback' #set interface to be loopback interface name
                 self.initPacketThread(packetFilter, PortAndIP, interface) #initialzie the packet thread
@@ -1038,39 +701,62 @@ class PacketSniffer(QMainWindow):
                 self.close() #call close method to close program
     
     
-    #method for saving scan data into a text file
+    #method for saving scan data into a text file or pcap file, the packets are saved in background by the export thread
     def SaveScanClicked(self):
-        #if packet dictionary isn't empty and if there's no scan in progress we open the save window
-        if any(packetDictionary.values()) and (self.packetCaptureThread is None or not self.packetCaptureThread.isRunning()):
+        #if there are stored packets and there's no pcap file loading or saving in progress we open the save window
+        if getPacketCount() > 0 and not self.isLoading() and not self.isExporting():
             defaultFilePath = os.path.join(self.getDirectory(), 'Packet Scan') #we set the default file name, user can change that in dialog
             options = QFileDialog.Options() #this is for file options
-            filePath, fileType = QFileDialog.getSaveFileName(self, 'Save Scan Data', defaultFilePath, 'Text File (*.txt);;PCAP File (*.pcap)', options=options) #save the file in a specific path
+            filePath, fileType = QFileDialog.getSaveFileName(self, 'Save Scan Data', defaultFilePath, ';;'.join(self.saveFileTypes), options=options) #save the file in a specific path
             if filePath: #if user chose valid path we continue
                 filePath, _ = os.path.splitext(filePath) #remove extension if added during getSaveFileName method
-                try: 
-                    if fileType == 'PCAP File (*.pcap)': #means user chose pcap file
-                        packetList = [packet.getPacket() for packet in packetDictionary.values()] #we convert the packet dictionary to list for scapy wrpcap method
-                        wrpcap(filePath + '.pcap', packetList) #call wrpcap method to write the captured packets into pcap file
-                        CustomMessageBox('Scan Saved', 'Saved scan detalis to PCAP file.', 'Information', False) #notify the user for success
-                    else: #else user chose a txt file
-                        with open(filePath + '.txt', 'w') as file: #we open the file for writing
-                            for packet in packetDictionary.values(): #iterating over the packet dictionary to extract the info 
-                                file.write('------------------------------------------------------------------------------------\n\n')
-                                file.write(packet.moreInfo()) #write the packet info to the file (extended information)
-                                file.write('------------------------------------------------------------------------------------\n\n')
-                            CustomMessageBox('Scan Saved', 'Saved scan detalis to text file.', 'Information', False) #notify the user for success
-                except Exception as e: #if error happend we print the error to terminal
-                    print(f'Error occurred while saving: {e}')
+                filePath += self.saveFileTypes.get(fileType, '.txt') #add the extension of the chosen file type
+                self.packetExportThread = PacketExportThread(filePath, fileType) #initialize the export thread with a snapshot of the stored packets
+                self.packetExportThread.exportProgress.connect(self.LoadProgressBar.setValue) #connect the export thread to the progress bar
+                self.packetExportThread.exportFinished.connect(self.handleExportFinished) #connect the export thread to handleExportFinished method
+                self.setProgressVisible(True, 'Cancel Save') #show the saving progress and cancel button while saving
+                self.packetExportThread.start() #calling the run method of the thread to start saving
             else: #else user didnt specify a file path
                 CustomMessageBox('Save Error', 'You must choose a file type for saving!', 'Critical', False) #show error message box
-        elif self.packetCaptureThread is not None and self.packetCaptureThread.isRunning(): #if scan in progress we notify the user
-            CustomMessageBox('Scan In Progress', 'Cannot save scan while scan in progress!', 'Warning', False) #show error message box  
+        elif self.isLoading(): #if pcap file is loading we notify the user
+            CustomMessageBox('Load In Progress', 'Cannot save scan while loading PCAP file!', 'Warning', False) #show error message box
+        elif self.isExporting(): #if saving is in progress we notify the user
+            CustomMessageBox('Save In Progress', 'Scan is already being saved!', 'Warning', False) #show error message box
         else: #else we show a "saved denied" error if something happend
             CustomMessageBox('Save Denied', 'No scan data to save.', 'Information', False) #show error message box
 
+
+    #method that handles the end of saving, hides the progress and shows the result
+    def handleExportFinished(self, title, message, icon):
+        self.packetExportThread = None #setting the packetExportThread to None for next save
+        self.setProgressVisible(False) #hide the saving progress and cancel button
+        CustomMessageBox(title, message, icon, False) #notify the user with the result
+
+
+    #method that returns true if a pcap file is loading
+    def isLoading(self):
+        return self.packetCaptureThread is not None and self.packetCaptureThread.isRunning() and self.packetCaptureThread.pcapFile is not None
+
+
+    #method that returns true if scan is being saved
+    def isExporting(self):
+        return self.packetExportThread is not None and self.packetExportThread.isRunning()
+
+
+    #method that shows or hides the progress bar and cancel button used for loading and saving, the packet status is shown when they are hidden
+    def setProgressVisible(self, state, cancelText='Cancel Load'):
+        self.LoadProgressBar.setValue(0) #reset the progress
+        self.LoadProgressBar.setVisible(state)
+        self.CancelLoadButton.setText(cancelText)
+        self.CancelLoadButton.setVisible(state)
+        self.PacketStatusLabel.setVisible(not state)
+
     
     #method to handle loading pcap file scan data to interface
     def LoadScanClicked(self):
+        if self.isExporting(): #if scan is being saved we can't load a file that clears the packets
+            CustomMessageBox('Save In Progress', 'Cannot load file while scan is being saved!', 'Warning', False) #show error message box
+            return
         if self.packetCaptureThread is None or not self.packetCaptureThread.isRunning(): #if there's no scan in progress we can load pcap file
             try:
                 packetFilter = self.packetFilter() #call packet filter for filtered dictionary based on check boxes state
@@ -1082,28 +768,51 @@ class PacketSniffer(QMainWindow):
                 return #stop the loading of pcap file
             options = QFileDialog.Options() #this is for file options
             options |= QFileDialog.ReadOnly #making the files read only so user wont be able to edit files while choosing a file
-            filePath, fileType = QFileDialog.getOpenFileName(self, 'Choose PCAP File', self.getDirectory(), 'PCAP File (*.pcap)', options=options) #load the pcap file from a specific path
-            if filePath and fileType == 'PCAP File (*.pcap)': #if the file path is valid we proceed and the type is pcap
+            filePath, fileType = QFileDialog.getOpenFileName(self, 'Choose PCAP File', self.getDirectory(), 'PCAP File (*.pcap *.pcapng)', options=options) #load the pcap file from a specific path
+            if filePath and fileType == 'PCAP File (*.pcap *.pcapng)': #if the file path is valid we proceed and the type is pcap
+                try: #we check that the file is a valid pcap or pcapng file before loading it
+                    PcapFileReader(filePath).close()
+                except (ValueError, OSError) as e: #if file is not valid we show a messagebox with the error
+                    CustomMessageBox('Load Error', str(e), 'Critical', False) #show error message box
+                    return #stop the loading of pcap file
                 self.ClearClicked() #call clear method 
-                packetList = rdpcap(filePath) #read all the content of the pcap file and save in variable
-                self.initPacketThread(packetFilter, PortAndIP, None, packetList) #initialize the packet thread with packetList
-                CustomMessageBox('Load Successful', 'Loaded PCAP file successfully, loading data to interface...', 'Information', True) #notify the user for success
+                self.setProgressVisible(True) #show the loading progress and cancel button while loading
+                self.initPacketThread(packetFilter, PortAndIP, None, filePath) #initialize the packet thread that streams the pcap file in background, its packets are added to the column store of the packet list
             else: #else user didn't specify a file path
                 CustomMessageBox('Load Error', 'You must choose a PCAP file to load!', 'Critical', False) #show error message box 
         else: #else we show error message
             CustomMessageBox('Scan Running', 'Scan in progress, cannot load file.', 'Warning', False) #show error message box
 
 
+    #method to handle the cancel load button, stops loading the pcap file and keeps the packets that were loaded
+    def CancelLoadClicked(self):
+        if self.isExporting(): #if true the button cancels saving, the thread notifies the user when it stops
+            self.packetExportThread.stop()
+        elif self.packetCaptureThread is not None and self.packetCaptureThread.isRunning(): #checks if there is a running thread
+            self.packetCaptureThread.stop() #calls stop method of the thread
+            self.packetCaptureThread.exit() #calls exit method of the thread
+            self.packetCaptureThread = None #setting the packetCaptureThread to None for next scan
+            self.handleGUIState(True) #we set the GUI elements to be clickable again
+            CustomMessageBox('Load Cancelled', 'Loading PCAP file cancelled.', 'Information', False) #show messagebox
+
+
     #method to handle clearing the screen
     def ClearClicked(self):
-        global packetDictionary #declare global parameter for clearing packet dictionary
-        global packetCounter #declare global parameter for resetting the packet counter
-        if self.packetCaptureThread is None or (self.packetCaptureThread is not None and not self.packetCaptureThread.isRunning()):
-            packetDictionary.clear() #clear the main packet dictionary
-            packetCounter = 0 #reset the packet counter
-            self.packetQueue = Queue() #clear the queue if there're packets in
-            self.PacketList.model().clear() #clear the packet list in GUI
+        if self.isExporting(): #if scan is being saved we can't clear the packets
+            CustomMessageBox('Save In Progress', 'Cannot clear while scan is being saved!', 'Warning', False) #show error message box
+        elif self.packetCaptureThread is None or (self.packetCaptureThread is not None and not self.packetCaptureThread.isRunning()):
+            clearPacketDictionary() #clear the main packet dictionary and reset the packet counter
+            self.packetQueue = PacketQueue(self.packetQueueSize, self.packetQueuePolicy) #clear the queue if there're packets in
+            self.captureEngine = None #clear the counters of last scan
+            self.flowTable = None #clear the conversations of last scan
+            self.packetStatistics = None #clear the statistics of last scan
+            self.pipelineMetrics = None #clear the diagnostics of last scan
+            self.packetModel = PacketTableModel() #set a new model with an empty column store
+            self.PacketList.setModel(self.packetModel) #clear the packet list in GUI
+            self.packetModel.setDisplayFilter(self.displayFilter) #keep the display filter for next scan
+            self.PacketList.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder) #reset the sorting of the packet list
             self.MoreInfoTextEdit.setText('') #clear the extended information in GUI
+            self.PacketStatusLabel.setText('') #clear the counters and number of evicted packets
         elif self.packetCaptureThread is not None and self.packetCaptureThread.isRunning():
             CustomMessageBox('Thread Running Error', 'Cannot clear while scan is in progress!', 'Warning', False) #show error message box
         
@@ -1120,56 +829,23 @@ class PacketSniffer(QMainWindow):
         CustomMessageBox('SniffSerpent General Information', sniffSerpentInfo, 'NoIcon', False, 700, 360) #shows messagebox with info about the application
 
 
-    #method that checks all the check boxs state, return a string with filtered packets
+    #method that checks all the check boxs state, return a dictionary with filtered packets and their handle methods
     def packetFilter(self):
         #check each check box to filter the packet kinds
-        packetFilter = ''
-        if not self.HTTPCheckBox.isChecked():
-            packetFilter += 'HTTP,'
-        if not self.TLSCheckBox.isChecked():
-            packetFilter += 'TLS,'
-        if not self.DHCPCheckBox.isChecked():
-            packetFilter += 'DHCP,'
-        if not self.DNSCheckBox.isChecked():
-            packetFilter += 'DNS,'
-        if not self.TCPCheckBox.isChecked():
-            packetFilter += 'TCP,'
-        if not self.UDPCheckBox.isChecked():
-            packetFilter += 'UDP,'
-        if not self.ICMPCheckBox.isChecked():
-            packetFilter += 'ICMP,'
-        if not self.ARPCheckBox.isChecked():
-            packetFilter += 'ARP,'
-        if not self.IGMPCheckBox.isChecked():
-            packetFilter += 'IGMP,'
-        if not self.STPCheckBox.isChecked():
-            packetFilter += 'STP,'
-        #dicionary for packet kinds and their methods for handling:
-        captureDictionary = {
-        HTTP: handleHTTP,
-        TLS: handleTLS,
-        DHCP: handleDHCP,
-        DNS: handleDNS,
-        TCP: handleTCP,
-        UDP: handleUDP,
-        ICMP: handleICMP,
-        ARP: handleARP,
-        IGMP: handleIGMP,
-        STP: handleSTP,
+        checkBoxes = {
+        'HTTP': self.HTTPCheckBox,
+        'TLS': self.TLSCheckBox,
+        'DHCP': self.DHCPCheckBox,
+        'DNS': self.DNSCheckBox,
+        'TCP': self.TCPCheckBox,
+        'UDP': self.UDPCheckBox,
+        'ICMP': self.ICMPCheckBox,
+        'ARP': self.ARPCheckBox,
+        'IGMP': self.IGMPCheckBox,
+        'STP': self.STPCheckBox,
         }
-        if packetFilter != '': #if packetFilter isn't empty it means we need to filter the dictionary 
-            packetFilter.rstrip(',').split(',') #splite the original string to get a list of the packet types
-            temp = captureDictionary.copy() #save the original dictionary in temp var
-            for packetType, handler in temp.items(): #iterating on the dictionary to remove the filtered packets
-                if packetType == TLS: #if true we need to strip a TLS packet string
-                    p = str(packetType).split('.')[4].rstrip("'>") #strip the str representation of the TLS packet for extracting its name
-                else: #else its a regular packet so we strip it 
-                    p = str(packetType).split('.')[3].rstrip("'>") #strip the str representation of the packet for extracting its name
-                if p in packetFilter: #if true we need to delete the packet type from the dictionary
-                    del captureDictionary[packetType] #delete packet from dictionary
-        if not captureDictionary: #if dictionary is empty we raise a new exception to indicate of an error 
-            raise Exception('Error, you must choose at least one type for scan.')
-        return captureDictionary
+        protocols = [protocol for protocol, checkBox in checkBoxes.items() if checkBox.isChecked()] #list of the chosen packet types
+        return getPacketFilter(protocols) #raises an exception if no packet type was chosen
      
 
     #method that checks the ip and port line edit lables, if valid it returns the string representing the option, else raises a ValueError exception
@@ -1187,23 +863,151 @@ class PacketSniffer(QMainWindow):
         return output
 
 
-    #method for updating the packet list
+    #method for updating the packet list, the rows of the batch are inserted together, returns the number of added rows
     def updatePacketList(self, maxSize=100):
-        buffer = min(self.packetQueue.qsize(), maxSize) #buffer for the amount of packets to add at a time, min between queue size and maxSize value
-        if self.packetCaptureThread != None and not self.packetQueue.empty(): #we add packets when queue if not empty 
-            while buffer > 0: #add the packets to packet list while buffer isn't empty 
-                packetInfo = self.packetQueue.get() #taking a packet from the queue
-                self.packetModel.appendRow(QStandardItem(packetInfo)) #adding to packet list in GUI
-                buffer -= 1 #subtracting from buffer
+        if self.isLoading(): #if true we update the loading progress
+            self.LoadProgressBar.setValue(int(self.packetCaptureThread.captureEngine.getProgress() * 100))
+        followTail = self.isFollowingTail() #check if the newest rows are shown before adding rows
+        if self.packetModel.columns is getPacketColumns(): #if true we loaded a pcap file, the model shows the new packets of the indexed packet store
+            startTime = time.perf_counter() #start time of the packet list update for diagnostics
+            addedRows = self.packetModel.updateRowCount()
+            if self.pipelineMetrics is not None and addedRows > 0: #if true we add the time of the update to the diagnostics
+                self.pipelineMetrics.addStageTime('render', startTime)
+        else: #else we add the queued packets of the scan
+            firstPacketId = getFirstPacketId() #packets before it were already evicted so we skip them
+            records = [(record, packetInfo) for record, packetInfo in self.packetQueue.getBatch(maxSize) if record.id >= firstPacketId] #batch of packet records and their brief information
+            if records: #adding the batch to packet list in GUI
+                startTime = time.perf_counter() #start time of the packet list update for diagnostics
+                self.packetModel.addRecords(records)
+                if self.pipelineMetrics is not None: #if true we add the time of the update and the sampled latencies of the batch to the diagnostics
+                    self.pipelineMetrics.addDisplayed(records, startTime)
+            self.removeEvictedRows() #remove the rows of packets that were evicted by the retention limits
+            self.updatePacketStatus() #show the counters of the scan
+            addedRows = len(records)
+        if followTail and addedRows > 0: #if true we keep showing the newest rows
+            self.PacketList.scrollToBottom()
+        return addedRows
+
+
+    #method that returns the number of packets waiting to be added to the packet list
+    def getPacketBacklog(self):
+        if self.packetModel.columns is getPacketColumns(): #if true we load a pcap file, packets are waiting in the column store
+            return self.packetModel.getBacklog()
+        return self.packetQueue.qsize()
+
+
+    #method that returns true if the packet list follows the newest rows, meaning its scrolled to the bottom and sorted by packet id
+    def isFollowingTail(self):
+        scrollBar = self.PacketList.verticalScrollBar()
+        return self.packetModel.isInCaptureOrder() and scrollBar.value() >= scrollBar.maximum()
+
+
+    #method that removes the rows of evicted packets from the packet list
+    def removeEvictedRows(self):
+        self.packetModel.removeOldestRows(bisect_left(self.packetModel.columns.ids, getFirstPacketId())) #rows are stored in order of packet ids so evicted packets are the first rows
+
+
+    #method that shows the counters of the scan and the number of evicted packets in the packet status
+    def updatePacketStatus(self):
+        status = [] #parts of the status text
+        if self.captureEngine is not None: #if true we show the counters of the packet pipeline
+            counters = self.captureEngine.getCounters()
+            status.append(f'Received {counters["received"]}, Dissected {counters["dissected"]}, Filtered {counters["filtered"]}, Queued {counters["queued"]}, UI Drops {counters["queueDropped"]}')
+            if counters['kernelDropped'] is not None: #if true the capture backend reports kernel statistics
+                status.append(f'Kernel Drops {counters["kernelDropped"]}')
+            for interface, stats in self.captureEngine.getStats().get('interfaces', {}).items(): #if we capture on several interfaces we show the counters of each interface
+                status.append(f'{interface}: Merged {stats["merged"]}, Queue Drops {stats["queueDropped"]}' + (f', Kernel Drops {stats["dropped"]}' if stats.get('dropped') is not None else '') + (f', Stopped ({stats["error"]})' if stats['error'] else ''))
+        evictedCount = getEvictedCount() #number of evicted packets of current scan
+        if evictedCount > 0: #if true we show the number of evicted packets
+            status.append(f'Evicted {evictedCount}' + (f' (saved to {os.path.basename(self.retentionSpillFile)})' if self.retentionSpillFile else ''))
+        self.PacketStatusLabel.setText(', '.join(status))
+        self.PacketStatusLabel.setToolTip(f'<span style="font-size:10pt;">{"<br/>".join(status)}</span>' if status else '')
 
 
     #method the double clicks in packet list, extended information section
     def handleItemDoubleClicked(self, index):
-        packetIndex = index.row() #get the index of the row of the specific packet we want
-        item = self.PacketList.model().itemFromIndex(index) #taking the packet from the list in GUI
-        if item is not None and packetIndex in packetDictionary: #checking if the packet in GUI list isn't None 
-            p = packetDictionary[packetIndex] #taking the matching packet from the packetDictionary
-            self.MoreInfoTextEdit.setText(p.moreInfo()) #add the information to the extended information section in GUI
+        if not index.isValid(): #if index isn't valid there's no packet to show
+            return
+        packetId = self.packetModel.getPacketId(index.row()) #get the packet id of the row, rows may be sorted by any column
+        try: #taking the matching packet record, loaded packets are decoded straight from the mapped file
+            p = getPacketRecord(packetId)
+        except KeyError: #if packet was evicted we don't show it
+            return
+        self.MoreInfoTextEdit.setText(p.moreInfo()) #add the information to the extended information section in GUI
+
+
+    #method that shows the menu of the packet list when user right clicks it
+    def showPacketMenu(self, position):
+        index = self.PacketList.indexAt(position) #index of the clicked row, invalid if user clicked below the rows
+        menu = QMenu(self)
+        conversationAction = menu.addAction('Show Conversation') #show the conversation of the clicked packet
+        conversationAction.setEnabled(index.isValid() and self.flowTable is not None)
+        followAction = menu.addAction('Follow TCP Stream') #show the data of the tcp connection of the clicked packet
+        followAction.setEnabled(index.isValid() and self.flowTable is not None)
+        conversationsAction = menu.addAction('Conversations') #show the conversations with the most bytes
+        conversationsAction.setEnabled(self.flowTable is not None)
+        statisticsAction = menu.addAction('Statistics') #show the protocol breakdown, top talkers and packet sizes
+        statisticsAction.setEnabled(self.packetStatistics is not None)
+        diagnosticsAction = menu.addAction('Diagnostics') #show the stage times, sampled latencies, queue depths and protocol rates of the pipeline
+        diagnosticsAction.setEnabled(self.pipelineMetrics is not None)
+        action = menu.exec_(self.PacketList.viewport().mapToGlobal(position))
+        if action == conversationAction:
+            self.showConversation(self.packetModel.getPacketId(index.row()))
+        elif action == followAction:
+            self.showTcpStream(self.packetModel.getPacketId(index.row()))
+        elif action == conversationsAction:
+            self.showConversations()
+        elif action == statisticsAction:
+            self.MoreInfoTextEdit.setText(self.packetStatistics.moreInfo(self.talkerCount)) #add the statistics to the extended information section
+        elif action == diagnosticsAction:
+            self.MoreInfoTextEdit.setText(self.pipelineMetrics.moreInfo()) #add the diagnostics to the extended information section
+
+
+    #method that shows the conversation of given packet in the extended information section
+    def showConversation(self, packetId):
+        try: #taking the matching packet record
+            flow = self.flowTable.getFlow(getPacketRecord(packetId))
+        except KeyError: #if packet was evicted we don't show it
+            return
+        if flow is None: #if true the packet has no 5-tuple or its conversation expired
+            CustomMessageBox('No Conversation', 'Packet has no conversation or its conversation expired.', 'Information', False) #show messagebox
+            return
+        self.MoreInfoTextEdit.setText(flow.moreInfo()) #add the information of the conversation to the extended information section
+
+
+    #method that shows the data of the tcp connection of given packet in the extended information section
+    #the stored packets of the connection are reassembled again, so the data isn't kept during the scan
+    def showTcpStream(self, packetId):
+        try: #taking the matching packet record
+            flow = self.flowTable.getFlow(getPacketRecord(packetId))
+        except KeyError: #if packet was evicted we don't show it
+            return
+        if flow is None or flow.getProtocol() != 'TCP': #if true the packet isn't part of a tcp connection we track
+            CustomMessageBox('No TCP Stream', 'Packet is not part of a TCP connection or its connection expired.', 'Information', False) #show messagebox
+            return
+        packetIds = range(max(flow.firstPacketId, getPacketIdRange().start), flow.lastPacketId + 1) #ids of the stored packets of the connection and packets between them
+        connection = followStream(record for record in self.getStoredRecords(packetIds) if self.flowTable.getKey(record)[0] == flow.key) #records of the connection
+        if connection is None: #if true the connection has no data
+            CustomMessageBox('No TCP Stream', 'TCP connection has no data.', 'Information', False) #show messagebox
+            return
+        self.MoreInfoTextEdit.setText(connection.followInfo()) #add the data of the connection to the extended information section
+
+
+    #method for iterating over the packet records of given packet ids, packets that are evicted by the capture while iterating are skipped
+    def getStoredRecords(self, packetIds):
+        for packetId in packetIds:
+            try:
+                yield getPacketRecord(packetId)
+            except KeyError: #if packet was evicted we skip it
+                continue
+
+
+    #method that shows the conversations with the most bytes in the extended information section
+    def showConversations(self):
+        flows = self.flowTable.getTopFlows(self.flowCount) #conversations sorted by bytes
+        output = f'Conversations: {len(self.flowTable)} active, {self.flowTable.expiredCount} expired\n\n' #add the number of conversations to output
+        output += ''.join(f'{flow.info()}\n\n' for flow in flows) #add the brief information of each conversation to output
+        self.MoreInfoTextEdit.setText(output)
     
     
     #method to handle state of checkboxes, if state false we disable them, otherwise we enable them
@@ -1222,6 +1026,9 @@ class PacketSniffer(QMainWindow):
             self.IPLineEdit.setEnabled(True)
             self.PortLineEdit.setEnabled(True)
             self.InterfaceComboBox.setEnabled(True)
+            self.refreshScheduler.stop() #show the remaining packets and stop updating the packet list
+            if not self.isExporting(): #hide the loading progress and cancel button unless scan is being saved
+                self.setProgressVisible(False)
         else: #else we disable the checkboxes and ip/port line edit
             self.HTTPCheckBox.setEnabled(False)
             self.TLSCheckBox.setEnabled(False)
@@ -1342,6 +1149,46 @@ class CustomMessageBox(QDialog):
 
 #---------------------------------------------------CustomMessageBox-END----------------------------------------------------#
 
+#-----------------------------------------------------InterfaceDialog-------------------------------------------------------#
+#dialog for choosing the network interfaces of a scan, each chosen interface is captured by its own worker
+class InterfaceDialog(QDialog):
+    checkBoxes = None #list of check boxes of the interfaces
+    interfaces = None #list of the chosen interfaces, empty if user cancelled
+
+    def __init__(self, interfaces, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Choose Interfaces') #set the title for dialog
+        self.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.CustomizeWindowHint | Qt.WindowCloseButtonHint) #set the window flags
+        self.setWindowIcon(QIcon('images/serpent.ico')) #add default window icon
+        self.setStyleSheet('background-color: rgb(245,245,245);') #set backgorund color
+        self.interfaces = []
+        layout = QVBoxLayout() #create new layout
+        textLabel = QLabel('Choose the interfaces to scan:') #create a text label
+        textLabel.setStyleSheet('font-size: 18px;') #set font size of text
+        layout.addWidget(textLabel)
+        self.checkBoxes = []
+        for interface in interfaces: #add a check box for each interface, all interfaces are chosen at first
+            checkBox = QCheckBox('Loopback' if interface == '\\Device\\NPF_Loopback' else interface)
+            checkBox.setStyleSheet('font-size: 16px;') #set font size of check box
+            checkBox.setChecked(True)
+            checkBox.interface = interface #the interface name of the check box
+            layout.addWidget(checkBox)
+            self.checkBoxes.append(checkBox)
+        OKButton = QPushButton('OK') #create new OK button
+        OKButton.setStyleSheet('QPushButton { background-color: rgba(32,33,35,255); color: rgb(245,245,245); border: 2px solid black; border-radius: 15px; padding: 4px; font-size: 17px; font-family: Arial; min-width: 60px; min-height: 20px; } QPushButton:hover { background-color: rgb(87, 89, 101); } QPushButton:pressed { background-color: rgb(177, 185, 187); }') #set stylesheet for the OK button like the message box
+        OKButton.clicked.connect(self.accept) #set an accept operation to the clicks of OK button
+        layout.addWidget(OKButton, alignment=Qt.AlignCenter) #add the button to the layout
+        self.setLayout(layout) #finally set the layout of the dialog
+
+
+    #method that shows the dialog and returns the chosen interfaces, empty if user cancelled
+    def getInterfaces(self):
+        if self.exec_() == QDialog.Accepted: #if true user pressed OK
+            self.interfaces = [checkBox.interface for checkBox in self.checkBoxes if checkBox.isChecked()]
+        return self.interfaces
+
+#---------------------------------------------------InterfaceDialog-END-----------------------------------------------------#
+
 #-----------------------------------------------------------MAIN------------------------------------------------------------#
 
 if __name__ == '__main__':
@@ -0,0 +1,224 @@
+import sys
+import time
+import argparse
+from PcapIO import PcapFileReader, RollingPcapWriter
+from FlowTable import FlowTable
+from TcpReassembly import TcpReassembler
+from PacketStatistics import PacketStatistics
+from PacketExport import createExportWriter
+from PipelineMetrics import PipelineMetrics, MetricsExporter
+from PacketEngine import PacketCaptureEngine, PacketRetention, captureDictionary, getPacketFilter, getAvailableInterfaces, getNetworkInterfaces, getEvictedCount, getPacketRecord, verifyClassifier
+
+
+#-------------------------------------------------------CaptureSinks--------------------------------------------------------#
+#sink that prints the brief information of each handled packet to the terminal
+class InfoSink():
+    moreInfo = False #flag for printing the extended information of each packet
+    metrics = None #pipeline metrics the time of the information is added to, none for no timing
+
+    def __init__(self, moreInfo=False, metrics=None):
+        self.moreInfo = moreInfo
+        self.metrics = metrics
+
+
+    #method that receives each handled packet from the capture engine
+    def __call__(self, handledPacket):
+        startTime = time.perf_counter() if self.metrics is not None else None #start time of the information for diagnostics
+        packetInfo = handledPacket.moreInfo() if self.moreInfo else handledPacket.info() #the extended or brief information of the packet
+        if self.metrics is not None:
+            self.metrics.addStageTime('info', startTime)
+        if self.moreInfo: #if true we print the extended information of the packet
+            print('------------------------------------------------------------------------------------\n')
+            print(packetInfo, end='')
+        else: #else we print the brief information of the packet
+            print(packetInfo, flush=True)
+
+
+    #method for closing the sink when capture finishes
+    def close(self):
+        sys.stdout.flush()
+
+
+#sink that writes one row with typed columns for each handled packet to a csv, parquet or arrow file
+class ExportSink():
+    exportWriter = None #the export writer of the file
+
+    def __init__(self, exportWriter):
+        self.exportWriter = exportWriter
+
+
+    #method that receives each handled packet from the capture engine
+    def __call__(self, handledPacket):
+        self.exportWriter.write(getPacketRecord(handledPacket.getId()))
+
+
+    #method for closing the sink when capture finishes, the last rows are written
+    def close(self):
+        self.exportWriter.close()
+
+#-----------------------------------------------------CaptureSinks-END------------------------------------------------------#
+
+#---------------------------------------------------------COMMANDS----------------------------------------------------------#
+#method that runs a headless capture with the given command line arguments
+def captureCommand(args):
+    try:
+        packetFilter = getPacketFilter(args.protocols.split(',') if args.protocols else None) #get the packet filter for chosen packet types
+    except Exception as e: #if an exception is raised we print the error and exit
+        print(e, file=sys.stderr)
+        return 2
+    metrics = PipelineMetrics() if args.diagnostics or args.metrics_file or args.metrics_port is not None else None #pipeline metrics for the diagnostics summary and exporter
+    try: #open the export file before capturing so a wrong format or missing pyarrow is reported right away
+        packetSink = ExportSink(createExportWriter(args.export)) if args.export else InfoSink(args.more, metrics) if not args.write else None #set the output sink, terminal unless we write to pcap or export file
+    except (ValueError, ImportError, OSError) as e: #if the export file can't be created we print the error and exit
+        print(e, file=sys.stderr)
+        return 2
+    try: #bind the metrics endpoint before capturing so a port in use is reported right away
+        metricsExporter = MetricsExporter(metrics, args.metrics_file, args.metrics_port, args.metrics_interval) if args.metrics_file or args.metrics_port is not None else None
+    except OSError as e: #if the endpoint can't be bound we print the error and exit
+        print(e, file=sys.stderr)
+        return 2
+    interface = getNetworkInterfaces() if args.interface == 'all' else args.interface.split(',') if args.interface and ',' in args.interface else args.interface #interface, or list of interfaces that are captured in parallel
+    try: #parse the BPF filters of the interfaces, each is given as interface=filter
+        interfaceFilters = dict(interfaceFilter.split('=', 1) for interfaceFilter in args.interface_filter) if args.interface_filter else None
+    except ValueError: #if true a filter isn't in the interface=filter format
+        print('Error, interface filters must be given as interface=filter, e.g. eth0="port 53".', file=sys.stderr)
+        return 2
+    rollingWriter = RollingPcapWriter(args.write, int(args.file_size * 1000000), args.rotate_seconds, args.file_count) if args.write else None #writer thread for the pcap files
+    backendOptions = {'fanoutGroup': args.fanout} if args.fanout is not None else {} #options for the TPACKET_V3 backend
+    if interfaceFilters: #the filters of the interfaces are combined with the shared filter by the capture backend
+        backendOptions['interfaceFilters'] = interfaceFilters
+    retention = PacketRetention(args.max_packets, args.max_bytes, args.max_age, args.spill) #retention limits of packets kept in memory for decoding
+    flowTable = FlowTable(args.flow_timeout, args.max_flows) if args.flows else None #flow table for the conversation summary
+    packetStatistics = PacketStatistics() if args.stats else None #columnar store of packet metadata for the statistics summary
+    reassembler = TcpReassembler() if args.reassembly else None #tcp reassembly of HTTP messages and TLS handshakes split across segments
+    captureEngine = PacketCaptureEngine(packetFilter, args.filter, interface, args.duration, args.count, packetSink, backend=args.backend, backendOptions=backendOptions, workers=args.workers, kernelFilter=not args.no_kernel_filter, fastPath=not args.no_fast_path, pcapFile=args.read, retention=retention, rollingWriter=rollingWriter, flowTable=flowTable, reassembler=reassembler, packetStatistics=packetStatistics, metrics=metrics) #initialize the capture engine
+    for note in captureEngine.filterNotes: #print notes for packet types the kernel filter can't fully match, they are checked in userspace
+        print(f'Filter note: {note}', file=sys.stderr)
+    if metricsExporter is not None: #export the metrics while capturing
+        metricsExporter.start()
+        if metricsExporter.port is not None: #print the chosen port, zero binds any free port
+            print(f'Serving metrics on http://127.0.0.1:{metricsExporter.port}/metrics', file=sys.stderr)
+    try: #we run the capture engine until duration or count limit is reached or user stops it
+        captureEngine.run()
+    except KeyboardInterrupt: #if user pressed ctrl+c we stop the capture
+        captureEngine.stop()
+    except PermissionError: #if user didn't run in administrative privileges we print error message
+        print('Permission denied. Please run again with administrative privileges.', file=sys.stderr)
+        return 1
+    except (ValueError, OSError) as e: #if the pcap file couldn't be read we print the error
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        if packetSink is not None: #close the output sink
+            packetSink.close()
+        if metricsExporter is not None: #write the metrics file a last time and close the endpoint
+            metricsExporter.stop()
+    counters = captureEngine.getCounters() #counters of the packet pipeline
+    print(f'Captured {counters["handled"]} packets, received {counters["received"]} frames, dissected {counters["dissected"]}, filtered {counters["filtered"]}.', file=sys.stderr) #print summary of capture
+    if rollingWriter is not None: #if true we print the summary of the pcap files
+        print(f'Wrote {rollingWriter.writtenCount} packets, dropped {rollingWriter.droppedCount} packets, kept files: {", ".join(rollingWriter.filePaths)}', file=sys.stderr)
+        if rollingWriter.error is not None: #if true writing stopped because of an error
+            print(f'Error occurred while writing: {rollingWriter.error}', file=sys.stderr)
+    if args.export: #if true we print the summary of the export file
+        print(f'Exported {packetSink.exportWriter.writtenCount} packets to {args.export}.', file=sys.stderr)
+    if getEvictedCount() > 0 and args.spill: #if true evicted packets were written to the spill file
+        print(f'Spilled {getEvictedCount()} evicted packets to {args.spill}.', file=sys.stderr)
+    if counters['kernelReceived'] is not None: #if true the backend reported kernel statistics
+        print(f'Kernel received {counters["kernelReceived"]} packets, dropped {counters["kernelDropped"]} packets.', file=sys.stderr)
+    for interfaceName, stats in captureEngine.getStats().get('interfaces', {}).items(): #if we captured on several interfaces we print the counters of each interface
+        print(f'Interface {interfaceName}: merged {stats["merged"]} frames, dropped {stats["queueDropped"]} frames from its queue' + (f', kernel received {stats["received"]} packets, dropped {stats["dropped"]} packets' if stats.get('received') is not None else '') + (f', stopped: {stats["error"]}' if stats['error'] else '') + '.', file=sys.stderr)
+    if captureEngine.reassembler is not None: #if true we print the counters of tcp reassembly
+        reassembly = captureEngine.reassembler.getCounters()
+        print(f'Reassembled {reassembly["reassembled"]} messages, {reassembly["outOfOrder"]} out of order segments, {reassembly["retransmitted"]} retransmitted segments, {reassembly["overflowed"]} streams over the stream limit.', file=sys.stderr)
+    if packetStatistics is not None: #if true we print the protocol breakdown, top talkers and packet sizes
+        print(packetStatistics.moreInfo(args.stats), end='')
+    if flowTable is not None: #if true we print the conversations with the most bytes
+        print(f'Tracked {len(flowTable)} active flows, {flowTable.expiredCount} flows expired. Top {args.flows} flows by bytes:')
+        for flow in flowTable.getTopFlows(args.flows):
+            print(flow.info())
+    if args.diagnostics: #if true we print the stage times, queue depths and protocol rates of the pipeline
+        print(metrics.moreInfo(), end='', file=sys.stderr)
+    return 0
+
+
+#method that verifies that the fast path classifier gives the same results as the scapy path on pcap files
+def verifyCommand(args):
+    frames = [] #the regression corpus
+    for filePath in args.files: #read the frames of each file
+        with PcapFileReader(filePath) as pcapReader:
+            frames.extend(pcapReader)
+    protocols = args.protocols.split(',') if args.protocols else list(captureDictionary) #packet types to verify
+    filters = [protocols] + [[protocol] for protocol in protocols] if len(protocols) > 1 else [protocols] #all chosen packet types together and each on its own
+    mismatchCount = 0 #total number of mismatches
+    for chosenProtocols in filters:
+        results = verifyClassifier(frames, getPacketFilter(chosenProtocols))
+        print(f'{",".join(chosenProtocols)}: {results["frames"]} frames, {results["handled"]} handled, {results["dropped"]} dropped, {results["unsure"]} left for scapy, {results["fallbacks"]} fallbacks, {len(results["mismatches"])} mismatches')
+        for index, expected, actual in results['mismatches']: #print each mismatch with its frame number
+            print(f'  frame {index + 1}: scapy path {expected}, fast path {actual}')
+        mismatchCount += len(results['mismatches'])
+    return 1 if mismatchCount else 0
+
+
+#method that prints the available network interfaces
+def interfacesCommand(args):
+    getAvailableInterfaces()
+    return 0
+
+
+#method that creates the argument parser for the command line interface
+def createParser():
+    parser = argparse.ArgumentParser(prog='sniffserpent', description='SniffSerpent headless packet capture.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    captureParser = subparsers.add_parser('capture', help='capture packets without the GUI')
+    captureParser.add_argument('-i', '--interface', default=None, help='network interface to capture on, a comma separated list or "all" captures each interface in its own worker, all interfaces in one socket if not given')
+    captureParser.add_argument('--interface-filter', action='append', default=None, metavar='INTERFACE=FILTER', help='BPF filter of one interface of -i, combined with the filter of -f, may be given for each interface')
+    captureParser.add_argument('-f', '--filter', default='', help='BPF filter expression, e.g. "host 10.0.0.5 and port 443", combined with the packet types of -p')
+    captureParser.add_argument('-p', '--protocols', default=None, help=f'comma separated packet types to capture, any of: {",".join(captureDictionary)}')
+    captureParser.add_argument('--no-kernel-filter', action='store_true', help='check packet types only in userspace instead of compiling them into the BPF filter')
+    captureParser.add_argument('--no-fast-path', action='store_true', help='dissect every frame with scapy instead of classifying raw frames first')
+    captureParser.add_argument('-d', '--duration', type=float, default=None, help='stop capture after given number of seconds')
+    captureParser.add_argument('-c', '--count', type=int, default=0, help='stop capture after given number of handled packets')
+    captureParser.add_argument('-r', '--read', default=None, help='read packets from given pcap or pcapng file instead of capturing on an interface')
+    captureParser.add_argument('-w', '--write', default=None, help='write handled packets to given pcap file instead of the terminal')
+    captureParser.add_argument('-C', '--file-size', type=float, default=0, help='rotate the pcap file of -w after given number of megabytes, like tcpdump -C')
+    captureParser.add_argument('-G', '--rotate-seconds', type=float, default=None, help='rotate the pcap file of -w after given number of seconds, like tcpdump -G')
+    captureParser.add_argument('-W', '--file-count', type=int, default=0, help='keep at most given number of pcap files, the oldest file is removed, like tcpdump -W')
+    captureParser.add_argument('-e', '--export', default=None, help='write one row with typed columns for each handled packet to given .csv, .parquet or .arrow file instead of the terminal')
+    captureParser.add_argument('-m', '--more', action='store_true', help='print extended information of each packet')
+    captureParser.add_argument('-b', '--backend', default='auto', choices=['auto', 'scapy', 'tpacket'], help='capture backend, auto prefers the TPACKET_V3 ring on Linux')
+    captureParser.add_argument('--fanout', type=int, default=None, help='PACKET_FANOUT group id for sharing an interface between several captures (tpacket backend)')
+    captureParser.add_argument('--max-packets', type=int, default=100000, help='maximum number of packets kept in memory, the oldest packets are evicted when reached, zero for unlimited')
+    captureParser.add_argument('--max-bytes', type=int, default=0, help='maximum number of frame bytes kept in memory, zero for unlimited')
+    captureParser.add_argument('--max-age', type=float, default=None, help='maximum age in seconds of packets kept in memory')
+    captureParser.add_argument('--spill', default=None, help='write evicted packets to given pcap file instead of discarding them')
+    captureParser.add_argument('--stats', type=int, default=0, help='print the protocol breakdown, given number of top talkers and packet sizes when capture finishes')
+    captureParser.add_argument('--flows', type=int, default=0, help='print given number of conversations with the most bytes when capture finishes')
+    captureParser.add_argument('--flow-timeout', type=float, default=120, help='seconds without packets after which a conversation of --flows expires')
+    captureParser.add_argument('--max-flows', type=int, default=500000, help='maximum number of conversations tracked by --flows, the longest idle conversation is removed when reached')
+    captureParser.add_argument('--reassembly', action='store_true', help='reassemble HTTP messages and TLS handshakes split across tcp segments and dissect them with the segment that completes them')
+    captureParser.add_argument('-j', '--workers', type=int, default=0, help='number of worker processes for packet dissection, zero dissects in the capture thread')
+    captureParser.add_argument('--diagnostics', action='store_true', help='print the time of each pipeline stage, queue depths and protocol rates when capture finishes')
+    captureParser.add_argument('--metrics-file', default=None, help='write pipeline metrics in the Prometheus text format to given file during the capture, e.g. for the node exporter textfile collector')
+    captureParser.add_argument('--metrics-port', type=int, default=None, help='serve pipeline metrics in the Prometheus text format on http://127.0.0.1:PORT/metrics during the capture, zero picks a free port')
+    captureParser.add_argument('--metrics-interval', type=float, default=5, help='seconds between writes of the file of --metrics-file')
+    captureParser.set_defaults(func=captureCommand)
+
+    verifyParser = subparsers.add_parser('verify', help='check that the fast path classifier matches the scapy path on pcap files')
+    verifyParser.add_argument('files', nargs='+', help='pcap or pcapng files of the regression corpus')
+    verifyParser.add_argument('-p', '--protocols', default=None, help=f'comma separated packet types to verify, any of: {",".join(captureDictionary)}')
+    verifyParser.set_defaults(func=verifyCommand)
+
+    interfacesParser = subparsers.add_parser('interfaces', help='list available network interfaces')
+    interfacesParser.set_defaults(func=interfacesCommand)
+    return parser
+
+#-------------------------------------------------------COMMANDS-END--------------------------------------------------------#
+
+#-----------------------------------------------------------MAIN------------------------------------------------------------#
+
+if __name__ == '__main__':
+    args = createParser().parse_args()
+    sys.exit(args.func(args))
+
+#-----------------------------------------------------------MAIN-END---------------------------------------------------------#
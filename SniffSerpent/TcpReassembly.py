@@ -0,0 +1,412 @@
+import struct
+from collections import OrderedDict
+from FlowTable import getTransportHeader
+
+
+#-----------------------------------------------------HELPER-FUNCTIONS------------------------------------------------------#
+#method that returns the signed distance between two tcp sequence numbers, sequence numbers wrap around at 2^32
+def getSequenceDistance(sequence, nextSequence):
+    return ((sequence - nextSequence + 0x80000000) & 0xffffffff) - 0x80000000
+
+
+#method that returns the printable text of stream data, bytes that aren't printable ascii are replaced with dots like in Wireshark
+def getPrintableText(data):
+    return data.translate(printableTable).decode('ascii')
+
+
+printableTable = bytes(byte if 32 <= byte < 127 or byte in (9, 10, 13) else 46 for byte in range(256)) #translation table of bytes to printable ascii
+
+#----------------------------------------------------HELPER-FUNCTIONS-END---------------------------------------------------#
+
+#---------------------------------------------------------TcpStream---------------------------------------------------------#
+#one direction of a tcp connection, keeps the in order data that wasn't parsed yet and the segments that arrived ahead of it
+class TcpStream():
+    __slots__ = ('nextSequence', 'segments', 'segmentBytes', 'buffer', 'protocol', 'messageLength', 'skipBytes', 'finished') #slots for low memory usage per stream
+
+    def __init__(self, protocol=None):
+        self.nextSequence = None #represents the sequence number of the next in order byte, none until the first SYN or data segment
+        self.segments = {} #represents the segments that arrived ahead of the next sequence number by their sequence numbers
+        self.segmentBytes = 0 #represents the number of bytes in segments
+        self.buffer = bytearray() #represents the in order data of the message that isn't complete yet
+        self.protocol = protocol #represents the application protocol of the stream, HTTP, TLS, none until detected or OTHER for streams we don't parse
+        self.messageLength = None #represents the length of the current message once its headers were parsed
+        self.skipBytes = 0 #represents the number of following bytes that are skipped, bodies that are too large and TLS records that aren't handshakes
+        self.finished = False #represents if the endpoint sent FIN
+
+
+    #method that returns the number of bytes the stream buffers
+    def getBufferedBytes(self):
+        return len(self.buffer) + self.segmentBytes
+
+#-------------------------------------------------------TcpStream-END-------------------------------------------------------#
+
+#-------------------------------------------------------TcpConnection-------------------------------------------------------#
+#both directions of a tcp connection, streams are indexed by direction, zero for data from the lower endpoint of the key
+class TcpConnection():
+    __slots__ = ('key', 'streams', 'lastSeen', 'chunks', 'dataBytes', 'truncated', 'clientDirection') #slots for low memory usage per connection
+
+    def __init__(self, key, time, protocol=None):
+        self.key = key #represents the key of the connection, the endpoints of both directions as bytes with the lower endpoint first
+        self.streams = (TcpStream(protocol), TcpStream(protocol)) #represents the streams of both directions
+        self.lastSeen = time #represents the timestamp of the last segment
+        self.chunks = [] #represents the in order data of both directions for following the stream, a list of [direction, data] in order of arrival
+        self.dataBytes = 0 #represents the number of bytes in chunks
+        self.truncated = False #represents if data wasn't kept because the follow limit was reached
+        self.clientDirection = None #represents the direction of the endpoint that sent the first SYN or data
+
+
+    #method that adds in order data of given direction to the chunks, consecutive data of the same direction is merged
+    def addChunk(self, direction, data, maxBytes):
+        if self.dataBytes + len(data) > maxBytes: #if true we keep only the data up to the limit
+            data = data[:max(0, maxBytes - self.dataBytes)]
+            self.truncated = True
+        if not data:
+            return
+        if self.chunks and self.chunks[-1][0] == direction: #if true the data continues the last chunk
+            self.chunks[-1][1] += data
+        else: #else the other endpoint sent the data so we start a new chunk
+            self.chunks.append([direction, bytearray(data)])
+        self.dataBytes += len(data)
+
+
+    #method that returns the endpoints of given direction as text
+    def getEndpoint(self, direction):
+        endpoint = self.key[direction] #the address and port of the endpoint as bytes
+        address, port = endpoint[:-2], struct.unpack('!H', endpoint[-2:])[0]
+        if len(address) == 4: #if true its an ipv4 address
+            return f'({".".join(map(str, address))}):({port})'
+        return f'({":".join(address[i:i+2].hex() for i in range(0, 16, 2))}):({port})'
+
+
+    #method that represents the kept data of the connection as text, the client is the endpoint that sent the first SYN or data
+    def followInfo(self):
+        client = self.clientDirection if self.clientDirection is not None else 0 #direction of the client
+        server = 1 - client #direction of the server
+        clientBytes = sum(len(data) for direction, data in self.chunks if direction == client) #number of bytes each endpoint sent
+        serverBytes = self.dataBytes - clientBytes
+        output = f'TCP Stream: {self.getEndpoint(client)} <--> {self.getEndpoint(server)}\n\n' #add the endpoints of the stream to output
+        output += f'Client: {clientBytes} bytes, Server: {serverBytes} bytes\n\n' #add the number of bytes of each endpoint to output
+        missingBytes = sum(stream.segmentBytes for stream in self.streams) #bytes of segments that never became in order because of missing segments
+        if missingBytes: #add the number of bytes after missing segments to output
+            output += f'Segments after missing data: {missingBytes} bytes\n\n'
+        if self.truncated: #add a note that the data was truncated to output
+            output += f'Stream truncated after {self.dataBytes} bytes.\n\n'
+        for direction, data in self.chunks: #add the data of each endpoint in order of arrival to output
+            output += f'{"-->" if direction == client else "<--"} {len(data)} bytes:\n'
+            output += f'{getPrintableText(bytes(data))}\n\n'
+        return output
+
+#-----------------------------------------------------TcpConnection-END-----------------------------------------------------#
+
+#-------------------------------------------------------TcpReassembler------------------------------------------------------#
+#tcp stream reassembly of raw frames, puts segments in order, removes retransmitted data and parses HTTP messages and TLS records of the streams
+#for each frame addFrame returns the tcp payload the frame is dissected with: none for the frame's own payload, the HTTP messages or TLS handshake records
+#the frame completed, or an empty payload if the frame's data belongs to a message that is completed by a later frame
+class TcpReassembler():
+    maxStreamBytes = 1 << 20 #maximum number of bytes each stream buffers for out of order segments and incomplete messages, the stream stops parsing when reached
+    maxTotalBytes = 64 << 20 #maximum number of bytes buffered by all streams, the longest idle connections are removed when reached
+    maxConnections = 100000 #maximum number of connections, the longest idle connection is removed when reached
+    streamTimeout = 60 #time in seconds without segments after which a connection is removed, measured by packet timestamps
+    maxHeaderBytes = 65536 #maximum length of HTTP headers, streams with longer headers are not parsed
+    maxFollowBytes = 1 << 20 #maximum number of bytes kept of each connection when keeping data for following streams
+    keepData = False #flag for keeping the in order data of connections for following streams, messages aren't parsed then
+    connections = None #ordered dictionary of connections by key, the longest idle connection first
+    totalBytes = 0 #number of bytes buffered by all streams
+    reassembledCount = 0 #number of messages that were reassembled from several segments
+    outOfOrderCount = 0 #number of segments that arrived ahead of missing data
+    retransmittedCount = 0 #number of segments with data that was already received
+    overflowCount = 0 #number of streams that stopped parsing because they reached the stream limit
+    expiredCount = 0 #number of connections removed by the timeout or limits
+    httpMethods = (b'GET ', b'POST ', b'PUT ', b'HEAD ', b'DELETE ', b'OPTIONS ', b'PATCH ', b'CONNECT ', b'TRACE ', b'HTTP/1.') #starts of HTTP messages
+    tlsRecordTypes = (20, 21, 22, 23, 24) #TLS record types, 22 is a handshake record
+
+    def __init__(self, maxStreamBytes=1 << 20, maxTotalBytes=64 << 20, streamTimeout=60, maxConnections=100000, keepData=False, maxFollowBytes=1 << 20):
+        self.maxStreamBytes = maxStreamBytes #set the stream limit
+        self.maxTotalBytes = maxTotalBytes #set the global limit
+        self.streamTimeout = streamTimeout #set the stream timeout
+        self.maxConnections = maxConnections #set the maximum number of connections
+        self.keepData = keepData #set the keep data flag
+        self.maxFollowBytes = maxFollowBytes #set the limit of kept data of each connection
+        self.connections = OrderedDict()
+
+
+    #method that returns the number of connections
+    def __len__(self):
+        return len(self.connections)
+
+
+    #method that returns the counters of the reassembly as a dictionary
+    def getCounters(self):
+        return {'connections': len(self.connections), 'bufferedBytes': self.totalBytes, 'reassembled': self.reassembledCount, 'outOfOrder': self.outOfOrderCount,
+            'retransmitted': self.retransmittedCount, 'overflowed': self.overflowCount, 'expired': self.expiredCount}
+
+
+    #method that adds a raw frame to its stream, returns the tcp payload for dissecting the frame, none if the frame is dissected as it is
+    #only frames that complete messages get a payload, other frames are dissected as they are so partial messages, gaps and streams we joined in the middle look like without reassembly
+    def addFrame(self, frame, time, linkType):
+        header = getTransportHeader(frame, linkType) #the ip protocol and transport header of the frame
+        if header is None or header[0] != 6 or header[2] < header[1] + 20: #if true its not a complete tcp header
+            return None
+        protocol, offset, end, srcAddress, dstAddress = header
+        sequence, dataOffset, flags = struct.unpack_from('!4xI4xBB', frame, offset) #sequence number, header length and flags of the segment
+        payload = frame[offset + (dataOffset >> 4) * 4:end] #the data of the segment
+        source, destination = srcAddress + frame[offset:offset + 2], dstAddress + frame[offset + 2:offset + 4] #endpoints of the segment as bytes
+        key, direction = ((source, destination), 0) if source <= destination else ((destination, source), 1) #the lower endpoint is first so both directions have the same key
+        connection = self.connections.get(key)
+        if connection is None: #if true its a new connection, we only track connections that open or send data
+            if not (flags & 0x02 or payload) or flags & 0x04: #if true its an ACK, FIN or RST of a connection we don't track
+                return None
+            connection = self.connections[key] = TcpConnection(key, time, 'OTHER' if self.keepData else None)
+            connection.clientDirection = direction if not (flags & 0x02 and flags & 0x10) else 1 - direction #the client sent the SYN or first data, SYN with ACK answers it
+        else: #else we move the connection to the end of the idle order
+            self.connections.move_to_end(key)
+            connection.lastSeen = max(connection.lastSeen, time)
+        result = self.addSegment(connection, direction, sequence, flags, payload)
+        self.expireConnections(time)
+        return result
+
+
+    #method that adds a segment to the stream of given direction, returns the tcp payload of the frame like addFrame
+    def addSegment(self, connection, direction, sequence, flags, payload):
+        stream = connection.streams[direction] #the stream of the direction of the segment
+        if flags & 0x04 and not self.keepData: #if true the connection was reset so we remove it
+            self.removeConnection(connection)
+            return None
+        if flags & 0x02: #if true its a SYN, the data starts after its sequence number
+            if stream.nextSequence is not None and stream.nextSequence != (sequence + 1) & 0xffffffff and not self.keepData: #if true a new connection reuses the endpoints so we reset the connection
+                self.removeConnection(connection)
+                connection = self.connections[connection.key] = TcpConnection(connection.key, connection.lastSeen)
+                connection.clientDirection = direction if not flags & 0x10 else 1 - direction
+                stream = connection.streams[direction]
+            stream.nextSequence = (sequence + 1) & 0xffffffff
+            sequence = stream.nextSequence #the data of the segment starts after the SYN
+        if flags & 0x01: #if true the endpoint finished sending
+            stream.finished = True
+        if not payload or (stream.protocol == 'OTHER' and not self.keepData): #if true there's no data to reassemble
+            return None
+        if stream.nextSequence is None: #if true we didn't see the SYN so the stream starts with this segment
+            stream.nextSequence = sequence
+        distance = getSequenceDistance(sequence, stream.nextSequence) #distance of the segment from the next in order byte
+        if distance + len(payload) <= 0: #if true all the data was already received so its a retransmission
+            self.retransmittedCount += 1
+            return None
+        if distance > 0: #if true data before the segment is missing so we keep it until the missing data arrives
+            if len(stream.segments.get(sequence, b'')) < len(payload): #keep the longest segment of each sequence number
+                size = len(payload) - len(stream.segments.get(sequence, b''))
+                stream.segments[sequence] = payload
+                stream.segmentBytes += size
+                self.totalBytes += size
+            self.outOfOrderCount += 1
+            self.checkLimits(connection, stream)
+            return None
+        if distance < 0: #if true the start of the segment was already received so we remove it
+            self.retransmittedCount += 1
+            payload = payload[-distance:]
+        aligned = not stream.buffer and not stream.skipBytes #if true the segment starts a message
+        self.addData(connection, direction, payload)
+        self.addSegments(connection, direction)
+        messages = self.parseMessages(stream)
+        self.checkLimits(connection, stream)
+        if messages: #if true the segment completed messages
+            data = b''.join(messages) #the completed messages of the segment
+            if data == payload and aligned: #if true the messages are exactly the segment so we dissect the frame as it is
+                return None
+            self.reassembledCount += len(messages)
+            return data
+        return None #the data of the segment belongs to a message that isn't complete or to skipped data, so we dissect the frame as it is
+
+
+    #method that adds in order data to the stream of given direction
+    def addData(self, connection, direction, data):
+        stream = connection.streams[direction]
+        stream.nextSequence = (stream.nextSequence + len(data)) & 0xffffffff #the next in order byte is after the data
+        if self.keepData: #if true we keep the data for following the stream
+            connection.addChunk(direction, data, self.maxFollowBytes)
+        if stream.protocol == 'OTHER': #if true we don't parse the stream
+            return
+        if stream.skipBytes: #if true the start of the data belongs to skipped data
+            skip = min(stream.skipBytes, len(data))
+            stream.skipBytes -= skip
+            data = data[skip:]
+        stream.buffer += data
+        self.totalBytes += len(data)
+
+
+    #method that adds the segments that are now in order to the stream of given direction
+    def addSegments(self, connection, direction):
+        stream = connection.streams[direction]
+        added = True #flag for segments that were added in the last pass
+        while stream.segments and added:
+            added = False
+            for sequence in list(stream.segments):
+                distance = getSequenceDistance(sequence, stream.nextSequence) #distance of the segment from the next in order byte
+                if distance > 0: #if true the segment is still ahead of missing data
+                    continue
+                data = stream.segments.pop(sequence)
+                stream.segmentBytes -= len(data)
+                self.totalBytes -= len(data)
+                if distance + len(data) > 0: #if true the segment has new data after the in order data
+                    self.addData(connection, direction, data[-distance:] if distance else data)
+                    added = True
+
+
+    #method that parses the complete messages in the buffer of the stream and removes them, returns a list of the messages
+    def parseMessages(self, stream):
+        messages = [] #list of complete messages
+        while stream.buffer and stream.protocol != 'OTHER':
+            if stream.protocol is None: #if true we detect the protocol of the stream from its first bytes
+                stream.protocol = self.detectProtocol(stream.buffer)
+                if stream.protocol is None: #if true we need more data to detect the protocol
+                    break
+                continue
+            length = self.getHTTPLength(stream) if stream.protocol == 'HTTP' else self.getTLSLength(stream) #length of the message at the start of the buffer
+            if length is None: #if true the message isn't complete
+                break
+            if length: #if true its a message we parse, else the parser skipped the data
+                messages.append(bytes(stream.buffer[:length]))
+                del stream.buffer[:length]
+                self.totalBytes -= length
+            stream.messageLength = None
+        if stream.protocol == 'OTHER' and stream.buffer: #if true we stopped parsing the stream so we remove its data
+            self.totalBytes -= len(stream.buffer)
+            stream.buffer = bytearray()
+        return messages
+
+
+    #method that returns the protocol of a stream that starts with given data, none if more data is needed
+    def detectProtocol(self, data):
+        if data[0] in self.tlsRecordTypes: #if true it may be a TLS record
+            return ('TLS' if data[1] == 3 else 'OTHER') if len(data) >= 2 else None
+        for method in self.httpMethods: #check if data starts with an HTTP request method or response version
+            if data.startswith(method):
+                return 'HTTP'
+            if method.startswith(bytes(data)): #if true the data may be the start of an HTTP message
+                return None
+        return 'OTHER'
+
+
+    #method that returns the length of the TLS record at the start of the buffer, zero if the record is skipped, none if the record isn't complete
+    def getTLSLength(self, stream):
+        buffer = stream.buffer
+        if len(buffer) < 5: #if true the record header isn't complete
+            return None
+        if buffer[0] not in self.tlsRecordTypes or buffer[1] != 3: #if true the stream is not in sync with its records so we stop parsing it
+            stream.protocol = 'OTHER'
+            return None
+        length = 5 + struct.unpack_from('!H', buffer, 3)[0] #length of the record with its header
+        if buffer[0] != 22: #if true its not a handshake record so we skip it without buffering
+            skip = min(length, len(buffer))
+            del buffer[:skip]
+            self.totalBytes -= skip
+            stream.skipBytes = length - skip
+            return 0
+        return length if len(buffer) >= length else None
+
+
+    #method that returns the length of the HTTP message at the start of the buffer, zero if the message is skipped, none if the message isn't complete
+    #large bodies aren't buffered, their messages end after the headers and the body is skipped
+    def getHTTPLength(self, stream):
+        buffer = stream.buffer
+        if stream.messageLength is not None: #if true we parsed the headers of the message already
+            return stream.messageLength if len(buffer) >= stream.messageLength else None
+        if not any(buffer.startswith(method) for method in self.httpMethods): #if true the stream is not in sync with its messages so we stop parsing it
+            stream.protocol = 'OTHER' if len(buffer) >= 8 or not any(method.startswith(bytes(buffer)) for method in self.httpMethods) else None
+            return None
+        headerLength = buffer.find(b'\r\n\r\n') + 4 #length of the headers of the message
+        if headerLength == 3: #if true the headers are not complete
+            if len(buffer) > self.maxHeaderBytes: #if true the headers are too long so we stop parsing the stream
+                stream.protocol = 'OTHER'
+            return None
+        lines = bytes(buffer[:headerLength]).split(b'\r\n') #the start line and headers of the message
+        headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(b':') for line in lines[1:] if line)} #dictionary of headers
+        response = buffer.startswith(b'HTTP/') #if true the message is a response
+        status = lines[0].split(b' ', 2)[1] if response and len(lines[0].split(b' ', 2)) > 1 else b'' #status code of a response
+        if response and (status.startswith(b'1') or status in (b'204', b'304')): #if true the response has no body
+            bodyLength = 0
+        elif b'chunked' in headers.get(b'transfer-encoding', b'').lower(): #if true the body is sent in chunks
+            return self.getChunkedLength(stream, headerLength)
+        elif headers.get(b'content-length', b'').isdigit(): #if true the length of the body is given
+            bodyLength = int(headers[b'content-length'])
+        elif response: #else the response body ends when the connection closes so we parse only its headers
+            stream.messageLength = headerLength
+            stream.protocol = 'OTHER'
+            return headerLength
+        else: #else the request has no body
+            bodyLength = 0
+        if headerLength + bodyLength > self.maxStreamBytes: #if true the body is too large so the message ends after the headers and the body is skipped
+            skip = min(bodyLength, len(buffer) - headerLength) #bytes of the body that are already in the buffer
+            del buffer[headerLength:headerLength + skip]
+            self.totalBytes -= skip
+            stream.skipBytes = bodyLength - skip
+            stream.messageLength = headerLength
+            return headerLength
+        stream.messageLength = headerLength + bodyLength
+        return stream.messageLength if len(buffer) >= stream.messageLength else None
+
+
+    #method that returns the length of an HTTP message with chunked body, none if the message isn't complete
+    def getChunkedLength(self, stream, position):
+        buffer = stream.buffer
+        while True:
+            lineEnd = buffer.find(b'\r\n', position) #end of the line of the chunk size
+            if lineEnd == -1: #if true the line isn't complete
+                return None
+            try:
+                size = int(bytes(buffer[position:lineEnd]).split(b';')[0], 16) #the size of the chunk
+            except ValueError: #if the size is invalid we stop parsing the stream
+                stream.protocol = 'OTHER'
+                return None
+            if size == 0: #if true its the last chunk, the message ends after the trailer headers
+                if buffer[lineEnd + 2:lineEnd + 4] == b'\r\n': #if true there are no trailer headers
+                    return lineEnd + 4
+                trailerEnd = buffer.find(b'\r\n\r\n', lineEnd) #end of the trailer headers
+                return trailerEnd + 4 if trailerEnd != -1 else None
+            position = lineEnd + 2 + size + 2 #start of the next chunk
+            if position > len(buffer): #if true the chunk isn't complete
+                if position > self.maxStreamBytes: #if true the body is too large so we stop parsing the stream
+                    stream.protocol = 'OTHER'
+                return None
+
+
+    #method that stops parsing a stream if it buffers too much and removes the longest idle connections if all streams buffer too much
+    def checkLimits(self, connection, stream):
+        if stream.getBufferedBytes() > self.maxStreamBytes and not self.keepData: #if true the stream reached the stream limit so we stop parsing it
+            self.totalBytes -= stream.getBufferedBytes()
+            stream.buffer, stream.segments, stream.segmentBytes = bytearray(), {}, 0
+            stream.protocol = 'OTHER'
+            self.overflowCount += 1
+        while self.totalBytes > self.maxTotalBytes and self.connections: #if true we remove the longest idle connections until we are below the global limit
+            self.removeConnection(next(iter(self.connections.values())))
+            self.expiredCount += 1
+
+
+    #method that removes the connections that were idle for longer than the stream timeout at given time, and the longest idle connections above the maximum number of connections
+    def expireConnections(self, time):
+        if self.keepData: #if true we keep all the connections for following them
+            return
+        while self.connections: #connections are in order of their last segment so we only check the first connection
+            connection = next(iter(self.connections.values()))
+            if time - connection.lastSeen <= self.streamTimeout and len(self.connections) <= self.maxConnections:
+                break
+            self.removeConnection(connection)
+            self.expiredCount += 1
+
+
+    #method that removes a connection and its buffered data
+    def removeConnection(self, connection):
+        self.totalBytes -= sum(stream.getBufferedBytes() for stream in connection.streams)
+        self.connections.pop(connection.key, None)
+
+#-----------------------------------------------------TcpReassembler-END----------------------------------------------------#
+
+#-----------------------------------------------------FOLLOW-FUNCTIONS------------------------------------------------------#
+#method that reassembles the packet records of one tcp connection and returns the connection with its data in order, none if the records have no tcp data
+#the records are reassembled again so the data doesn't need to be kept during the capture
+def followStream(records, maxFollowBytes=1 << 20):
+    reassembler = TcpReassembler(keepData=True, maxFollowBytes=maxFollowBytes) #reassembler that keeps the data of the connection
+    for record in records:
+        reassembler.addFrame(record.raw, record.time, record.linkType)
+    connections = list(reassembler.connections.values()) #the records belong to one connection
+    return connections[0] if connections else None
+
+#---------------------------------------------------FOLLOW-FUNCTIONS-END----------------------------------------------------#